@@ -0,0 +1,107 @@
+"""Costo de la AgendaTurnos con muchas reservas repartidas en semanas.
+
+Reserva --reservas turnos en horarios de atención (8 a 18 h, cada 5
+minutos) de --dias días, cancela una parte y después avanza el reloj de
+minuto en minuto hasta el último turno llamando a liberar() en cada paso,
+como hace el reloj de la interfaz. Informa µs por reserva, por cancelación,
+por paciente liberado y por llamada a liberar() sin nada vencido; se corre
+con dos tamaños para ver que los costos por operación no crecen con n.
+
+Uso: python benchmarks/bench_agenda.py [--reservas 10000,100000] [--dias 28]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.agenda import AgendaTurnos
+
+
+def pacientes_con_turno(cantidad, dias, inicio, azar):
+    pacientes = []
+    for i in range(cantidad):
+        momento = inicio + timedelta(days=azar.randrange(dias), hours=8,
+                                     minutes=5 * azar.randrange(120))
+        pacientes.append(Paciente(f"Paciente {i}", "600000000", momento.strftime("%d/%m/%Y"),
+                                  momento.strftime("%H:%M"), azar.choice(ESPECIALIDADES),
+                                  nivel=azar.randint(3, 5)))
+    return pacientes
+
+
+def correr(cantidad, args):
+    azar = random.Random(args.semilla)
+    inicio = datetime(2025, 3, 3)
+    pacientes = pacientes_con_turno(cantidad, args.dias, inicio, azar)
+    cola = ColaTurnos()
+    agenda = AgendaTurnos(cola, anticipacion=15)
+
+    t = time.perf_counter()
+    reservas = [agenda.reservar(paciente) for paciente in pacientes]
+    reservar = time.perf_counter() - t
+
+    canceladas = azar.sample(reservas, int(cantidad * args.cancelados))
+    t = time.perf_counter()
+    for reserva in canceladas:
+        agenda.cancelar(reserva)
+    cancelar = time.perf_counter() - t
+
+    # Reloj de minuto en minuto; los minutos sin nada vencido se miden aparte
+    ahora = inicio.timestamp()
+    fin = (inicio + timedelta(days=args.dias)).timestamp()
+    liberados = vacios = 0
+    con_pacientes = sin_pacientes = 0.0
+    while ahora < fin:
+        t = time.perf_counter()
+        salieron = agenda.liberar(ahora)
+        transcurrido = time.perf_counter() - t
+        if salieron:
+            liberados += len(salieron)
+            con_pacientes += transcurrido
+        else:
+            vacios += 1
+            sin_pacientes += transcurrido
+        # Se atiende a todos: la cola no crece entre pasos
+        while cola.desencolar() is not None:
+            pass
+        ahora += 60
+    assert liberados == cantidad - len(canceladas) and not len(agenda)
+    return {
+        'reservar': reservar / cantidad * 1e6,
+        'cancelar': cancelar / max(len(canceladas), 1) * 1e6,
+        'liberar por paciente': con_pacientes / max(liberados, 1) * 1e6,
+        'liberar sin vencidos': sin_pacientes / max(vacios, 1) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reservas", default="10000,100000",
+                        type=lambda texto: [int(n) for n in texto.split(",")])
+    parser.add_argument("--dias", type=int, default=28)
+    parser.add_argument("--cancelados", type=float, default=0.1, help="proporción cancelada")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    resultados = []
+    gc.disable()
+    try:
+        for cantidad in args.reservas:
+            gc.collect()
+            resultados.append((cantidad, correr(cantidad, args)))
+    finally:
+        gc.enable()
+
+    print(f"{args.dias} días, {args.cancelados:.0%} cancelados; µs por operación")
+    print(f"{'reservas':>10}" + "".join(f"{nombre:>22}" for nombre in resultados[0][1]))
+    for cantidad, costos in resultados:
+        print(f"{cantidad:>10,}" + "".join(f"{valor:>22.2f}" for valor in costos.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Benchmark del arranque en frío: motor sin interfaz, línea de comandos e interfaz con Tk.
+
+Cada medición lanza un intérprete nuevo y toma el tiempo de pared de
+`python -c "import ..."`.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPETICIONES = 20
+
+CASOS = [
+    ("intérprete vacío", "pass"),
+    ("motor sin interfaz (import turnos)", "import turnos"),
+    ("línea de comandos (import turnos.cli)", "import turnos.cli"),
+    ("interfaz completa (import turnos.gui)", "import turnos.gui"),
+]
+
+
+def medir(codigo):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    resultados = {nombre: medir(codigo) for nombre, codigo in CASOS}
+    base = resultados["intérprete vacío"]
+    for nombre, ms in resultados.items():
+        print(f"{nombre:<40} {ms:8.1f} ms  (+{ms - base:.1f} ms sobre el intérprete)")
+
+
+if __name__ == "__main__":
+    main()
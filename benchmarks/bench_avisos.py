@@ -0,0 +1,147 @@
+"""Costo de los avisos a pacientes: detección de cruces y despacho por lotes.
+
+avisador     µs por operación de la cola (mezcla de encolar, desencolar y
+             cancelar) con AvisadorTurnos suscrito, para cada --cantidad:
+             no debe crecer con la cola. Se compara con volver a recorrer
+             la subcola de la especialidad en cada cambio (--recorridos
+             operaciones, es mucho más lento)
+ofrecer      µs por aviso ofrecido al despachador que corre en otro hilo
+despacho     --avisos avisos (la mitad repetidos) por una PasarelaLocal con
+             --latencia por lote y --fallas: tiempo total, lotes, reintentos
+             y que cada aviso haya salido exactamente una vez
+ritmo        avisos por segundo medidos contra el límite --por-segundo (el
+             balde arranca lleno: un lote sale de una vez)
+
+Uso: python benchmarks/bench_avisos.py [--cantidad 10000,100000] [--avisos 5000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.avisos import PROXIMO, AvisadorTurnos, Aviso, DespachadorAvisos, PasarelaLocal
+
+MEZCLA = (('encolar', 40), ('desencolar', 40), ('cancelar_ticket', 20))
+
+
+def nuevo_paciente(i, azar):
+    return Paciente(f"Paciente {i % 5000}", "600000000", "01/01/2025", "09:00",
+                    azar.choice(ESPECIALIDADES), nivel=azar.randint(1, 5))
+
+
+def operar(cola, azar, operaciones):
+    nombres = [operacion for operacion, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    pasos = [(operacion, azar.randrange(1, cola.siguiente_ticket), nuevo_paciente(i, azar))
+             for i, operacion in enumerate(azar.choices(nombres, pesos, k=operaciones))]
+    inicio = time.perf_counter()
+    for operacion, ticket, paciente in pasos:
+        if operacion == 'encolar':
+            cola.encolar(paciente)
+        elif operacion == 'desencolar':
+            cola.desencolar()
+        else:
+            cola.cancelar_ticket(ticket)
+    return (time.perf_counter() - inicio) / operaciones
+
+
+def recorrer_subcola(cola, umbral, avisados):
+    """Alternativa ingenua: recorrer toda la subcola en cada cambio"""
+    def registrar(evento, ticket, paciente):
+        for posicion, (turno, _, _) in enumerate(
+                cola.primeros(cola.tamaño(paciente.especialidad), paciente.especialidad), 1):
+            if posicion <= umbral:
+                avisados.add(turno)
+    return registrar
+
+
+def medir_avisador(cantidad, args):
+    azar = random.Random(args.semilla)
+    cola = ColaTurnos()
+    cola.encolar_lote([nuevo_paciente(i, azar) for i in range(cantidad)])
+    gc.collect()
+    base = operar(cola, azar, args.operaciones)
+    avisos = []
+    avisador = AvisadorTurnos(cola, avisos.append)
+    con_avisador = operar(cola, azar, args.operaciones)
+    avisador.cerrar()
+    observador = recorrer_subcola(cola, avisador.umbral, set())
+    cola.suscribir(observador)
+    recorriendo = operar(cola, azar, args.recorridos)
+    cola.desuscribir(observador)
+    return base, con_avisador, recorriendo, len(avisos)
+
+
+def despachar(args):
+    """Despacho con fallas y duplicados; retorna (segundos, s por ofrecer(),
+    despachador, pasarela)"""
+    pasarela = PasarelaLocal(latencia=args.latencia, fallas=args.fallas, semilla=args.semilla)
+    despachador = DespachadorAvisos(pasarela, capacidad=args.avisos, lote=args.lote,
+                                    por_segundo=1e9, espera_reintento=0.01)
+    paciente = Paciente("Paciente", "600000000", "01/01/2025", "09:00", ESPECIALIDADES[0])
+    avisos = [Aviso(PROXIMO, i % (args.avisos // 2), paciente, 3) for i in range(args.avisos)]
+    inicio = time.perf_counter()
+    despachador.iniciar()
+    t = time.perf_counter()
+    for aviso in avisos:
+        despachador.ofrecer(aviso)
+    ofrecer = (time.perf_counter() - t) / len(avisos)
+    despachador.detener()
+    return time.perf_counter() - inicio, ofrecer, despachador, pasarela
+
+
+def medir_ritmo(args):
+    pasarela = PasarelaLocal()
+    despachador = DespachadorAvisos(pasarela, lote=args.lote, por_segundo=args.por_segundo)
+    paciente = Paciente("Paciente", "600000000", "01/01/2025", "09:00", ESPECIALIDADES[0])
+    cantidad = int(args.por_segundo * args.segundos_ritmo)
+    inicio = time.perf_counter()
+    with despachador:
+        for i in range(cantidad):
+            despachador.ofrecer(Aviso(PROXIMO, i, paciente, 3))
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", default="10000,100000",
+                        type=lambda texto: [int(n) for n in texto.split(",")])
+    parser.add_argument("--operaciones", type=int, default=20_000)
+    parser.add_argument("--recorridos", type=int, default=200,
+                        help="operaciones con la alternativa que recorre la subcola")
+    parser.add_argument("--avisos", type=int, default=5000)
+    parser.add_argument("--lote", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos por lote")
+    parser.add_argument("--fallas", type=float, default=0.05, help="probabilidad por aviso")
+    parser.add_argument("--por-segundo", type=float, default=200)
+    parser.add_argument("--segundos-ritmo", type=float, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    print("avisador, µs por operación de la cola:")
+    print(f"{'turnos':>10} {'sin avisos':>12} {'avisador':>12} {'recorriendo':>12} {'avisos':>8}")
+    for cantidad in args.cantidad:
+        base, con_avisador, recorriendo, avisos = medir_avisador(cantidad, args)
+        print(f"{cantidad:>10,} {base * 1e6:>12.2f} {con_avisador * 1e6:>12.2f} "
+              f"{recorriendo * 1e6:>12.0f} {avisos:>8,}")
+
+    segundos, ofrecer, despachador, pasarela = despachar(args)
+    estadisticas = despachador.estadisticas
+    tickets = [aviso.ticket for aviso in pasarela.enviados]
+    print(f"ofrecer(): {ofrecer * 1e6:.2f} µs por aviso")
+    print(f"despacho: {args.avisos:,} avisos ({estadisticas['duplicados']:,} duplicados) en "
+          f"{segundos:.2f} s, {estadisticas['lotes']:,} lotes de hasta {args.lote} "
+          f"({args.latencia * 1000:g} ms c/u), {estadisticas['reintentados']:,} reintentos "
+          f"({args.fallas:.0%} de fallas), {estadisticas['fallidos']} perdidos")
+    print(f"  enviados {len(tickets):,}, distintos {len(set(tickets)):,}")
+    ritmo = medir_ritmo(args)
+    print(f"ritmo: {ritmo:.0f} avisos/s con límite {args.por_segundo:g}/s")
+
+
+if __name__ == "__main__":
+    main()
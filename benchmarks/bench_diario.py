@@ -0,0 +1,95 @@
+"""Benchmark del diario persistente: operaciones/segundo por modo de durabilidad
+y tiempo de recuperación en función de la cola viva.
+
+Uso: python benchmarks/bench_diario.py [--operaciones N] [--directorio DIR]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import Paciente
+from turnos.diario import LOTE, NINGUNO, SIEMPRE, DiarioTurnos
+
+ESPECIALIDADES = ("Medicina General", "Cardiología", "Pediatría", "Traumatología")
+
+
+def carga_mixta(cola, operaciones, azar):
+    """~60 % encolar, ~30 % desencolar, ~10 % cancelar"""
+    tickets = []
+    for i in range(operaciones):
+        x = azar.random()
+        if x < 0.6 or not tickets:
+            paciente = Paciente(f"Paciente {i}", "600000000", "01/01/2025", "09:00",
+                                azar.choice(ESPECIALIDADES), azar.random() < 0.1)
+            tickets.append(cola.encolar(paciente))
+        elif x < 0.9:
+            cola.desencolar()
+        else:
+            cola.cancelar_ticket(tickets[azar.randrange(len(tickets))])
+
+
+def medir_modo(directorio, durabilidad, operaciones):
+    shutil.rmtree(directorio, ignore_errors=True)
+    diario = DiarioTurnos(directorio, durabilidad=durabilidad)
+    cola = diario.recuperar()
+    inicio = time.perf_counter()
+    carga_mixta(cola, operaciones, random.Random(1))
+    diario.cerrar()
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def medir_recuperacion(directorio, vivos, historia):
+    """Cola con `vivos` pacientes tras `historia` operaciones de relleno"""
+    shutil.rmtree(directorio, ignore_errors=True)
+    diario = DiarioTurnos(directorio, durabilidad=NINGUNO)
+    cola = diario.recuperar()
+    for i in range(historia):
+        cola.encolar(Paciente(f"Relleno {i}", "1", "", "", "Cardiología"))
+        cola.desencolar()
+    for i in range(vivos):
+        cola.encolar(Paciente(f"Paciente {i}", "1", "", "", "Cardiología"))
+    diario.cerrar()
+
+    inicio = time.perf_counter()
+    diario = DiarioTurnos(directorio)
+    cola = diario.recuperar()
+    transcurrido = time.perf_counter() - inicio
+    assert cola.tamaño() == vivos
+    diario.cerrar()
+    return transcurrido * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--operaciones", type=int, default=20_000)
+    parser.add_argument("--directorio", help="directorio de trabajo (por defecto uno temporal)")
+    args = parser.parse_args()
+
+    base = args.directorio or tempfile.mkdtemp(prefix="bench_diario_")
+    directorio = os.path.join(base, "diario")
+    try:
+        print(f"{'durabilidad':<12} {'ops/s':>12}")
+        for durabilidad in (NINGUNO, LOTE, SIEMPRE):
+            # fsync por operación es lento: usar menos operaciones
+            operaciones = args.operaciones if durabilidad != SIEMPRE else args.operaciones // 10
+            ops = medir_modo(directorio, durabilidad, operaciones)
+            print(f"{durabilidad:<12} {ops:>12,.0f}")
+
+        print()
+        print(f"{'vivos':>8} {'historia':>10} {'recuperación (ms)':>18}")
+        for vivos, historia in ((1_000, 0), (1_000, 200_000), (10_000, 0), (10_000, 200_000)):
+            ms = medir_recuperacion(directorio, vivos, historia)
+            print(f"{vivos:>8} {historia:>10} {ms:>18.1f}")
+    finally:
+        if args.directorio is None:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Benchmark de la interfaz Tk con colas grandes, sin pantalla.
+
+Maneja GestorTurnosApp desde el script (los diálogos modales quedan
+reemplazados por funciones que responden al instante y cuentan cuántas
+veces se abrieron) y, para cada tamaño de --tamaños, mide:
+    carga          encolar_lote de toda la cola y el primer refresco
+    operaciones    ms por llamada a cada manejador de la interfaz (registrar,
+                   llamar, cancelar, buscar, consultar, sugerencias, scroll,
+                   deshacer, actualizar_interfaz): el manejador solo y con el
+                   refresco diferido forzado más el dibujo pendiente de Tk
+                   (mediana, p90 y máximo de --repeticiones llamadas)
+    bucle          durante --segundos con mainloop corriendo y una operación
+                   cada --cada ms, el atraso de un after() de --tic ms: lo
+                   que tardaría la interfaz en responder a un clic
+
+Sin DISPLAY levanta un Xvfb propio (si está instalado) o se puede correr
+dentro de uno: xvfb-run -s "-screen 0 1280x1024x24" python benchmarks/bench_gui.py
+
+El resultado sale en JSON (--salida, o la salida estándar) con el commit,
+las versiones de Python y Tk y la máquina, para comparar entre versiones;
+el resumen legible va a la salida de errores.
+
+Uso: python benchmarks/bench_gui.py [--tamaños 100,1000,10000,100000]
+                                   [--repeticiones 30] [--salida resultado.json]
+"""
+import argparse
+import collections
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tkinter as tk
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, Paciente
+from turnos import gui
+from turnos.gui import GestorTurnosApp
+
+TAMAÑOS = (100, 1000, 10_000, 100_000)
+LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def nombre(i):
+    """Nombre solo con letras (los campos de la interfaz no aceptan dígitos)"""
+    sufijo = ""
+    while True:
+        i, resto = divmod(i, len(LETRAS))
+        sufijo = LETRAS[resto] + sufijo
+        if not i:
+            break
+    return f"Paciente {sufijo.capitalize()}"
+
+
+def nuevo_paciente(i, azar):
+    return Paciente(nombre(i), "600000000", "01/01/2025", "09:00",
+                    azar.choice(ESPECIALIDADES), nivel=azar.randint(1, 5))
+
+
+class Dialogos:
+    """Reemplazo de los diálogos modales: responden al instante y cuentan
+    cuántas veces se abrió cada uno (por título)"""
+
+    def __init__(self):
+        self.respuesta = None   # lo que "escribe" el usuario en askstring
+        self.abiertos = collections.Counter()
+        self._originales = []
+
+    def _aviso(self, valor):
+        def dialogo(title=None, message=None, **opciones):
+            self.abiertos[title] += 1
+            return valor
+        return dialogo
+
+    def _pregunta(self, title=None, prompt=None, **opciones):
+        self.abiertos[title] += 1
+        return self.respuesta
+
+    def instalar(self):
+        reemplazos = [(gui.messagebox, "showinfo", self._aviso("ok")),
+                      (gui.messagebox, "showwarning", self._aviso("ok")),
+                      (gui.messagebox, "showerror", self._aviso("ok")),
+                      (gui.messagebox, "askyesno", self._aviso(True)),
+                      (gui.simpledialog, "askstring", self._pregunta),
+                      (gui.filedialog, "askopenfilename", self._aviso(""))]
+        for modulo, atributo, funcion in reemplazos:
+            self._originales.append((modulo, atributo, getattr(modulo, atributo)))
+            setattr(modulo, atributo, funcion)
+
+    def quitar(self):
+        for modulo, atributo, funcion in reversed(self._originales):
+            setattr(modulo, atributo, funcion)
+        self._originales = []
+
+    def __enter__(self):
+        self.instalar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.quitar()
+
+
+def iniciar_xvfb():
+    """Levantar un Xvfb en un display libre; retorna el proceso o None"""
+    if shutil.which("Xvfb") is None:
+        return None
+    lectura, escritura = os.pipe()
+    proceso = subprocess.Popen(["Xvfb", "-displayfd", str(escritura), "-screen", "0",
+                                "1280x1024x24", "-nolisten", "tcp"],
+                               pass_fds=(escritura,), stderr=subprocess.DEVNULL)
+    os.close(escritura)
+    with os.fdopen(lectura) as archivo:
+        numero = archivo.readline().strip()
+    if not numero:
+        proceso.terminate()
+        proceso.wait()
+        return None
+    os.environ["DISPLAY"] = f":{numero}"
+    return proceso
+
+
+def resumen(muestras):
+    """Mediana, p90 y máximo (ms) de una lista de segundos"""
+    ordenadas = sorted(muestras)
+    p90 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.9))]
+    return {"mediana_ms": round(statistics.median(ordenadas) * 1000, 4),
+            "p90_ms": round(p90 * 1000, 4),
+            "max_ms": round(ordenadas[-1] * 1000, 4)}
+
+
+def escribir(entry, texto):
+    """Tipear en un campo letra por letra (pasando por su validación)"""
+    entry.delete(0, tk.END)
+    for caracter in texto:
+        entry.insert(tk.END, caracter)
+
+
+def forzar_refresco(app):
+    """Correr ya el refresco diferido (si hay uno) y el dibujo pendiente de Tk"""
+    if app._refresco is not None:
+        app.root.after_cancel(app._refresco)
+        app._refrescar()
+    app.root.update_idletasks()
+
+
+def operaciones(app, dialogos, azar, tamaño):
+    """(nombre, preparar, operación) de cada manejador; preparar llena los
+    campos o la selección como lo haría el usuario y no se mide"""
+
+    def preparar_registro():
+        escribir(app.entry_paciente, "Paciente Nuevo")
+        escribir(app.entry_telefono, "600000000")
+        app.combo_especialidad.set(azar.choice(app.especialidades))
+
+    def preparar_cancelacion():
+        if app._orden_filas:
+            app.tree.selection_set(app._orden_filas[len(app._orden_filas) // 2])
+
+    def preparar_busqueda():
+        # Los del final de la carga: la peor posición para buscar
+        dialogos.respuesta = nombre(tamaño - 1 - azar.randrange(min(tamaño, 100)))
+
+    def preparar_consulta():
+        app.lista_sugerencias.selection_clear(0, tk.END)
+        escribir(app.entry_consultar, nombre(azar.randrange(tamaño)))
+
+    def preparar_sugerencias():
+        escribir(app.entry_consultar, nombre(azar.randrange(tamaño))[:-1])
+
+    def nada():
+        pass
+
+    return [
+        ("registrar_paciente", preparar_registro, app.registrar_paciente),
+        ("llamar_siguiente_paciente", nada, app.llamar_siguiente_paciente),
+        ("cancelar_turno_seleccionado", preparar_cancelacion, app.cancelar_turno_seleccionado),
+        ("buscar_paciente_dialog", preparar_busqueda, app.buscar_paciente_dialog),
+        ("consultar_tiempo_espera", preparar_consulta, app.consultar_tiempo_espera),
+        ("actualizar_sugerencias", preparar_sugerencias, app.actualizar_sugerencias),
+        ("scroll_rueda", nada, lambda: app._desplazar(3)),
+        ("scroll_pagina", nada, lambda: app._comando_scroll("scroll", 1, "pages")),
+        ("scroll_salto", nada, lambda: app._comando_scroll("moveto", azar.random())),
+        ("deshacer_ultima_operacion", nada, app.deshacer_ultima_operacion),
+        ("actualizar_interfaz", nada, app.actualizar_interfaz),
+    ]
+
+
+def medir_operacion(app, dialogos, preparar, operacion, repeticiones):
+    manejador = []
+    total = []
+    dialogos.abiertos.clear()
+    for _ in range(repeticiones):
+        preparar()
+        forzar_refresco(app)
+        inicio = time.perf_counter()
+        operacion()
+        medio = time.perf_counter()
+        forzar_refresco(app)
+        fin = time.perf_counter()
+        manejador.append(medio - inicio)
+        total.append(fin - inicio)
+    return {"manejador": resumen(manejador), "con_refresco": resumen(total),
+            "dialogos": dict(dialogos.abiertos)}
+
+
+def medir_bucle(app, dialogos, azar, tamaño, args):
+    """Atraso de los after() con mainloop corriendo y el usuario operando"""
+    atrasos = []
+    hechas = collections.Counter()
+    mezcla = [(nombre_op, preparar, operacion)
+              for nombre_op, preparar, operacion in operaciones(app, dialogos, azar, tamaño)
+              if nombre_op not in ("actualizar_interfaz", "deshacer_ultima_operacion")]
+    fin = time.perf_counter() + args.segundos
+
+    def tic(esperado):
+        ahora = time.perf_counter()
+        atrasos.append(max(0.0, ahora - esperado))
+        if ahora >= fin:
+            app.root.quit()
+            return
+        app.root.after(args.tic, tic, ahora + args.tic / 1000)
+
+    def operar():
+        if time.perf_counter() >= fin:
+            return
+        nombre_op, preparar, operacion = azar.choice(mezcla)
+        preparar()
+        operacion()
+        hechas[nombre_op] += 1
+        app.root.after(args.cada, operar)
+
+    app.root.after(args.tic, tic, time.perf_counter() + args.tic / 1000)
+    app.root.after(args.cada, operar)
+    app.root.mainloop()
+    return {"segundos": args.segundos, "tic_ms": args.tic, "cada_ms": args.cada,
+            "operaciones": sum(hechas.values()), "tics": len(atrasos),
+            "atraso": {**resumen(atrasos),
+                       "p99_ms": round(sorted(atrasos)[int(len(atrasos) * 0.99)] * 1000, 4)}}
+
+
+def medir_tamaño(tamaño, args):
+    azar = random.Random(args.semilla)
+    root = tk.Tk()
+    if args.oculta:
+        root.withdraw()
+    app = GestorTurnosApp(root)
+    root.update()
+
+    pacientes = [nuevo_paciente(i, azar) for i in range(tamaño)]
+    inicio = time.perf_counter()
+    app.cola_turnos.encolar_lote(pacientes)
+    cargada = time.perf_counter()
+    forzar_refresco(app)
+    fin = time.perf_counter()
+    resultado = {"tamaño": tamaño,
+                 "carga": {"encolar_lote_ms": round((cargada - inicio) * 1000, 3),
+                           "primer_refresco_ms": round((fin - cargada) * 1000, 3)},
+                 "operaciones": {}}
+
+    with Dialogos() as dialogos:
+        for nombre_op, preparar, operacion in operaciones(app, dialogos, azar, tamaño):
+            resultado["operaciones"][nombre_op] = medir_operacion(
+                app, dialogos, preparar, operacion, args.repeticiones)
+        if args.segundos > 0:
+            resultado["bucle"] = medir_bucle(app, dialogos, azar, tamaño, args)
+    root.destroy()
+    return resultado
+
+
+def commit():
+    """Commit del árbol medido (None si no es un repositorio git)"""
+    try:
+        salida = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip()
+
+
+def imprimir(resultado):
+    print(f"{resultado['tamaño']:,} turnos: encolar_lote "
+          f"{resultado['carga']['encolar_lote_ms']:.0f} ms, primer refresco "
+          f"{resultado['carga']['primer_refresco_ms']:.1f} ms", file=sys.stderr)
+    print(f"  {'operación':<30} {'manejador':>10} {'con refresco':>13} {'p90':>9} {'máx':>9}",
+          file=sys.stderr)
+    for nombre_op, medida in resultado["operaciones"].items():
+        print(f"  {nombre_op:<30} {medida['manejador']['mediana_ms']:>10.2f} "
+              f"{medida['con_refresco']['mediana_ms']:>13.2f} "
+              f"{medida['con_refresco']['p90_ms']:>9.2f} {medida['con_refresco']['max_ms']:>9.2f}",
+              file=sys.stderr)
+    if "bucle" in resultado:
+        bucle = resultado["bucle"]
+        print(f"  bucle: {bucle['operaciones']:,} operaciones en {bucle['segundos']:g} s, "
+              f"atraso de after() mediana {bucle['atraso']['mediana_ms']:.1f} ms, "
+              f"p99 {bucle['atraso']['p99_ms']:.1f} ms, máx {bucle['atraso']['max_ms']:.1f} ms",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tamaños", default=",".join(str(n) for n in TAMAÑOS),
+                        type=lambda texto: [int(n) for n in texto.split(",")])
+    parser.add_argument("--repeticiones", type=int, default=30, help="llamadas por operación")
+    parser.add_argument("--segundos", type=float, default=3,
+                        help="con mainloop corriendo, por tamaño (0: no medir el bucle)")
+    parser.add_argument("--cada", type=int, default=20, help="ms entre operaciones en el bucle")
+    parser.add_argument("--tic", type=int, default=5, help="ms del after() que mide el atraso")
+    parser.add_argument("--oculta", action="store_true",
+                        help="ventana retirada (Tk no dibuja la tabla)")
+    parser.add_argument("--salida", help="archivo JSON (por defecto, la salida estándar)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    xvfb = None
+    if not os.environ.get("DISPLAY"):
+        xvfb = iniciar_xvfb()
+        if xvfb is None:
+            parser.exit(2, "No hay DISPLAY ni Xvfb instalado; correr dentro de uno: "
+                           "xvfb-run python benchmarks/bench_gui.py\n")
+    try:
+        root = tk.Tk()
+        tk_version = root.call("info", "patchlevel")
+        root.destroy()
+        resultados = []
+        for tamaño in args.tamaños:
+            resultados.append(medir_tamaño(tamaño, args))
+            imprimir(resultados[-1])
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    informe = {"fecha": datetime.now().isoformat(timespec="seconds"),
+               "commit": commit(),
+               "python": platform.python_version(),
+               "tk": tk_version,
+               "plataforma": platform.platform(),
+               "cpus": os.cpu_count(),
+               "display": "Xvfb propio" if xvfb is not None else os.environ["DISPLAY"],
+               "ventana_oculta": args.oculta,
+               "parametros": {"repeticiones": args.repeticiones, "segundos": args.segundos,
+                              "cada_ms": args.cada, "tic_ms": args.tic, "semilla": args.semilla},
+               "resultados": resultados}
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, ensure_ascii=False, indent=2)
+    else:
+        json.dump(informe, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
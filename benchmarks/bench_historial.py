@@ -0,0 +1,130 @@
+"""Análisis del HistorialTurnos sobre meses de turnos.
+
+Genera --dias días de turnos (--por-dia por día, con horario de atención,
+esperas que crecen con el nivel de triage y un 10% de cancelados) y los
+escribe directo en las columnas del historial. Después mide, abriendo el
+historial en solo lectura como lo haría un reporte:
+    resumen               totales y percentiles de espera del período
+    percentiles filtrados una especialidad en el último mes
+    atendidos por hora    promedio por hora del día
+    por especialidad      percentiles de espera de cada especialidad
+y el costo de registrar() por turno (suscrito a la cola, escribiendo por lotes).
+
+Necesita NumPy.
+
+Uso: python benchmarks/bench_historial.py [--dias 180] [--por-dia 20000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.historial import (ARCHIVO_ESPECIALIDADES, CANCELADO, COLUMNAS, HistorialTurnos,
+                              _archivo_columna)
+
+
+def generar(directorio, dias, por_dia, semilla):
+    """Escribir las columnas de dias * por_dia turnos sintéticos"""
+    azar = numpy.random.default_rng(semilla)
+    filas = dias * por_dia
+    inicio = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1))
+    dia = numpy.repeat(numpy.arange(dias), por_dia)
+    # Llegadas de 8 a 18 h, más concentradas a media mañana
+    hora = numpy.clip(azar.normal(11.5, 2.5, filas), 8, 18)
+    registro = inicio + dia * 86400.0 + hora * 3600
+    nivel = azar.choice(numpy.arange(1, 6, dtype=numpy.uint8), filas,
+                        p=(0.03, 0.07, 0.4, 0.3, 0.2))
+    espera = azar.gamma(2.0, 4.0 * nivel, filas) * 60
+    columnas = {
+        'registro': registro,
+        'llamado': registro + espera,
+        'especialidad': azar.integers(0, len(ESPECIALIDADES), filas, dtype=numpy.uint16),
+        'nivel': nivel,
+        'resultado': (azar.random(filas) < 0.1).astype(numpy.uint8) * CANCELADO,
+    }
+    os.makedirs(directorio, exist_ok=True)
+    for nombre, _, tipo in COLUMNAS:
+        columnas[nombre].astype(tipo).tofile(os.path.join(directorio, _archivo_columna(nombre, tipo)))
+    with open(os.path.join(directorio, ARCHIVO_ESPECIALIDADES), 'w', encoding='utf-8') as archivo:
+        archivo.write("".join(especialidad + "\n" for especialidad in ESPECIALIDADES))
+    return filas
+
+
+def medir(funcion, repeticiones):
+    """Mejor tiempo (s) de varias corridas"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dias", type=int, default=180)
+    parser.add_argument("--por-dia", type=int, default=20_000, help="turnos por día (toda la red)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--eventos", type=int, default=100_000, help="turnos para medir registrar()")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="bench_historial_")
+    try:
+        inicio = time.perf_counter()
+        filas = generar(os.path.join(directorio, "red"), args.dias, args.por_dia, args.semilla)
+        megas = sum(os.path.getsize(os.path.join(directorio, "red", nombre))
+                    for nombre in os.listdir(os.path.join(directorio, "red"))) / 2**20
+        print(f"{filas:,} turnos en {args.dias} días ({megas:,.0f} MiB), "
+              f"generados en {time.perf_counter() - inicio:.1f} s")
+
+        historial = HistorialTurnos(os.path.join(directorio, "red"), solo_lectura=True)
+        ultimo_mes = float(historial.columnas()['llamado'][-1]) - 30 * 86400
+        casos = (
+            ("resumen", historial.resumen),
+            ("percentiles filtrados",
+             lambda: historial.percentiles_espera(especialidad="Cardiología", desde=ultimo_mes)),
+            ("atendidos por hora", historial.atendidos_por_hora),
+            ("por especialidad", historial.esperas_por_especialidad),
+        )
+        print(f"{'análisis':<24} {'mejor de ' + str(args.repeticiones):>12}")
+        for nombre, funcion in casos:
+            print(f"{nombre:<24} {medir(funcion, args.repeticiones) * 1000:>9.0f} ms")
+        print("espera (min):", historial.resumen()['espera'])
+
+        # registrar() suscrito a una cola, con y sin historial
+        pacientes = [Paciente(f"Paciente {i}", "600000000", "01/01/2025", "09:00",
+                              ESPECIALIDADES[i % len(ESPECIALIDADES)]) for i in range(args.eventos)]
+
+        def jornada(cola):
+            cola.encolar_lote(pacientes)
+            inicio = time.perf_counter()
+            while cola.desencolar() is not None:
+                pass
+            return time.perf_counter() - inicio
+
+        sin_historial = con_historial = None
+        with HistorialTurnos(os.path.join(directorio, "registrar")) as escritor:
+            for _ in range(args.repeticiones):
+                tiempo = jornada(ColaTurnos())
+                sin_historial = min(tiempo, sin_historial or tiempo)
+                cola = ColaTurnos()
+                cola.suscribir(escritor.registrar)
+                tiempo = jornada(cola)
+                con_historial = min(tiempo, con_historial or tiempo)
+        print(f"desencolar: {sin_historial / args.eventos * 1e6:.2f} µs sin historial, "
+              f"{con_historial / args.eventos * 1e6:.2f} µs registrando cada turno")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
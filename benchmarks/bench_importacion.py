@@ -0,0 +1,68 @@
+"""Benchmark de la importación masiva: genera una agenda CSV y JSONL de N filas
+(con ~1 % de filas inválidas) y mide cuánto tarda en encolarse.
+
+Uso: python benchmarks/bench_importacion.py [--filas N]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos
+from turnos.importacion import importar_archivo
+
+NOMBRES = ("Ana", "Luis", "María", "José", "Lucía", "Martín", "Sofía", "Tomás")
+APELLIDOS = ("Gómez", "Pérez", "Núñez", "Fernández", "López", "Díaz", "Rodríguez")
+
+
+def generar_filas(cantidad, azar):
+    for i in range(cantidad):
+        nombre = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}"
+        telefono = str(600000000 + i)
+        if azar.random() < 0.01:
+            telefono += "x"   # fila inválida
+        yield {
+            "nombre": nombre,
+            "telefono": telefono,
+            "fecha": "03/02/2025",
+            "hora": f"{8 + i % 10:02d}:{i % 60:02d}",
+            "especialidad": azar.choice(ESPECIALIDADES),
+            "emergencia": "si" if azar.random() < 0.05 else ""
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_csv = os.path.join(directorio, "agenda.csv")
+        ruta_jsonl = os.path.join(directorio, "agenda.jsonl")
+        filas = list(generar_filas(args.filas, random.Random(7)))
+        with open(ruta_csv, "w", encoding="utf-8", newline="") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=list(filas[0]))
+            escritor.writeheader()
+            escritor.writerows(filas)
+        with open(ruta_jsonl, "w", encoding="utf-8") as archivo:
+            for fila in filas:
+                archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+        for ruta in (ruta_csv, ruta_jsonl):
+            cola = ColaTurnos()
+            inicio = time.perf_counter()
+            reporte = importar_archivo(cola, ruta, ESPECIALIDADES)
+            segundos = time.perf_counter() - inicio
+            print(f"{os.path.basename(ruta):<14} {reporte.importados:>8} encolados "
+                  f"{len(reporte.errores):>6} errores  {segundos:6.2f} s "
+                  f"({reporte.filas / segundos:,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Inanición de los niveles bajos de triage, con y sin envejecimiento.
+
+Arranca con una cola de --cantidad pacientes (por defecto 10^5) de niveles
+3 a 5 y la mantiene en ese tamaño: llegan tantos pacientes por minuto como
+se atienden, casi todos de nivel 1 y 2 (--carga-alta). Sin envejecimiento
+el que espera en el nivel 5 solo avanza cuando no hay nadie más urgente,
+así que la espera máxima crece con la duración de la corrida. Con
+envejecimiento cada turno sube un nivel cada N minutos y la espera máxima
+se estabiliza.
+
+El reloj es manual (minutos simulados), así que los números no dependen
+de la máquina; los µs por operación sí.
+
+Uso: python benchmarks/bench_inanicion.py [--cantidad 100000] [--atenciones 100]
+         [--minutos 3000] [--carga-alta 0.9] [--envejecimiento 30] [--semilla 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ColaTurnos, Paciente
+
+INICIO = 1_700_000_000.0   # Epoch arbitraria para el reloj manual
+
+
+def correr(args, envejecimiento):
+    azar = random.Random(args.semilla)
+    ahora = [INICIO]
+    cola = ColaTurnos(envejecimiento, reloj=lambda: ahora[0])
+
+    def paciente(nivel, registro):
+        nuevo = Paciente("Paciente", "0", "01/01/2025", "08:00", "Medicina General", nivel=nivel)
+        nuevo.registro = registro
+        return nuevo
+
+    # Cola inicial: la espera ya acumulada, repartida en el tiempo que
+    # tardaría en atenderse
+    atraso = args.cantidad / args.atenciones * 60
+    cola.encolar_lote(paciente(azar.randint(3, 5), INICIO - atraso + atraso * i / args.cantidad)
+                      for i in range(args.cantidad))
+
+    # Llegadas de Poisson a la tasa de atención (la cola no crece ni baja)
+    tasa = args.atenciones / 60
+    proxima_llegada = INICIO + azar.expovariate(tasa)
+    proxima_atencion = INICIO + 60 / args.atenciones
+    fin = INICIO + args.minutos * 60
+    cortes = max(1, args.minutos // args.cortes)
+    siguiente_corte = INICIO + cortes * 60
+
+    espera_maxima = 0.0
+    espera_maxima_corte = 0.0
+    esperas_por_nivel = {}
+    tiempo_encolar = tiempo_desencolar = 0.0
+    encolados = desencolados = 0
+    filas = []
+
+    while ahora[0] < fin:
+        if proxima_llegada <= proxima_atencion:
+            ahora[0] = proxima_llegada
+            if azar.random() < args.carga_alta:
+                nivel = azar.randint(1, 2)
+            else:
+                nivel = azar.randint(3, 5)
+            nuevo = paciente(nivel, ahora[0])
+            inicio = time.perf_counter()
+            cola.encolar(nuevo)
+            tiempo_encolar += time.perf_counter() - inicio
+            encolados += 1
+            proxima_llegada += azar.expovariate(tasa)
+        else:
+            ahora[0] = proxima_atencion
+            inicio = time.perf_counter()
+            atendido = cola.desencolar()   # Incluye el envejecimiento pendiente
+            tiempo_desencolar += time.perf_counter() - inicio
+            desencolados += 1
+            proxima_atencion += 60 / args.atenciones
+            if atendido is not None:
+                espera = (ahora[0] - atendido.registro) / 60
+                espera_maxima = max(espera_maxima, espera)
+                espera_maxima_corte = max(espera_maxima_corte, espera)
+                anterior = esperas_por_nivel.get(atendido.nivel, 0.0)
+                esperas_por_nivel[atendido.nivel] = max(anterior, espera)
+
+        if ahora[0] >= siguiente_corte:
+            mas_antiguo = cola.registro_mas_antiguo()
+            edad = (ahora[0] - mas_antiguo.timestamp()) / 60 if mas_antiguo else 0.0
+            filas.append(((siguiente_corte - INICIO) / 60, cola.tamaño(),
+                          espera_maxima_corte, edad))
+            espera_maxima_corte = 0.0
+            siguiente_corte += cortes * 60
+
+    return {
+        'filas': filas,
+        'espera_maxima': espera_maxima,
+        'por_nivel': esperas_por_nivel,
+        'encolar_us': tiempo_encolar / max(1, encolados) * 1e6,
+        'desencolar_us': tiempo_desencolar / max(1, desencolados) * 1e6,
+    }
+
+
+def mostrar(titulo, resultado):
+    print(f"\n{titulo}")
+    print(f"{'minuto':>8} {'en cola':>9} {'espera máx. atendidos':>22} {'más antiguo en cola':>20}")
+    for minuto, tamaño, espera, edad in resultado['filas']:
+        print(f"{minuto:>8.0f} {tamaño:>9,} {espera:>18.0f} min {edad:>16.0f} min")
+    niveles = ", ".join(f"{nivel}: {espera:.0f}"
+                        for nivel, espera in sorted(resultado['por_nivel'].items()))
+    print(f"espera máxima: {resultado['espera_maxima']:.0f} min (por nivel asignado: {niveles})")
+    print(f"encolar {resultado['encolar_us']:.1f} µs - desencolar {resultado['desencolar_us']:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", type=int, default=100_000, help="pacientes en cola al empezar")
+    parser.add_argument("--atenciones", type=float, default=100, help="pacientes atendidos por minuto")
+    parser.add_argument("--minutos", type=int, default=3000, help="minutos simulados")
+    parser.add_argument("--carga-alta", type=float, default=0.9,
+                        help="proporción de llegadas de nivel 1 y 2")
+    parser.add_argument("--envejecimiento", type=float, default=30, help="minutos por nivel")
+    parser.add_argument("--cortes", type=int, default=10, help="filas de la tabla")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.cantidad:,} en cola, {args.atenciones:g} atenciones/min, "
+          f"{args.carga_alta:.0%} de llegadas de nivel 1-2, {args.minutos} minutos")
+    mostrar("Sin envejecimiento", correr(args, None))
+    mostrar(f"Con envejecimiento ({args.envejecimiento:g} min por nivel)",
+            correr(args, args.envejecimiento))
+
+
+if __name__ == "__main__":
+    main()
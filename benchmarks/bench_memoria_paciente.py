@@ -0,0 +1,91 @@
+"""Memoria por paciente: Paciente compacto (__slots__) contra el anterior
+(atributos en __dict__, cadenas nuevas para fecha/hora/especialidad y un
+datetime por registro).
+
+Mide con tracemalloc N pacientes sueltos y dentro de una ColaTurnos. Los
+datos se generan como llegan de la importación o del formulario: cada fila
+trae sus propias cadenas.
+
+Uso: python benchmarks/bench_memoria_paciente.py [--cantidad 1000000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+
+
+class PacienteAnterior:
+    """Paciente tal como era antes del cambio de representación"""
+    def __init__(self, nombre, telefono, fecha, hora, especialidad, es_emergencia=False):
+        self.nombre = nombre
+        self.telefono = telefono
+        self.fecha = fecha
+        self.hora = hora
+        self.especialidad = especialidad
+        self.es_emergencia = es_emergencia
+        self.hora_registro = datetime.now()
+        self.ticket = None
+
+    @property
+    def registro(self):
+        # Solo para que la cola actual pueda usarlo; no ocupa memoria por instancia
+        return self.hora_registro.timestamp()
+
+    @property
+    def nivel(self):
+        return 1 if self.es_emergencia else 3
+
+
+def filas(cantidad):
+    azar = random.Random(3)
+    for i in range(cantidad):
+        # encode/decode: una cadena nueva por fila, como al leer un CSV
+        yield (f"Paciente {i % 5000}", str(600000000 + i), f"{1 + i % 28:02d}/02/2025",
+               f"{8 + i % 10:02d}:{i % 60:02d}", azar.choice(ESPECIALIDADES).encode().decode(),
+               azar.random() < 0.1)
+
+
+def medir(clase, cantidad, en_cola):
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    pacientes = [clase(*fila) for fila in filas(cantidad)]
+    if en_cola:
+        cola = ColaTurnos()
+        cola.encolar_lote(pacientes)
+    duracion = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del pacientes
+    return memoria, duracion
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.cantidad:,} pacientes")
+    print(f"{'caso':<28} {'bytes/paciente':>15} {'total MB':>10} {'segundos':>9}")
+    for en_cola in (False, True):
+        resultados = {}
+        for clase in (PacienteAnterior, Paciente):
+            memoria, duracion = medir(clase, args.cantidad, en_cola)
+            resultados[clase] = memoria
+            caso = f"{clase.__name__}{' en ColaTurnos' if en_cola else ''}"
+            print(f"{caso:<28} {memoria / args.cantidad:>15.1f} {memoria / 2**20:>10.1f} {duracion:>9.2f}")
+        ahorro = resultados[PacienteAnterior] - resultados[Paciente]
+        print(f"{'  reducción':<28} {ahorro / args.cantidad:>15.1f} "
+              f"{ahorro / 2**20:>10.1f} {ahorro / resultados[PacienteAnterior]:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
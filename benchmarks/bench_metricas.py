@@ -0,0 +1,149 @@
+"""Costo de la instrumentación sobre una ColaTurnos grande.
+
+Cada variante (sin métricas, instrumentada como por defecto, con muestreo
+1/N, midiendo todo y con el perfilador por muestreo) corre en
+su propio proceso sobre su propia cola, armada igual. El proceso principal
+les pide por turnos bloques cortos de la misma mezcla de operaciones: así
+el ruido de la máquina se reparte entre todas. "sin métricas (otra vez)"
+es una segunda cola sin instrumentar; su diferencia con la primera da el
+ruido de la medición.
+
+Uso: python benchmarks/bench_metricas.py [--cantidad 100000] [--bloques 200]
+         [--por-bloque 2000] [--muestreo 16]
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.metricas import MUESTREO_POR_DEFECTO, PerfiladorMuestreo, Registro, instrumentar_cola
+
+# Peso de cada operación en la mezcla (parecida a la del servicio)
+MEZCLA = (('encolar', 30), ('desencolar', 25), ('cancelar_ticket', 5), ('buscar_ticket', 25),
+          ('buscar_paciente', 10), ('obtener_estadisticas', 5))
+
+
+def nuevo_paciente(i, azar):
+    return Paciente(f"Paciente {i % 5000}", "600000000", "01/01/2025", "09:00",
+                    azar.choice(ESPECIALIDADES), nivel=azar.randint(1, 5))
+
+
+def bloque(cola, plan, pacientes, tickets):
+    """Segundos para correr un bloque de operaciones"""
+    inicio = time.perf_counter()
+    for operacion, ticket in zip(plan, tickets):
+        if operacion == 'encolar':
+            cola.encolar(pacientes.pop())
+        elif operacion == 'desencolar':
+            cola.desencolar()
+        elif operacion == 'cancelar_ticket':
+            cola.cancelar_ticket(ticket)
+        elif operacion == 'buscar_ticket':
+            cola.buscar_ticket(ticket)
+        elif operacion == 'buscar_paciente':
+            cola.buscar_paciente(f"Paciente {ticket % 5000}")
+        else:
+            cola.obtener_estadisticas()
+    return time.perf_counter() - inicio
+
+
+def trabajador(conexion, cantidad, muestreo, perfilar, semilla):
+    """Arma su cola y corre los bloques que le pide el proceso principal"""
+    azar = random.Random(semilla)
+    cola = ColaTurnos()
+    cola.encolar_lote(nuevo_paciente(i, azar) for i in range(cantidad))
+    if muestreo is not None:
+        instrumentar_cola(cola, Registro(), muestreo=muestreo or MUESTREO_POR_DEFECTO)
+    perfilador = PerfiladorMuestreo(intervalo=0.005)
+    nombres = [operacion for operacion, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    gc.collect()
+    gc.disable()   # Las pasadas del recolector sobre la cola grande son puro ruido aquí
+    while True:
+        pedido = conexion.recv()
+        if pedido is None:
+            conexion.send(perfilador.muestras)
+            return
+        numero, por_bloque = pedido
+        # Todas las variantes reciben el mismo plan para el mismo bloque
+        azar = random.Random(numero)
+        plan = azar.choices(nombres, pesos, k=por_bloque)
+        pacientes = [nuevo_paciente(i, azar) for i in range(plan.count('encolar'))]
+        tickets = [azar.randrange(1, cola.siguiente_ticket) for _ in plan]
+        if perfilar:
+            perfilador.iniciar()
+        try:
+            conexion.send(bloque(cola, plan, pacientes, tickets))
+        finally:
+            perfilador.detener()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", type=int, default=100_000, help="turnos en cola al empezar")
+    parser.add_argument("--bloques", type=int, default=200, help="bloques por variante")
+    parser.add_argument("--por-bloque", type=int, default=2000, help="operaciones por bloque")
+    parser.add_argument("--muestreo", type=int, default=16, help="1 de cada N llamadas medidas")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    # (nombre, muestreo, perfilar): muestreo None es sin instrumentar y 0
+    # la instrumentación por defecto
+    variantes = (("sin métricas", None, False),
+                 ("sin métricas (otra vez)", None, False),
+                 (f"por defecto (1/{MUESTREO_POR_DEFECTO})", 0, False),
+                 (f"muestreo 1/{args.muestreo}", args.muestreo, False),
+                 ("todas las llamadas", 1, False),
+                 ("por defecto + perfilador 5 ms", 0, True))
+    contexto = multiprocessing.get_context()
+    conexiones = {}
+    procesos = []
+    for nombre, muestreo, perfilar in variantes:
+        conexiones[nombre], extremo = contexto.Pipe()
+        proceso = contexto.Process(target=trabajador, daemon=True,
+                                   args=(extremo, args.cantidad, muestreo, perfilar, args.semilla))
+        proceso.start()
+        procesos.append(proceso)
+    tiempos = {nombre: 0.0 for nombre, _, _ in variantes}
+
+    for numero in range(args.bloques):
+        # Rotar el orden: ninguna variante corre siempre primero
+        rotacion = numero % len(variantes)
+        for nombre, _, _ in variantes[rotacion:] + variantes[:rotacion]:
+            conexiones[nombre].send((args.semilla * args.bloques + numero, args.por_bloque))
+            tiempos[nombre] += conexiones[nombre].recv()
+    muestras = 0
+    for nombre, _, _ in variantes:
+        conexiones[nombre].send(None)
+        muestras += conexiones[nombre].recv()
+    for proceso in procesos:
+        proceso.join()
+
+    operaciones = args.bloques * args.por_bloque
+    base = tiempos["sin métricas"]
+    print(f"{args.cantidad:,} turnos en cola, {operaciones:,} operaciones por variante "
+          f"en bloques de {args.por_bloque:,}")
+    print(f"{'variante':<34} {'µs/op':>8} {'sobrecosto':>11}")
+    for nombre, _, _ in variantes:
+        print(f"{nombre:<34} {tiempos[nombre] / operaciones * 1e6:>8.2f} "
+              f"{tiempos[nombre] / base - 1:>+11.1%}")
+    print(f"perfilador: {muestras:,} muestras")
+
+    azar = random.Random(args.semilla)
+    registro = Registro()
+    otra = ColaTurnos()
+    instrumentar_cola(otra, registro)
+    otra.encolar_lote(nuevo_paciente(i, azar) for i in range(1000))
+    inicio = time.perf_counter()
+    texto = registro.exportar()
+    print(f"exportar: {(time.perf_counter() - inicio) * 1000:.2f} ms ({len(texto.splitlines())} líneas)")
+
+
+if __name__ == "__main__":
+    main()
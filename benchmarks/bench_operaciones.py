@@ -0,0 +1,237 @@
+"""Benchmark de escalabilidad de las operaciones de ColaTurnos.
+
+Para cada tamaño de cola (por defecto 10^2 a 10^6) arma una cola con la
+proporción de emergencias y la distribución de nombres elegidas, y mide
+cada operación: tiempo medio por llamada y pico de memoria (tracemalloc)
+de esa misma operación. Los resultados se guardan en JSON junto con el
+commit, y --comparar muestra el cociente contra una corrida anterior.
+
+Uso: python benchmarks/bench_operaciones.py [--tamaños 100,1000,...] [--emergencias 0.1]
+         [--nombres zipf|uniforme|unicos] [--sin-memoria] [--salida archivo.json]
+         [--comparar anterior.json]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+
+NOMBRES = ("Ana", "Luis", "María", "José", "Lucía", "Martín", "Sofía", "Tomás",
+           "Carmen", "Pablo", "Elena", "Diego", "Valeria", "Jorge", "Camila", "Andrés")
+APELLIDOS = ("Gómez", "Pérez", "Núñez", "Fernández", "López", "Díaz", "Rodríguez",
+             "Sánchez", "Romero", "Torres", "Ruiz", "Flores", "Castro", "Vargas")
+
+
+def generador_nombres(distribucion, azar):
+    """Nombres según la distribución: pocos muy repetidos (zipf), todos con
+    la misma frecuencia (uniforme) o todos distintos (unicos)"""
+    combinaciones = [f"{nombre} {apellido} {segundo}" for nombre in NOMBRES
+                     for apellido in APELLIDOS for segundo in APELLIDOS]
+    if distribucion == 'unicos':
+        contador = 0
+
+        def siguiente():
+            nonlocal contador
+            contador += 1
+            return f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {contador}"
+        return siguiente
+    if distribucion == 'uniforme':
+        return lambda: azar.choice(combinaciones)
+    pesos = [1 / (rango ** 1.1) for rango in range(1, len(combinaciones) + 1)]
+    acumulados = []
+    total = 0
+    for peso in pesos:
+        total += peso
+        acumulados.append(total)
+    return lambda: azar.choices(combinaciones, cum_weights=acumulados)[0]
+
+
+def generar_pacientes(cantidad, emergencias, nombre, azar):
+    return [Paciente(nombre(), str(600000000 + i), "03/02/2025", f"{8 + i % 10:02d}:{i % 60:02d}",
+                     azar.choice(ESPECIALIDADES), azar.random() < emergencias)
+            for i in range(cantidad)]
+
+
+def medir(funcion, argumentos):
+    """Segundos por llamada de funcion(argumento)"""
+    gc.collect()
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcion(argumento)
+    return (time.perf_counter() - inicio) / len(argumentos)
+
+
+def pico_memoria(funcion, argumentos):
+    """Pico de memoria (bytes) por encima de lo ya asignado al empezar"""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for argumento in argumentos:
+        funcion(argumento)
+    pico = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return pico
+
+
+def operaciones(cola, tamaño, extra, nombres, azar):
+    """Lista de (nombre, función, argumentos).
+
+    Primero las de lectura; las que modifican se cancelan entre sí para que
+    la cola se mantenga cerca del tamaño pedido.
+    """
+    repeticiones = max(1, min(1000, tamaño // 10))
+    pesadas = max(1, min(20, 100_000 // tamaño))   # Operaciones O(n)
+    tickets = [ticket for ticket, _ in cola.turnos()]
+    muestra_tickets = [azar.choice(tickets) for _ in range(repeticiones)]
+    muestra_nombres = [azar.choice(nombres) for _ in range(repeticiones)]
+    posiciones = [azar.randint(1, tamaño) for _ in range(repeticiones)]
+    cancelables = azar.sample(tickets, min(repeticiones, len(tickets)))
+    por_nombre = [azar.choice(nombres) for _ in range(repeticiones)]
+
+    return [
+        ('buscar_ticket', cola.buscar_ticket, muestra_tickets),
+        ('buscar_paciente', cola.buscar_paciente, muestra_nombres),
+        ('turno_en_posicion', cola.turno_en_posicion, posiciones),
+        ('iterar_turnos (50 filas)', lambda pos: list(cola.iterar_turnos(pos - 1, 50)), posiciones),
+        ('obtener_estadisticas', lambda _: cola.obtener_estadisticas(), range(repeticiones)),
+        ('obtener_lista_completa', lambda _: cola.obtener_lista_completa(), range(pesadas)),
+        ('encolar', cola.encolar, extra[:repeticiones]),
+        ('desencolar', lambda _: cola.desencolar(), range(repeticiones)),
+        ('desencolar (especialidad)', cola.desencolar,
+         [azar.choice(ESPECIALIDADES) for _ in range(repeticiones)]),
+        ('encolar_lote (1000)', cola.encolar_lote, [extra[repeticiones:repeticiones + 1000]]),
+        ('cancelar_ticket', cola.cancelar_ticket, cancelables),
+        ('cancelar_turno', cola.cancelar_turno, por_nombre),
+    ]
+
+
+def memoria_cola(tamaño, emergencias, distribucion, semilla):
+    """Bytes de una cola armada con `tamaño` pacientes (pacientes incluidos)"""
+    gc.collect()
+    tracemalloc.start()
+    azar = random.Random(semilla)
+    cola = ColaTurnos()
+    cola.encolar_lote(generar_pacientes(tamaño, emergencias,
+                                        generador_nombres(distribucion, azar), azar))
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memoria
+
+
+def correr(tamaño, emergencias, distribucion, semilla, con_memoria=True):
+    azar = random.Random(semilla)
+    nombre = generador_nombres(distribucion, azar)
+    pacientes = generar_pacientes(tamaño, emergencias, nombre, azar)
+
+    gc.collect()
+    cola = ColaTurnos()
+    inicio = time.perf_counter()
+    cola.encolar_lote(pacientes)
+    construir = time.perf_counter() - inicio
+    del pacientes
+
+    resultados = [{'tamaño': tamaño, 'operacion': 'construir (encolar_lote)', 'repeticiones': 1,
+                   'us_por_op': construir * 1e6}]
+    if con_memoria:
+        memoria = memoria_cola(tamaño, emergencias, distribucion, semilla)
+        resultados[0]['pico_kb'] = memoria / 1024
+        resultados[0]['bytes_por_paciente'] = memoria / tamaño
+
+    nombres = [paciente.nombre for _, paciente in cola.turnos()]
+    extra = generar_pacientes(2000, emergencias, nombre, azar)
+    estado_azar = azar.getstate()
+    for operacion, funcion, argumentos in operaciones(cola, tamaño, extra, nombres, azar):
+        argumentos = list(argumentos)
+        if not argumentos:
+            continue
+        resultados.append({'tamaño': tamaño, 'operacion': operacion,
+                           'repeticiones': len(argumentos),
+                           'us_por_op': medir(funcion, argumentos) * 1e6})
+    if not con_memoria:
+        return resultados
+
+    # Segunda pasada con las mismas operaciones (la cola quedó del mismo
+    # tamaño) para medir memoria sin que tracemalloc distorsione los tiempos
+    azar.setstate(estado_azar)
+    nombres = [paciente.nombre for _, paciente in cola.turnos()]
+    por_operacion = {resultado['operacion']: resultado for resultado in resultados}
+    for operacion, funcion, argumentos in operaciones(cola, tamaño, extra, nombres, azar):
+        argumentos = list(argumentos)
+        if argumentos:
+            por_operacion[operacion]['pico_kb'] = pico_memoria(funcion, argumentos) / 1024
+    return resultados
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(resultados, anteriores):
+    clave_anterior = {(r['tamaño'], r['operacion']): r for r in anteriores}
+    print(f"{'tamaño':>9} {'operación':<28} {'reps':>6} {'µs/op':>12} {'pico KB':>10}"
+          + (f" {'vs anterior':>12}" if anteriores else ""))
+    for resultado in resultados:
+        linea = (f"{resultado['tamaño']:>9,} {resultado['operacion']:<28} {resultado['repeticiones']:>6} "
+                 f"{resultado['us_por_op']:>12.2f} {resultado.get('pico_kb', float('nan')):>10.1f}")
+        anterior = clave_anterior.get((resultado['tamaño'], resultado['operacion']))
+        if anterior:
+            linea += f" {resultado['us_por_op'] / anterior['us_por_op']:>11.2f}x"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamaños", default="100,1000,10000,100000,1000000",
+                        type=lambda texto: [int(n) for n in texto.split(",")])
+    parser.add_argument("--emergencias", type=float, default=0.1,
+                        help="proporción de emergencias (por defecto 0.1)")
+    parser.add_argument("--nombres", choices=("zipf", "uniforme", "unicos"), default="zipf",
+                        help="distribución de nombres (por defecto zipf: apellidos frecuentes)")
+    parser.add_argument("--semilla", type=int, default=11)
+    parser.add_argument("--sin-memoria", action="store_true",
+                        help="solo tiempos (sin las pasadas con tracemalloc)")
+    parser.add_argument("--salida", default="bench_operaciones.json")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    anteriores = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anteriores = json.load(archivo)['resultados']
+
+    resultados = []
+    for tamaño in args.tamaños:
+        resultados.extend(correr(tamaño, args.emergencias, args.nombres, args.semilla,
+                                 not args.sin_memoria))
+    imprimir(resultados, anteriores)
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump({
+            'commit': commit_actual(),
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'parametros': {'emergencias': args.emergencias, 'nombres': args.nombres,
+                           'semilla': args.semilla},
+            'resultados': resultados
+        }, archivo, ensure_ascii=False, indent=1)
+    print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark del refresco de la tabla tras un único encolar/desencolar.
+
+Mide cuánto tarda GestorTurnosApp.actualizar_interfaz después de un solo
+cambio con la cola ya cargada. Con el refresco incremental el costo debe
+mantenerse plano entre 100 y 50.000 filas.
+
+Requiere un display (en servidores: xvfb-run python benchmarks/bench_refresco_tabla.py).
+"""
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import Paciente
+from turnos.gui import GestorTurnosApp
+
+TAMAÑOS = (100, 1000, 10000, 50000)
+REPETICIONES = 50
+
+
+def nuevo_paciente(i):
+    return Paciente(f"Paciente {i}", "600000000", "01/01/2025", "09:00",
+                    "Medicina General", es_emergencia=(i % 10 == 0))
+
+
+def medir(app, operacion):
+    """Tiempo (ms) de operacion() + actualizar_interfaz() + idle de Tk"""
+    tiempos = []
+    for _ in range(REPETICIONES):
+        operacion()
+        inicio = time.perf_counter()
+        app.actualizar_interfaz()
+        app.root.update_idletasks()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    print(f"{'filas':>8} {'encolar (ms)':>14} {'desencolar (ms)':>16}")
+    for tamaño in TAMAÑOS:
+        root = tk.Tk()
+        root.withdraw()
+        app = GestorTurnosApp(root)
+        
+        # Carga inicial fuera de la medición
+        for i in range(tamaño):
+            app.cola_turnos.encolar(nuevo_paciente(i))
+        app.actualizar_interfaz()
+        root.update_idletasks()
+        
+        contador = [tamaño]
+        
+        def encolar_uno():
+            contador[0] += 1
+            app.cola_turnos.encolar(nuevo_paciente(contador[0]))
+        
+        t_encolar = medir(app, encolar_uno)
+        t_desencolar = medir(app, app.cola_turnos.desencolar)
+        print(f"{tamaño:>8} {t_encolar:>14.3f} {t_desencolar:>16.3f}")
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Escalado del CoordinadorSedes con la cantidad de procesos.
+
+Reparte --sedes colas de --cantidad turnos cada una entre 1, 2, 4, ...
+procesos trabajadores (hasta los núcleos de la máquina) y corre la misma
+mezcla de operaciones en lotes: cada ronda manda --por-lote operaciones
+por sede en una sola llamada a ejecutar(). Se compara con las mismas
+operaciones sobre colas locales, en el proceso principal.
+
+El coordinador arma y serializa los lotes en un solo hilo: con muchos
+procesos es esa parte (y no las colas) la que pone el techo.
+
+Uso: python benchmarks/bench_sedes.py [--sedes 8] [--cantidad 20000]
+         [--rondas 20] [--por-lote 500] [--procesos 1,2,4,8]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.sedes import CoordinadorSedes
+
+# Peso de cada operación en la mezcla: sedes con búsquedas por nombre
+MEZCLA = (('encolar', 30), ('desencolar', 25), ('buscar_ticket', 20),
+          ('buscar_paciente', 15), ('sugerir', 10))
+
+
+def nuevo_paciente(i, azar):
+    return Paciente(f"Paciente {i % 5000}", "600000000", "01/01/2025", "09:00",
+                    azar.choice(ESPECIALIDADES), nivel=azar.randint(1, 5))
+
+
+def plan_de_rondas(args, sedes):
+    """Lotes de operaciones (sede, método, args), iguales para todas las variantes"""
+    azar = random.Random(args.semilla)
+    nombres = [operacion for operacion, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    rondas = []
+    for _ in range(args.rondas):
+        lote = []
+        for sede in sedes:
+            for operacion in azar.choices(nombres, pesos, k=args.por_lote):
+                if operacion == 'encolar':
+                    argumentos = (nuevo_paciente(azar.randrange(10**6), azar),)
+                elif operacion == 'desencolar':
+                    argumentos = ()
+                elif operacion == 'buscar_ticket':
+                    argumentos = (azar.randrange(1, args.cantidad),)
+                elif operacion == 'buscar_paciente':
+                    argumentos = (f"Paciente {azar.randrange(5000)}",)
+                else:
+                    argumentos = (f"Paciente {azar.randrange(500)}",)
+                lote.append((sede, operacion, argumentos))
+        rondas.append(lote)
+    return rondas
+
+
+def carga_inicial(args, sede):
+    azar = random.Random(f"{args.semilla}-{sede}")
+    return [nuevo_paciente(i, azar) for i in range(args.cantidad)]
+
+
+def correr_local(args, sedes, rondas):
+    colas = {}
+    for sede in sedes:
+        colas[sede] = ColaTurnos()
+        colas[sede].encolar_lote(carga_inicial(args, sede))
+    inicio = time.perf_counter()
+    for lote in rondas:
+        for sede, operacion, argumentos in lote:
+            getattr(colas[sede], operacion)(*argumentos)
+    return time.perf_counter() - inicio
+
+
+def correr_coordinado(args, sedes, rondas, procesos):
+    with CoordinadorSedes(sedes, procesos=procesos) as red:
+        red.ejecutar([(sede, 'encolar_lote', (carga_inicial(args, sede),)) for sede in sedes])
+        inicio = time.perf_counter()
+        for lote in rondas:
+            red.ejecutar(lote)
+        segundos = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        estadisticas = red.estadisticas()
+        combinar = time.perf_counter() - inicio
+    return segundos, combinar, estadisticas['total']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sedes", type=int, default=8)
+    parser.add_argument("--cantidad", type=int, default=20_000, help="turnos por sede al empezar")
+    parser.add_argument("--rondas", type=int, default=20)
+    parser.add_argument("--por-lote", type=int, default=500, help="operaciones por sede y ronda")
+    parser.add_argument("--procesos", default=None,
+                        help="lista separada por comas (por defecto potencias de 2 hasta los núcleos)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    if args.procesos:
+        variantes = [int(valor) for valor in args.procesos.split(",")]
+    else:
+        variantes = [1]
+        while variantes[-1] * 2 <= min(nucleos, args.sedes):
+            variantes.append(variantes[-1] * 2)
+
+    sedes = [f"Sede {numero + 1}" for numero in range(args.sedes)]
+    rondas = plan_de_rondas(args, sedes)
+    operaciones = sum(len(lote) for lote in rondas)
+    print(f"{args.sedes} sedes de {args.cantidad:,} turnos, {operaciones:,} operaciones "
+          f"en lotes de {args.por_lote} por sede ({nucleos} núcleos)")
+
+    local = correr_local(args, sedes, rondas)
+    print(f"{'variante':<14} {'ops/s':>10} {'aceleración':>12} {'estadísticas de la red':>24}")
+    print(f"{'local':<14} {operaciones / local:>10,.0f} {'':>12}")
+    base = None
+    for procesos in variantes:
+        segundos, combinar, total = correr_coordinado(args, sedes, rondas, procesos)
+        base = base or segundos
+        print(f"{f'{procesos} procesos':<14} {operaciones / segundos:>10,.0f} "
+              f"{base / segundos:>11.2f}x {combinar * 1000:>14.2f} ms ({total:,})")
+
+
+if __name__ == "__main__":
+    main()
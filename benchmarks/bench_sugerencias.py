@@ -0,0 +1,123 @@
+"""Latencia de ColaTurnos.sugerir con una cola grande.
+
+Llena la cola con --cantidad pacientes de nombres y apellidos hispanos
+combinados al azar (muchos homónimos, con y sin tildes) y mide, por tipo
+de consulta, la mediana, el percentil 99 y el máximo de sugerir:
+    prefijos     lo que se tipea letra por letra de un nombre en cola
+    sin tildes   el mismo nombre escrito sin tildes y en mayúsculas
+    con error    apellido o nombre completo con una letra cambiada, de menos
+                 o invertida (búsqueda aproximada)
+    con cambios  prefijos intercalados con altas y bajas (índice al día)
+La primera consulta tras llenar la cola arma el índice y se informa aparte.
+
+Uso: python benchmarks/bench_sugerencias.py [--cantidad 100000] [--consultas 2000]
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+
+NOMBRES = ("José", "María", "Juan", "Ana", "Luis", "Lucía", "Sofía", "Martín", "Inés",
+           "Raúl", "Andrés", "Mónica", "Tomás", "Julián", "Belén", "Jesús", "Rocío",
+           "Ramón", "Elena", "Pablo", "Carmen", "Héctor", "Iván", "Noelia", "Óscar")
+APELLIDOS = ("Gómez", "Pérez", "Rodríguez", "Fernández", "López", "Martínez", "García",
+             "Sánchez", "Díaz", "Álvarez", "Núñez", "Peña", "Muñoz", "Ibáñez", "Castro",
+             "Ortiz", "Rubio", "Marín", "Suárez", "Domínguez", "Vázquez", "Ríos", "Benítez",
+             "Gutiérrez", "Acuña", "Quiñones", "Herrera", "Medina", "Aguirre", "Ledesma")
+
+
+def nombre_al_azar(azar):
+    nombres = " ".join(azar.sample(NOMBRES, azar.choice((1, 1, 2))))
+    apellidos = " ".join(azar.sample(APELLIDOS, azar.choice((1, 2))))
+    return f"{nombres} {apellidos}"
+
+
+def sin_tildes(texto):
+    return texto.translate(str.maketrans("áéíóúÁÉÍÓÚñÑ", "aeiouAEIOUnN")).upper()
+
+
+def con_error(texto, azar):
+    i = azar.randrange(1, len(texto) - 1)
+    cambio = azar.choice(("cambiar", "quitar", "invertir"))
+    if cambio == "cambiar":
+        return texto[:i] + azar.choice("abcdefghijklmnopqrstuvwxyz") + texto[i + 1:]
+    if cambio == "quitar":
+        return texto[:i] + texto[i + 1:]
+    return texto[:i] + texto[i + 1] + texto[i] + texto[i + 2:]
+
+
+def medir(cola, consultas, entre=None):
+    """Milisegundos de cada consulta; `entre` corre antes de cada una sin medirse"""
+    tiempos = []
+    for consulta in consultas:
+        if entre is not None:
+            entre()
+        inicio = time.perf_counter()
+        cola.sugerir(consulta)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", type=int, default=100_000, help="pacientes en cola")
+    parser.add_argument("--consultas", type=int, default=2000, help="consultas por tipo")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    azar = random.Random(args.semilla)
+    cola = ColaTurnos()
+    inicio = time.perf_counter()
+    cola.encolar_lote(Paciente(nombre_al_azar(azar), "600000000", "01/01/2025", "09:00",
+                               azar.choice(ESPECIALIDADES)) for _ in range(args.cantidad))
+    encolar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    cola.sugerir("a")
+    armado = time.perf_counter() - inicio
+    en_cola = [paciente.nombre for _, paciente in cola.turnos()]
+
+    # Lo que se tipea: cada prefijo de un nombre en cola, desde 2 letras
+    prefijos = []
+    while len(prefijos) < args.consultas:
+        nombre = azar.choice(en_cola)
+        prefijos.extend(nombre[:largo] for largo in range(2, len(nombre) + 1))
+    prefijos = prefijos[:args.consultas]
+    completos = [azar.choice(en_cola) for _ in range(args.consultas)]
+    apellidos = [nombre.split(" ")[-1] for nombre in completos]
+
+    def alta_y_baja():
+        cola.encolar(Paciente(nombre_al_azar(azar), "600000000", "01/01/2025", "09:00",
+                              azar.choice(ESPECIALIDADES)))
+        cola.desencolar()
+
+    gc.collect()
+    gc.disable()   # Una pasada del recolector sobre la cola grande se llevaría el máximo
+    try:
+        casos = (
+            ("prefijos", medir(cola, prefijos)),
+            ("sin tildes", medir(cola, [sin_tildes(nombre) for nombre in completos])),
+            ("apellido con error", medir(cola, [con_error(apellido, azar) for apellido in apellidos])),
+            ("nombre con error", medir(cola, [con_error(nombre, azar) for nombre in completos])),
+            ("prefijos con cambios", medir(cola, prefijos, alta_y_baja)),
+        )
+    finally:
+        gc.enable()
+
+    print(f"{args.cantidad:,} pacientes en cola ({len(set(en_cola)):,} nombres distintos), "
+          f"encolados en {encolar:.2f} s; armado del índice: {armado * 1000:.0f} ms")
+    print(f"{'consulta':<22} {'mediana':>9} {'p99':>9} {'máximo':>9}   (ms)")
+    for nombre, tiempos in casos:
+        tiempos.sort()
+        p99 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))]
+        print(f"{nombre:<22} {statistics.median(tiempos):>9.3f} {p99:>9.3f} {tiempos[-1]:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Tablero compartido con decenas de pantallas leyendo a la vez.
+
+Sobre tres colas iguales de --cantidad turnos (sin tablero, publicando
+cada cambio y juntando cambios cada --espera segundos) se corre la misma
+mezcla de operaciones en bloques intercalados y se compara el tiempo por
+operación del escritor; también se mide leer() sin competencia. Después
+se lanzan --lectores procesos de pantalla mientras el proceso de la cola sigue operando
+--segundos, una vez por cada valor de --frecuencias (refrescos por segundo
+de cada pantalla, que lee solo si cambió la secuencia; 0 es leer sin
+pausa, el peor caso), y se informa:
+    lecturas      por segundo (todas las pantallas) y µs por leer()
+    reintentos    lecturas que encontraron al escritor a mitad (seqlock)
+    inconsistentes vistas donde la suma de las especialidades no da el
+                  total: tiene que ser 0
+    escritor      µs por operación con las pantallas leyendo
+
+Uso: python benchmarks/bench_tablero.py [--cantidad 100000] [--lectores 32] [--segundos 5]
+                                       [--frecuencias 30,0]
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.tablero import LectorTablero, TableroTurnos
+
+MEZCLA = (('encolar', 40), ('desencolar', 40), ('cancelar_ticket', 20))
+
+
+def nuevo_paciente(i, azar):
+    return Paciente(f"Paciente {i % 5000}", "600000000", "01/01/2025", "09:00",
+                    azar.choice(ESPECIALIDADES), nivel=azar.randint(1, 5))
+
+
+def plan(azar, cantidad, operaciones):
+    nombres = [operacion for operacion, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    return [(operacion, azar.randrange(1, cantidad))
+            for operacion in azar.choices(nombres, pesos, k=operaciones)]
+
+
+def copiar(pacientes):
+    return [Paciente(p.nombre, p.telefono, p.fecha, p.hora, p.especialidad, nivel=p.nivel)
+            for p in pacientes]
+
+
+def correr(cola, pasos, pacientes):
+    inicio = time.perf_counter()
+    for (operacion, ticket), paciente in zip(pasos, pacientes):
+        if operacion == 'encolar':
+            cola.encolar(paciente)
+        elif operacion == 'desencolar':
+            cola.desencolar()
+        else:
+            cola.cancelar_ticket(ticket)
+    return time.perf_counter() - inicio
+
+
+def medir(funcion, repeticiones=1000):
+    """Tiempo medio (s) de una llamada"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def pantalla(ruta, frecuencia, listo, fin, resultados):
+    """Proceso lector: refrescar `frecuencia` veces por segundo (0: sin pausa)
+    hasta `fin`"""
+    lector = LectorTablero(ruta)
+    lecturas = reintentos = inconsistentes = 0
+    tiempo = 0.0
+    ultima = None
+    listo.wait()
+    while not fin.is_set():
+        if frecuencia:
+            time.sleep(1 / frecuencia)
+            if lector.secuencia() == ultima:
+                continue
+        inicio = time.perf_counter()
+        vista = lector.leer(intentos=1)
+        tiempo += time.perf_counter() - inicio
+        if vista is None:
+            reintentos += 1
+            continue
+        lecturas += 1
+        ultima = vista['secuencia']
+        if sum(datos['total'] for datos in vista['por_especialidad'].values()) != vista['total']:
+            inconsistentes += 1
+    lector.cerrar()
+    resultados.put((lecturas, reintentos, inconsistentes, tiempo))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", type=int, default=100_000, help="turnos en cola")
+    parser.add_argument("--lectores", type=int, default=32, help="procesos de pantalla")
+    parser.add_argument("--segundos", type=float, default=5, help="por frecuencia")
+    parser.add_argument("--frecuencias", default="30,0",
+                        type=lambda texto: [float(n) for n in texto.split(",")],
+                        help="refrescos por segundo de cada pantalla (0: sin pausa)")
+    parser.add_argument("--espera", type=float, default=0.05,
+                        help="espera_maxima del tablero que junta cambios (s)")
+    parser.add_argument("--bloques", type=int, default=20)
+    parser.add_argument("--por-bloque", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    azar = random.Random(args.semilla)
+    directorio = tempfile.mkdtemp(prefix="bench_tablero_",
+                                  dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    ruta = os.path.join(directorio, "tablero")
+    try:
+        iniciales = [nuevo_paciente(i, azar) for i in range(args.cantidad)]
+        nombres = ['sin tablero', 'cada cambio', f'cada {args.espera * 1000:g} ms']
+        colas = {}
+        for nombre in nombres:
+            colas[nombre] = ColaTurnos()
+            colas[nombre].encolar_lote(copiar(iniciales))
+        publicada = colas['cada cambio']
+        tablero = TableroTurnos(ruta, publicada)
+        juntado = TableroTurnos(os.path.join(directorio, "juntado"), colas[nombres[2]],
+                                espera_maxima=args.espera)
+
+        # Costo del escritor: misma mezcla en las tres colas, bloques rotados
+        tiempos = dict.fromkeys(nombres, 0.0)
+        gc.collect()
+        gc.disable()
+        try:
+            for numero in range(args.bloques):
+                pasos = plan(azar, publicada.siguiente_ticket, args.por_bloque)
+                pacientes = [nuevo_paciente(i, azar) for i in range(len(pasos))]
+                orden = nombres[numero % 3:] + nombres[:numero % 3]
+                for nombre in orden:
+                    tiempos[nombre] += correr(colas[nombre], pasos, copiar(pacientes))
+        finally:
+            gc.enable()
+        juntado.cerrar()
+        operaciones = args.bloques * args.por_bloque
+        print(f"{args.cantidad:,} turnos en cola, {operaciones:,} operaciones, "
+              f"{os.path.getsize(ruta):,} bytes de tablero")
+        base = tiempos['sin tablero']
+        for nombre, segundos in tiempos.items():
+            print(f"  {nombre:<16} {segundos / operaciones * 1e6:>7.2f} µs/op {segundos / base - 1:>+8.1%}")
+
+        with LectorTablero(ruta) as lector:
+            sola = min(medir(lector.leer) for _ in range(5))
+        print(f"leer() sin otros procesos: {sola * 1e6:.1f} µs")
+
+        # Pantallas leyendo mientras la cola sigue operando
+        contexto = multiprocessing.get_context("fork")
+        for frecuencia in args.frecuencias:
+            listo = contexto.Event()
+            fin = contexto.Event()
+            resultados = contexto.Queue()
+            procesos = [contexto.Process(target=pantalla,
+                                         args=(ruta, frecuencia, listo, fin, resultados))
+                        for _ in range(args.lectores)]
+            for proceso in procesos:
+                proceso.start()
+            listo.set()
+            operadas = 0
+            escritor = 0.0
+            limite = time.monotonic() + args.segundos
+            while time.monotonic() < limite:
+                pasos = plan(azar, publicada.siguiente_ticket, 100)
+                pacientes = [nuevo_paciente(i, azar) for i in range(len(pasos))]
+                escritor += correr(publicada, pasos, pacientes)
+                operadas += len(pasos)
+            fin.set()
+            totales = [resultados.get() for _ in procesos]
+            for proceso in procesos:
+                proceso.join()
+
+            lecturas = sum(r[0] for r in totales)
+            reintentos = sum(r[1] for r in totales)
+            inconsistentes = sum(r[2] for r in totales)
+            tiempo_lectura = sum(r[3] for r in totales)
+            ritmo = f"{frecuencia:g} refrescos/s" if frecuencia else "sin pausa"
+            print(f"{args.lectores} pantallas ({ritmo}), {args.segundos:g} s, {os.cpu_count()} CPU:")
+            print(f"  lecturas        {lecturas:,} ({lecturas / args.segundos:,.0f}/s, "
+                  f"{tiempo_lectura / max(lecturas + reintentos, 1) * 1e6:.1f} µs por leer())")
+            print(f"  reintentos      {reintentos:,} ({reintentos / max(lecturas + reintentos, 1):.3%})")
+            print(f"  inconsistentes  {inconsistentes}")
+            print(f"  escritor        {operadas:,} operaciones, "
+                  f"{escritor / max(operadas, 1) * 1e6:.2f} µs/op con las pantallas leyendo")
+        tablero.cerrar()
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
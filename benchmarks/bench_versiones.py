@@ -0,0 +1,148 @@
+"""Costo de VersionesCola: versiones O(1), memoria de las últimas mil y deshacer.
+
+Sobre dos colas iguales de --cantidad turnos (una con VersionesCola) se
+corre la misma mezcla de operaciones en bloques intercalados y se compara
+el tiempo por operación. Después se mide:
+    versión        tomar la versión actual contra copiar el orden de la cola
+    recorrido      recorrer una versión contra recorrer la cola viva
+    memoria        lo que ocupan las --guardadas versiones anteriores
+                   (tracemalloc), contra una copia completa por versión
+    deshacer       µs por operación deshecha
+
+Uso: python benchmarks/bench_versiones.py [--cantidad 100000] [--guardadas 1000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, ColaTurnos, Paciente
+from turnos.versiones import VersionesCola
+
+MEZCLA = (('encolar', 40), ('desencolar', 40), ('cancelar_ticket', 20))
+
+
+def nuevo_paciente(i, azar):
+    return Paciente(f"Paciente {i % 5000}", "600000000", "01/01/2025", "09:00",
+                    azar.choice(ESPECIALIDADES), nivel=azar.randint(1, 5))
+
+
+def plan(azar, cantidad, operaciones):
+    nombres = [operacion for operacion, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    return [(operacion, azar.randrange(1, cantidad))
+            for operacion in azar.choices(nombres, pesos, k=operaciones)]
+
+
+def correr(cola, pasos, pacientes):
+    inicio = time.perf_counter()
+    for (operacion, ticket), paciente in zip(pasos, pacientes):
+        if operacion == 'encolar':
+            cola.encolar(paciente)
+        elif operacion == 'desencolar':
+            cola.desencolar()
+        else:
+            cola.cancelar_ticket(ticket)
+    return time.perf_counter() - inicio
+
+
+def mejor(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cantidad", type=int, default=100_000, help="turnos en cola")
+    parser.add_argument("--guardadas", type=int, default=1000, help="versiones para deshacer")
+    parser.add_argument("--bloques", type=int, default=40)
+    parser.add_argument("--por-bloque", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    azar = random.Random(args.semilla)
+    iniciales = [nuevo_paciente(i, azar) for i in range(args.cantidad)]
+    simple = ColaTurnos()
+    simple.encolar_lote(iniciales)
+    con_versiones = ColaTurnos()
+    con_versiones.encolar_lote([Paciente(p.nombre, p.telefono, p.fecha, p.hora, p.especialidad,
+                                         nivel=p.nivel) for p in iniciales])
+    inicio = time.perf_counter()
+    versiones = VersionesCola(con_versiones, maximo=args.guardadas)
+    armado = time.perf_counter() - inicio
+
+    # Misma mezcla en las dos colas, en bloques intercalados
+    tiempos = {'sin versiones': 0.0, 'con versiones': 0.0}
+    gc.collect()
+    gc.disable()
+    try:
+        for numero in range(args.bloques):
+            pasos = plan(azar, simple.siguiente_ticket, args.por_bloque)
+            pacientes = [nuevo_paciente(i, azar) for i in range(len(pasos))]
+            copias = [Paciente(p.nombre, p.telefono, p.fecha, p.hora, p.especialidad,
+                               nivel=p.nivel) for p in pacientes]
+            orden = [('sin versiones', simple, pacientes), ('con versiones', con_versiones, copias)]
+            for nombre, cola, lote in (orden if numero % 2 else orden[::-1]):
+                tiempos[nombre] += correr(cola, pasos, lote)
+    finally:
+        gc.enable()
+    operaciones = args.bloques * args.por_bloque
+    print(f"{args.cantidad:,} turnos en cola, {operaciones:,} operaciones "
+          f"(copia inicial de la cola en {armado * 1000:.0f} ms)")
+    base = tiempos['sin versiones']
+    for nombre, segundos in tiempos.items():
+        print(f"  {nombre:<16} {segundos / operaciones * 1e6:>7.2f} µs/op {segundos / base - 1:>+8.1%}")
+
+    tomar = mejor(versiones.actual) * 1e6
+    copiar = mejor(lambda: list(con_versiones.turnos()))
+    print(f"versión: {tomar:.2f} µs; copiar el orden de la cola: {copiar * 1000:.1f} ms")
+    version = versiones.actual()
+    recorrer_version = mejor(lambda: sum(1 for _ in version.turnos()))
+    recorrer_cola = mejor(lambda: sum(1 for _ in con_versiones.turnos()))
+    print(f"recorrido: versión {recorrer_version * 1000:.1f} ms, cola viva {recorrer_cola * 1000:.1f} ms")
+
+    # Memoria de las versiones guardadas: lo que se libera al olvidarlas
+    # (tracemalloc solo ve lo reservado mientras mide)
+    versiones.olvidar()
+    pasos = plan(azar, con_versiones.siguiente_ticket, args.guardadas)
+    pacientes = [nuevo_paciente(i, azar) for i in range(len(pasos))]
+    gc.collect()
+    tracemalloc.start()
+    correr(con_versiones, pasos, pacientes)
+    guardadas = len(versiones)
+    antes = tracemalloc.get_traced_memory()[0]
+    versiones.olvidar()
+    gc.collect()
+    despues = tracemalloc.get_traced_memory()[0]
+    copia = list(con_versiones.turnos())
+    una_copia = tracemalloc.get_traced_memory()[0] - despues
+    del copia
+    tracemalloc.stop()
+    retenido = antes - despues
+    print(f"memoria de {guardadas:,} versiones anteriores: {retenido / 2**20:.2f} MiB "
+          f"({retenido / max(guardadas, 1) / 1024:.2f} KiB por versión); "
+          f"una copia completa de la cola: {una_copia / 2**20:.2f} MiB "
+          f"(x{guardadas:,} = {una_copia * guardadas / 2**30:.1f} GiB)")
+
+    # Deshacer: generar operaciones nuevas y deshacerlas todas
+    pasos = plan(azar, con_versiones.siguiente_ticket, args.guardadas)
+    correr(con_versiones, pasos, [nuevo_paciente(i, azar) for i in range(len(pasos))])
+    guardadas = len(versiones)
+    inicio = time.perf_counter()
+    versiones.deshacer(guardadas)
+    deshacer = time.perf_counter() - inicio
+    print(f"deshacer {guardadas:,} operaciones: {deshacer * 1000:.1f} ms "
+          f"({deshacer / max(guardadas, 1) * 1e6:.1f} µs por operación)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Prueba de carga del servicio HTTP/JSON (turnos.servicio).
+
+Levanta el servicio en un proceso aparte (o usa --url de uno ya levantado)
+y abre N clientes concurrentes, cada uno con su conexión keep-alive, que
+mezclan encolar, consultar posición, estadísticas y llamar al siguiente.
+Reporta throughput y latencias p50/p99 por operación y, aparte, el costo
+por operación usando el endpoint de lotes.
+
+Uso: python benchmarks/carga_servicio.py [--clientes 50,200,500] [--peticiones 100] [--url http://host:puerto]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from turnos import ESPECIALIDADES
+
+
+class Cliente:
+    """Cliente HTTP/1.1 mínimo sobre una conexión keep-alive"""
+    def __init__(self, lector, escritor):
+        self.lector = lector
+        self.escritor = escritor
+
+    @classmethod
+    async def conectar(cls, host, puerto):
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        return cls(lector, escritor)
+
+    async def pedir(self, metodo, ruta, datos=None):
+        cuerpo = b"" if datos is None else json.dumps(datos).encode('utf-8')
+        self.escritor.write((f"{metodo} {ruta} HTTP/1.1\r\nHost: turnos\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(cuerpo)}\r\n\r\n").encode('latin-1') + cuerpo)
+        await self.escritor.drain()
+
+        cabecera = await self.lector.readuntil(b"\r\n\r\n")
+        lineas = cabecera.decode('latin-1').split("\r\n")
+        estado = int(lineas[0].split(" ", 2)[1])
+        largo = 0
+        for linea in lineas[1:]:
+            if linea.lower().startswith("content-length:"):
+                largo = int(linea.split(":", 1)[1])
+        return estado, json.loads(await self.lector.readexactly(largo))
+
+    def cerrar(self):
+        self.escritor.close()
+
+
+def _paciente(azar):
+    return {'nombre': "Paciente Carga", 'telefono': str(azar.randrange(10**8, 10**9)),
+            'especialidad': azar.choice(ESPECIALIDADES), 'emergencia': azar.random() < 0.1}
+
+
+async def cliente_mixto(host, puerto, indice, peticiones, latencias):
+    """Sesión típica de recepción/sala: mayormente encolar y consultar"""
+    azar = random.Random(indice)
+    cliente = await Cliente.conectar(host, puerto)
+    tickets = []
+    try:
+        for _ in range(peticiones):
+            sorteo = azar.random()
+            if sorteo < 0.4 or not tickets:
+                operacion = 'encolar'
+                inicio = time.perf_counter()
+                estado, datos = await cliente.pedir("POST", "/turnos", _paciente(azar))
+                if estado == 201:
+                    tickets.append(datos['ticket'])
+            elif sorteo < 0.75:
+                operacion = 'posicion'
+                inicio = time.perf_counter()
+                estado, _ = await cliente.pedir("GET", f"/turnos/{azar.choice(tickets)}")
+            elif sorteo < 0.9:
+                operacion = 'estadisticas'
+                inicio = time.perf_counter()
+                estado, _ = await cliente.pedir("GET", "/estadisticas")
+            else:
+                operacion = 'siguiente'
+                inicio = time.perf_counter()
+                estado, _ = await cliente.pedir("POST", "/turnos/siguiente",
+                                                {'especialidad': azar.choice(ESPECIALIDADES)})
+            latencias.setdefault(operacion, []).append(time.perf_counter() - inicio)
+            if estado >= 500:
+                raise RuntimeError(f"Error del servidor en {operacion}: {estado}")
+    finally:
+        cliente.cerrar()
+
+
+async def cliente_lotes(host, puerto, indice, lotes, tamaño, latencias):
+    azar = random.Random(indice)
+    cliente = await Cliente.conectar(host, puerto)
+    try:
+        for _ in range(lotes):
+            operaciones = [dict(_paciente(azar), op='encolar') for _ in range(tamaño)]
+            inicio = time.perf_counter()
+            estado, _ = await cliente.pedir("POST", "/lote", operaciones)
+            latencias.setdefault('lote', []).append(time.perf_counter() - inicio)
+            if estado != 200:
+                raise RuntimeError(f"Lote rechazado: {estado}")
+    finally:
+        cliente.cerrar()
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def ronda(host, puerto, clientes, tarea, *args):
+    latencias = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(tarea(host, puerto, i, *args, latencias) for i in range(clientes)))
+    return time.perf_counter() - inicio, latencias
+
+
+def imprimir(titulo, clientes, duracion, latencias, por_peticion=1):
+    total = sum(len(valores) for valores in latencias.values())
+    print(f"\n{titulo}: {clientes} clientes, {total} peticiones en {duracion:.2f} s "
+          f"({total * por_peticion / duracion:,.0f} op/s)")
+    print(f"{'operación':>14} {'cantidad':>9} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for operacion, valores in sorted(latencias.items()):
+        print(f"{operacion:>14} {len(valores):>9} {percentil(valores, 50) * 1000:>10.2f} "
+              f"{percentil(valores, 99) * 1000:>10.2f}")
+
+
+def _puerto_libre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def levantar_servicio(directorio):
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "turnos", "--archivo", os.path.join(directorio, "cola.json"),
+         "servir", "--puerto", str(puerto)],
+        cwd=RAIZ, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + 10
+    while time.monotonic() < limite:
+        try:
+            socket.create_connection(("127.0.0.1", puerto), timeout=0.2).close()
+            return proceso, puerto
+        except OSError:
+            time.sleep(0.05)
+    proceso.kill()
+    raise RuntimeError("El servicio no arrancó")
+
+
+async def principal(args, host, puerto):
+    for clientes in args.clientes:
+        duracion, latencias = await ronda(host, puerto, clientes, cliente_mixto, args.peticiones)
+        imprimir("Mixto", clientes, duracion, latencias)
+
+    clientes = args.clientes[-1]
+    lotes = max(1, args.peticiones // args.tamaño_lote)
+    duracion, latencias = await ronda(host, puerto, clientes, cliente_lotes, lotes, args.tamaño_lote)
+    imprimir(f"Lotes de {args.tamaño_lote} encolar", clientes, duracion, latencias, args.tamaño_lote)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", default="50,200,500",
+                        type=lambda texto: [int(n) for n in texto.split(",")])
+    parser.add_argument("--peticiones", type=int, default=100, help="peticiones por cliente")
+    parser.add_argument("--tamaño-lote", type=int, default=50)
+    parser.add_argument("--url", help="servicio ya levantado (por defecto se levanta uno)")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        asyncio.run(principal(args, url.hostname, url.port or 80))
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        proceso, puerto = levantar_servicio(directorio)
+        try:
+            asyncio.run(principal(args, "127.0.0.1", puerto))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Prueba de estrés del modo concurrente: N hilos productores ofrecen
+pacientes mientras un consumidor drena (como haría root.after en Tk) y un
+lector toma instantáneas.
+
+Verifica que cada productor conserve su orden FIFO dentro de cada
+prioridad y que las instantáneas sean consistentes, y mide el throughput
+según la cantidad de hilos.
+
+Uso: python benchmarks/estres_productores.py [--por-hilo N] [--hilos 1,2,4,8,16]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turnos import ESPECIALIDADES, Paciente
+from turnos.concurrencia import ColaTurnosConcurrente
+
+
+def productor(cola, indice, cantidad, barrera):
+    azar = random.Random(indice)
+    barrera.wait()
+    for secuencia in range(cantidad):
+        # El teléfono codifica (productor, secuencia) para verificar el orden
+        cola.ofrecer(Paciente("Paciente", f"{indice}{secuencia:09d}", "", "",
+                              azar.choice(ESPECIALIDADES), azar.random() < 0.1))
+
+
+def consumidor(cola, terminado):
+    while not terminado.is_set() or cola.pendientes():
+        if not cola.drenar(maximo=5000):
+            time.sleep(0.001)
+
+
+def lector(cola, terminado, errores):
+    while not terminado.is_set():
+        stats, filas = cola.instantanea(limit=50)
+        if len(filas) != min(50, stats['total']):
+            errores.append("Instantánea inconsistente")
+        time.sleep(0.002)
+
+
+def verificar(cola):
+    """FIFO dentro de cada prioridad y por productor"""
+    ultimo = {}
+    for ticket, paciente in cola.turnos():
+        indice, secuencia = int(paciente.telefono[:-9]), int(paciente.telefono[-9:])
+        clave = (indice, paciente.es_emergencia)
+        if ultimo.get(clave, -1) >= secuencia:
+            raise AssertionError(f"Orden roto en productor {indice}: ticket {ticket}")
+        ultimo[clave] = secuencia
+    # Y en cada especialidad, el orden es el mismo
+    for especialidad in ESPECIALIDADES:
+        tickets = [fila[1] for fila in cola.iterar_turnos(especialidad=especialidad)]
+        global_ = [t for t in (fila[1] for fila in cola.iterar_turnos())
+                   if cola.buscar_ticket(t)[0].especialidad == especialidad]
+        if tickets != global_:
+            raise AssertionError(f"Orden distinto en {especialidad}")
+
+
+def correr(hilos, por_hilo):
+    cola = ColaTurnosConcurrente()
+    barrera = threading.Barrier(hilos + 1)
+    terminado = threading.Event()
+    errores = []
+
+    productores = [threading.Thread(target=productor, args=(cola, i, por_hilo, barrera))
+                   for i in range(hilos)]
+    hilo_consumidor = threading.Thread(target=consumidor, args=(cola, terminado))
+    hilo_lector = threading.Thread(target=lector, args=(cola, terminado, errores))
+    for hilo in productores + [hilo_consumidor, hilo_lector]:
+        hilo.start()
+
+    barrera.wait()
+    inicio = time.perf_counter()
+    for hilo in productores:
+        hilo.join()
+    terminado.set()
+    hilo_consumidor.join()
+    segundos = time.perf_counter() - inicio
+    hilo_lector.join()
+
+    total = hilos * por_hilo
+    if cola.tamaño() != total:
+        errores.append(f"Se esperaban {total} pacientes y hay {cola.tamaño()}")
+    verificar(cola)
+    if errores:
+        raise AssertionError("; ".join(sorted(set(errores))))
+    return total / segundos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--por-hilo", type=int, default=20_000)
+    parser.add_argument("--hilos", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    print(f"{'hilos':>6} {'pacientes/s':>14}")
+    for hilos in (int(h) for h in args.hilos.split(",")):
+        print(f"{hilos:>6} {correr(hilos, args.por_hilo):>14,.0f}")
+    print("Orden FIFO por prioridad y productor: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Sistema de turnos médicos con colas FIFO.
+
+El paquete es importable sin interfaz gráfica: tkinter solo se carga al
+importar turnos.gui (o al lanzar la interfaz desde la línea de comandos).
+"""
+from .cola import (CAMPOS_TURNO, ArbolFenwick, ColaIndexada, ColaTurnos, IndiceNombres,
+                   normalizar_nombre)
+from .paciente import ESPECIALIDADES, NIVELES_TRIAGE, Paciente
+
+__all__ = [
+    "CAMPOS_TURNO",
+    "ESPECIALIDADES",
+    "NIVELES_TRIAGE",
+    "ArbolFenwick",
+    "ColaIndexada",
+    "ColaTurnos",
+    "IndiceNombres",
+    "Paciente",
+    "normalizar_nombre",
+]
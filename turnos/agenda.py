@@ -0,0 +1,160 @@
+"""Agenda de turnos reservados: los pacientes con turno a futuro esperan
+fuera de la cola y entran a ella cuando se acerca su horario.
+
+Las reservas se agrupan en cubetas por minuto del turno (fecha y hora del
+paciente). Un montículo guarda solo los minutos con cubeta, así:
+    reservar   O(1) si el minuto ya tiene cubeta, si no O(log m)
+    cancelar   O(1): se quita de su cubeta (la cubeta vacía queda hasta
+               que le llegue la hora)
+    liberar    O(log m) por minuto vencido más O(1) por paciente, que se
+               encola con encolar_lote en la cola de su nivel
+con m minutos distintos con reservas (a lo sumo n).
+
+liberar() se llama periódicamente (la interfaz lo hace con un after()).
+La agenda vive en memoria y avisa sus cambios (reservar, cancelar,
+liberar) a los observadores, como ColaTurnos: DiarioTurnos.recuperar_agenda
+la persiste junto con la cola.
+
+Uso:
+    agenda = AgendaTurnos(cola, anticipacion=15)
+    reserva = agenda.reservar(paciente)    # fecha y hora del paciente
+    ...
+    agenda.liberar()                       # [(reserva, ticket)] que entraron
+"""
+import heapq
+import time
+
+
+class AgendaTurnos:
+    """Reservas a futuro de una ColaTurnos.
+
+    Un paciente entra a la cola `anticipacion` minutos antes de su turno,
+    con esa hora como hora de registro (la espera se cuenta desde que
+    entra). `reloj` da la hora actual (por defecto time.time).
+    """
+    def __init__(self, cola, anticipacion=15, reloj=time.time):
+        self.cola = cola
+        self.anticipacion = anticipacion
+        self.reloj = reloj
+        self._minutos = []        # Montículo de minutos (epoch // 60) con cubeta
+        self._cubetas = {}        # minuto -> {reserva: paciente}, en orden de reserva
+        self._minuto_de = {}      # reserva -> minuto de su cubeta
+        self.siguiente_reserva = 1
+        # Funciones notificadas en cada cambio: funcion(evento, reserva, paciente)
+        self._observadores = []
+
+    def __len__(self):
+        return len(self._minuto_de)
+
+    def __contains__(self, reserva):
+        return reserva in self._minuto_de
+
+    def suscribir(self, funcion):
+        """Registrar una función a notificar en cada reservar/cancelar/liberar"""
+        self._observadores.append(funcion)
+
+    def desuscribir(self, funcion):
+        """Dejar de notificar a una función registrada con suscribir"""
+        self._observadores.remove(funcion)
+
+    def _notificar(self, evento, reserva, paciente):
+        for funcion in self._observadores:
+            funcion(evento, reserva, paciente)
+
+    def _limite(self, ahora):
+        """Último minuto de turno que ya debe estar en la cola"""
+        return int((ahora + self.anticipacion * 60) // 60)
+
+    def es_futuro(self, paciente, ahora=None):
+        """Si el turno del paciente todavía no debe entrar a la cola (False
+        también si su fecha u hora no son válidas: entra ya)"""
+        momento = paciente.momento_agenda
+        if momento is None:
+            return False
+        return int(momento // 60) > self._limite(self.reloj() if ahora is None else ahora)
+
+    def reservar(self, paciente):
+        """Guardar el turno del paciente; retorna el número de reserva.
+
+        ValueError si su fecha u hora no son válidas. Una reserva vencida
+        entra en el próximo liberar().
+        """
+        reserva = self.siguiente_reserva
+        self._agregar(reserva, paciente)
+        self._notificar('reservar', reserva, paciente)
+        return reserva
+
+    def restaurar(self, reserva, paciente):
+        """Volver a guardar una reserva persistida conservando su número,
+        sin notificar a los observadores"""
+        if reserva in self._minuto_de:
+            raise ValueError(f"La reserva {reserva} ya está en la agenda")
+        self._agregar(reserva, paciente)
+
+    def _agregar(self, reserva, paciente):
+        momento = paciente.momento_agenda
+        if momento is None:
+            raise ValueError(f"Fecha u hora de turno inválida: {paciente.fecha} {paciente.hora}")
+        minuto = int(momento // 60)
+        cubeta = self._cubetas.get(minuto)
+        if cubeta is None:
+            cubeta = self._cubetas[minuto] = {}
+            heapq.heappush(self._minutos, minuto)
+        self.siguiente_reserva = max(self.siguiente_reserva, reserva + 1)
+        cubeta[reserva] = paciente
+        self._minuto_de[reserva] = minuto
+
+    def cancelar(self, reserva):
+        """Quitar una reserva; retorna su paciente o None si no existe"""
+        minuto = self._minuto_de.pop(reserva, None)
+        if minuto is None:
+            return None
+        paciente = self._cubetas[minuto].pop(reserva)
+        self._notificar('cancelar', reserva, paciente)
+        return paciente
+
+    def buscar(self, reserva):
+        """Paciente de una reserva, o None"""
+        minuto = self._minuto_de.get(reserva)
+        return None if minuto is None else self._cubetas[minuto][reserva]
+
+    def proximo(self):
+        """Momento (segundos epoch) del próximo turno reservado, o None"""
+        minutos = self._minutos
+        while minutos and not self._cubetas[minutos[0]]:
+            del self._cubetas[heapq.heappop(minutos)]
+        return minutos[0] * 60 if minutos else None
+
+    def liberar(self, ahora=None):
+        """Encolar las reservas cuyo turno está a `anticipacion` minutos o
+        menos, en orden de turno; retorna [(reserva, ticket)]"""
+        if ahora is None:
+            ahora = self.reloj()
+        limite = self._limite(ahora)
+        minutos = self._minutos
+        reservas = []
+        pacientes = []
+        while minutos and minutos[0] <= limite:
+            cubeta = self._cubetas.pop(heapq.heappop(minutos))
+            for reserva, paciente in cubeta.items():
+                del self._minuto_de[reserva]
+                paciente.registro = ahora
+                reservas.append(reserva)
+                pacientes.append(paciente)
+        if not pacientes:
+            return []
+        liberadas = list(zip(reservas, self.cola.encolar_lote(pacientes)))
+        # Después de encolar: si algo falla antes, la reserva sigue guardada
+        for reserva, paciente in zip(reservas, pacientes):
+            self._notificar('liberar', reserva, paciente)
+        return liberadas
+
+    def reservas(self, limit=None):
+        """(momento, reserva, paciente) en orden de turno, las primeras `limit`"""
+        resultado = []
+        for minuto in sorted(minuto for minuto, cubeta in self._cubetas.items() if cubeta):
+            for reserva, paciente in self._cubetas[minuto].items():
+                if limit is not None and len(resultado) >= limit:
+                    return resultado
+                resultado.append((minuto * 60, reserva, paciente))
+        return resultado
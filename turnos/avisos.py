@@ -0,0 +1,346 @@
+"""Avisos a los pacientes por teléfono: "ya casi es su turno" y "lo llaman".
+
+AvisadorTurnos observa la cola y sigue, por especialidad, la ventana de
+los primeros `umbral` turnos (la fila de cada consultorio). Cuando un
+turno entra a la ventana recibe un aviso PROXIMO, una sola vez; al ser
+llamado, un aviso LLAMADO. No se recorre la cola: un cambio fuera de la
+ventana se descarta en O(1) (un turno que sale y no estaba en ella, uno
+que entra detrás del último de ella) y uno que la toca la vuelve a leer
+con ColaTurnos.primeros, O(umbral + niveles). Así un desencolar cuesta
+O(k) con k los turnos que cruzan el umbral, sin importar el largo de la
+cola. Deshacer (ver turnos.versiones) no es una operación de la
+recepción: un encolar deshecho ('deshacer') sale de la ventana sin
+ningún aviso, y un llamado deshecho vuelve con 'reinsertar' y, si cae en
+la ventana, recibe de nuevo PROXIMO.
+
+DespachadorAvisos recibe los avisos en una cola acotada (ofrecer() no
+bloquea y se puede llamar desde cualquier hilo) y los manda por lotes a
+una pasarela, desde un bucle de asyncio propio o del que lo use:
+    lotes          junta hasta `lote` avisos, esperando `espera_lote`
+    ritmo          a lo sumo `por_segundo` avisos por segundo (balde de fichas)
+    reintentos     los que fallan se reintentan con espera exponencial
+    duplicados     un mismo aviso (tipo, ticket) se descarta si se ofreció
+                   hace menos de `duplicados` segundos
+
+Una pasarela es cualquier objeto con `async enviar(avisos)` que retorna
+los avisos que fallaron (lista vacía si salieron todos); si lanza una
+excepción se reintenta el lote entero. PasarelaLocal los anota en memoria
+(y en un archivo JSONL) para pruebas.
+
+Uso:
+    despachador = DespachadorAvisos(PasarelaLocal("avisos.jsonl")).iniciar()
+    avisador = AvisadorTurnos(cola, despachador.ofrecer, umbral=3)
+    ...
+    despachador.detener()   # manda lo pendiente y termina
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from collections import deque
+
+UMBRAL_AVISO = 3
+
+# Tipos de aviso
+PROXIMO = 'proximo'
+LLAMADO = 'llamado'
+
+
+class Aviso:
+    """Un mensaje para el teléfono de un paciente"""
+    __slots__ = ('tipo', 'ticket', 'telefono', 'nombre', 'especialidad', 'posicion',
+                 'creado', 'intentos')
+
+    def __init__(self, tipo, ticket, paciente, posicion=None, creado=None):
+        self.tipo = tipo
+        self.ticket = ticket
+        self.telefono = paciente.telefono
+        self.nombre = paciente.nombre
+        self.especialidad = paciente.especialidad
+        self.posicion = posicion
+        self.creado = time.time() if creado is None else creado
+        self.intentos = 0
+
+    @property
+    def clave(self):
+        """Identidad para descartar duplicados"""
+        return (self.tipo, self.ticket)
+
+    @property
+    def texto(self):
+        if self.tipo == LLAMADO:
+            return f"Turno {self.ticket}: {self.nombre}, lo llaman de {self.especialidad}."
+        return (f"Turno {self.ticket}: {self.nombre}, es el número {self.posicion} en la fila "
+                f"de {self.especialidad}. Acérquese al consultorio.")
+
+    def a_dict(self):
+        return {
+            'tipo': self.tipo,
+            'ticket': self.ticket,
+            'telefono': self.telefono,
+            'especialidad': self.especialidad,
+            'posicion': self.posicion,
+            'texto': self.texto,
+        }
+
+
+class AvisadorTurnos:
+    """Observador de ColaTurnos que genera los avisos y los pasa a `destino`
+    (una función, p. ej. DespachadorAvisos.ofrecer).
+
+    Los que ya están en la ventana al crearlo no se avisan salvo con
+    `avisar_actuales`: así un comando suelto de la línea de comandos avisa
+    solo lo que cambió con él.
+    """
+    def __init__(self, cola, destino, umbral=UMBRAL_AVISO, avisar_actuales=False):
+        self.cola = cola
+        self.destino = destino
+        self.umbral = umbral
+        self._ventanas = {}     # especialidad -> [(ticket, nivel)] de los primeros `umbral`
+        self._avisados = set()  # Tickets en cola que ya recibieron PROXIMO
+        for especialidad in list(cola.colas_especialidad):
+            self._releer(especialidad, avisar_actuales)
+        cola.suscribir(self.registrar)
+
+    def cerrar(self):
+        """Dejar de observar la cola"""
+        self.cola.desuscribir(self.registrar)
+
+    def registrar(self, evento, ticket, paciente):
+        especialidad = paciente.especialidad
+        ventana = self._ventanas.get(especialidad, ())
+        if evento == 'encolar':
+            # Entra al final de su nivel: solo toca la ventana si no está
+            # llena o si su nivel es más urgente que el del último de ella
+            if len(ventana) < self.umbral or paciente.nivel < ventana[-1][1]:
+                self._releer(especialidad)
+        elif evento in ('desencolar', 'cancelar', 'deshacer'):
+            self._avisados.discard(ticket)
+            if evento == 'desencolar':
+                self.destino(Aviso(LLAMADO, ticket, paciente))
+            if any(dentro == ticket for dentro, _ in ventana):
+                self._releer(especialidad)
+        else:
+            # promover, reinsertar: el turno puede adelantarse a la ventana
+            self._releer(especialidad)
+
+    def _releer(self, especialidad, avisar=True):
+        primeros = self.cola.primeros(self.umbral, especialidad)
+        self._ventanas[especialidad] = [(ticket, nivel) for ticket, _, nivel in primeros]
+        for posicion, (ticket, paciente, _) in enumerate(primeros, 1):
+            if ticket not in self._avisados:
+                self._avisados.add(ticket)
+                if avisar:
+                    self.destino(Aviso(PROXIMO, ticket, paciente, posicion))
+
+
+class DespachadorAvisos:
+    """Cola acotada de avisos que se mandan por lotes a una pasarela.
+
+    correr() es la corrutina que despacha; iniciar() la corre en un hilo
+    aparte con su propio bucle (para la interfaz o la línea de comandos).
+    """
+    def __init__(self, pasarela, capacidad=10_000, lote=50, espera_lote=0.05, por_segundo=20.0,
+                 reintentos=3, espera_reintento=2.0, duplicados=600.0, reloj=time.monotonic):
+        self.pasarela = pasarela
+        self.capacidad = capacidad
+        self.lote = lote
+        self.espera_lote = espera_lote
+        self.por_segundo = por_segundo
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.duplicados = duplicados
+        self.reloj = reloj
+        self.estadisticas = dict.fromkeys(
+            ('ofrecidos', 'enviados', 'lotes', 'reintentados', 'fallidos', 'descartados',
+             'duplicados'), 0)
+        self._cerrojo = threading.Lock()
+        self._pendientes = deque()
+        self._reintentos = []              # Montículo (momento, orden, aviso)
+        self._orden = itertools.count()
+        self._recientes = {}               # clave -> momento en que se ofreció
+        self._vencimientos = deque()       # (momento, clave) en orden, para olvidar claves
+        self._bucle = None
+        self._hay_avisos = None            # asyncio.Event del bucle que despacha
+        self._despertado = False
+        self._terminar = False
+        self._vaciar = True
+        self._hilo = None
+
+    def __len__(self):
+        """Avisos por mandar (pendientes y esperando reintento)"""
+        return len(self._pendientes) + len(self._reintentos)
+
+    def ofrecer(self, aviso):
+        """Encolar un aviso sin bloquear (desde cualquier hilo); False si se
+        descartó por duplicado o por estar llena la cola"""
+        ahora = self.reloj()
+        with self._cerrojo:
+            self.estadisticas['ofrecidos'] += 1
+            vencimientos = self._vencimientos
+            while vencimientos and vencimientos[0][0] <= ahora:
+                _, clave = vencimientos.popleft()
+                if self._recientes.get(clave, ahora) + self.duplicados <= ahora:
+                    del self._recientes[clave]
+            clave = aviso.clave
+            if clave in self._recientes:
+                self.estadisticas['duplicados'] += 1
+                return False
+            if len(self._pendientes) >= self.capacidad:
+                self.estadisticas['descartados'] += 1
+                return False
+            self._recientes[clave] = ahora
+            vencimientos.append((ahora + self.duplicados, clave))
+            self._pendientes.append(aviso)
+            despertar = not self._despertado
+            self._despertado = True
+        if despertar:
+            self._despertar()
+        return True
+
+    def _despertar(self):
+        bucle = self._bucle
+        if bucle is not None:
+            try:
+                bucle.call_soon_threadsafe(self._hay_avisos.set)
+            except RuntimeError:
+                pass   # El bucle ya terminó
+
+    async def correr(self):
+        """Despachar hasta que se llame a detener()"""
+        self._bucle = asyncio.get_running_loop()
+        self._hay_avisos = asyncio.Event()
+        self._hay_avisos.set()
+        fichas = float(self.lote)
+        ultimo = self.reloj()
+        try:
+            while True:
+                ahora = self.reloj()
+                self._vencer_reintentos(ahora)
+                if not self._pendientes:
+                    if self._terminar and (not self._vaciar or not self._reintentos):
+                        return
+                    await self._esperar_avisos()
+                    continue
+                if self._terminar and not self._vaciar:
+                    return
+
+                # Balde de fichas: `por_segundo` por segundo, hasta un lote
+                fichas = min(self.lote, fichas + (ahora - ultimo) * self.por_segundo)
+                ultimo = ahora
+                if fichas < 1:
+                    await asyncio.sleep((1 - fichas) / self.por_segundo)
+                    continue
+                if len(self._pendientes) < self.lote and self.espera_lote and not self._terminar:
+                    # Juntar un poco más antes de mandar un lote chico
+                    await asyncio.sleep(self.espera_lote)
+                with self._cerrojo:
+                    lote = [self._pendientes.popleft()
+                            for _ in range(min(int(fichas), len(self._pendientes)))]
+                fichas -= len(lote)
+                await self._enviar(lote)
+        finally:
+            self._bucle = None
+
+    async def _esperar_avisos(self):
+        with self._cerrojo:
+            if self._pendientes:
+                return   # Llegó uno entre la revisión y el cerrojo
+            self._despertado = False
+            self._hay_avisos.clear()
+        espera = None
+        if self._reintentos:
+            espera = max(0.0, self._reintentos[0][0] - self.reloj())
+        try:
+            await asyncio.wait_for(self._hay_avisos.wait(), espera)
+        except asyncio.TimeoutError:
+            pass
+
+    def _vencer_reintentos(self, ahora):
+        """Pasar a pendientes los reintentos cuya espera terminó"""
+        reintentos = self._reintentos
+        if reintentos and reintentos[0][0] <= ahora:
+            with self._cerrojo:
+                while reintentos and reintentos[0][0] <= ahora:
+                    self._pendientes.appendleft(heapq.heappop(reintentos)[2])
+
+    async def _enviar(self, lote):
+        try:
+            fallidos = await self.pasarela.enviar(lote) or []
+        except Exception:
+            fallidos = lote
+        self.estadisticas['lotes'] += 1
+        self.estadisticas['enviados'] += len(lote) - len(fallidos)
+        ahora = self.reloj()
+        for aviso in fallidos:
+            aviso.intentos += 1
+            if aviso.intentos > self.reintentos:
+                self.estadisticas['fallidos'] += 1
+                continue
+            self.estadisticas['reintentados'] += 1
+            espera = self.espera_reintento * 2 ** (aviso.intentos - 1)
+            heapq.heappush(self._reintentos, (ahora + espera, next(self._orden), aviso))
+
+    def iniciar(self):
+        """Correr el despachador en un hilo aparte; retorna self"""
+        if self._hilo is not None:
+            raise RuntimeError("El despachador ya está corriendo")
+        self._terminar = False
+        self._hilo = threading.Thread(target=asyncio.run, args=(self.correr(),),
+                                      name="avisos", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self, vaciar=True, espera=None):
+        """Terminar el despachador (antes manda lo pendiente, reintentos
+        incluidos, salvo con vaciar=False); con iniciar(), espera al hilo
+        hasta `espera` segundos"""
+        self._vaciar = vaciar
+        self._terminar = True
+        self._despertar()
+        if self._hilo is not None:
+            self._hilo.join(espera)
+            self._hilo = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *excepcion):
+        self.detener()
+
+
+class PasarelaLocal:
+    """Pasarela de prueba: anota los avisos en `enviados` (y en `ruta`,
+    una línea JSON por aviso) en vez de mandarlos.
+
+    `latencia` (segundos por lote) y `fallas` (probabilidad de que falle
+    cada aviso) simulan una pasarela real.
+    """
+    def __init__(self, ruta=None, latencia=0.0, fallas=0.0, semilla=None):
+        self.ruta = ruta
+        self.latencia = latencia
+        self.fallas = fallas
+        self.enviados = []
+        self.lotes = 0
+        self._azar = random.Random(semilla)
+
+    async def enviar(self, avisos):
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        self.lotes += 1
+        fallidos = []
+        salieron = []
+        for aviso in avisos:
+            if self.fallas and self._azar.random() < self.fallas:
+                fallidos.append(aviso)
+            else:
+                salieron.append(aviso)
+        self.enviados.extend(salieron)
+        if self.ruta is not None and salieron:
+            with open(self.ruta, "a", encoding="utf-8") as archivo:
+                archivo.writelines(json.dumps(dict(aviso.a_dict(), enviado=time.time()),
+                                              ensure_ascii=False) + "\n" for aviso in salieron)
+        return fallidos
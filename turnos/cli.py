@@ -0,0 +1,475 @@
+"""Línea de comandos para operar una cola persistida sin interfaz gráfica.
+
+Uso: python -m turnos [--archivo cola.json | --diario DIR] [--json] <comando> ...
+
+Los turnos con fecha y hora a futuro (encolar --fecha/--hora, importar) se
+reservan en una AgendaTurnos que se guarda con la cola, en el archivo o en
+el diario. Cada comando empieza pasando a la cola las reservas cuyo turno
+está a ANTICIPACION_AGENDA minutos o menos.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from . import validacion
+from .agenda import AgendaTurnos
+from .cola import CAMPOS_TURNO
+from .diario import SIEMPRE, DiarioTurnos
+from .importacion import importar_archivo
+from .metricas import PerfiladorMuestreo, Registro, escribir_archivo, instrumentar_cola
+from .paciente import ESPECIALIDADES, NIVEL_EMERGENCIA, NIVELES_TRIAGE, Paciente
+from .persistencia import cargar_agenda, cargar_cola, guardar_cola
+from .tablero import LectorTablero, TableroTurnos
+
+ARCHIVO_POR_DEFECTO = "cola_turnos.json"
+ANTICIPACION_AGENDA = 15
+
+
+def _describir(paciente, posicion=None):
+    tipo = "EMERGENCIA" if paciente.es_emergencia else "NORMAL"
+    datos = {
+        'ticket': paciente.ticket,
+        'paciente': paciente.nombre,
+        'telefono': paciente.telefono,
+        'especialidad': paciente.especialidad,
+        'tipo': tipo,
+        'nivel': paciente.nivel
+    }
+    if posicion is not None:
+        datos['posicion'] = posicion
+    return datos
+
+
+def _mostrar(args, datos, texto):
+    if args.json:
+        print(json.dumps(datos, ensure_ascii=False, default=str))
+    else:
+        print(texto)
+
+
+def comando_encolar(args, cola):
+    nombre = args.nombre.strip()
+    telefono = args.telefono.strip()
+    especialidad = args.especialidad.strip()
+    especialidades = None if args.cualquier_especialidad else ESPECIALIDADES
+    errores = validacion.errores_registro(nombre, telefono, especialidad, especialidades)
+    if errores:
+        for error in errores:
+            print(f"Error: {error}", file=sys.stderr)
+        return 2
+
+    ahora = datetime.now()
+    paciente = Paciente(nombre, telefono,
+                        args.fecha or ahora.strftime("%d/%m/%Y"),
+                        args.hora or ahora.strftime("%H:%M"),
+                        especialidad, args.emergencia, args.nivel)
+    if args.agenda.es_futuro(paciente):
+        reserva = args.agenda.reservar(paciente)
+        _mostrar(args, dict(_describir(paciente), reserva=reserva),
+                 f"Reserva {reserva}: {paciente.nombre} entra a la cola {ANTICIPACION_AGENDA} "
+                 f"minutos antes de su turno ({paciente.fecha} {paciente.hora})")
+        return 0
+    ticket = cola.encolar(paciente)
+    _, posicion = cola.buscar_ticket(ticket)
+    _mostrar(args, _describir(paciente, posicion),
+             f"Ticket {ticket}: {paciente.nombre} encolado en posición {posicion}")
+    return 0
+
+
+def comando_desencolar(args, cola):
+    paciente = cola.desencolar(args.especialidad)
+    if paciente is None:
+        print("No hay pacientes en la cola", file=sys.stderr)
+        return 1
+    _mostrar(args, _describir(paciente),
+             f"Siguiente: ticket {paciente.ticket} - {paciente.nombre} ({paciente.especialidad})")
+    return 0
+
+
+def comando_cancelar(args, cola):
+    if args.objetivo.isdigit():
+        cancelado = cola.cancelar_ticket(int(args.objetivo))
+    else:
+        cancelado = cola.cancelar_turno(args.objetivo)
+    if not cancelado:
+        print(f"No se encontró el turno {args.objetivo}", file=sys.stderr)
+        return 1
+    _mostrar(args, {'cancelado': args.objetivo}, f"Turno {args.objetivo} cancelado")
+    return 0
+
+
+def comando_buscar(args, cola):
+    if args.objetivo.isdigit():
+        paciente, posicion = cola.buscar_ticket(int(args.objetivo))
+    else:
+        paciente, posicion = cola.buscar_paciente(args.objetivo)
+    if paciente is None:
+        print(f"Paciente {args.objetivo} no está en cola", file=sys.stderr)
+        if not args.objetivo.isdigit():
+            for ticket, parecido in cola.sugerir(args.objetivo, 5):
+                print(f"  ¿{parecido.nombre}? (ticket {ticket})", file=sys.stderr)
+        return 1
+    _mostrar(args, _describir(paciente, posicion),
+             f"Ticket {paciente.ticket} - {paciente.nombre}: posición {posicion}")
+    return 0
+
+
+def comando_listar(args, cola):
+    turnos = cola.iterar_turnos(args.offset, args.limit, args.tipo, args.especialidad)
+    for turno in turnos:
+        if args.json:
+            print(json.dumps(dict(zip(CAMPOS_TURNO, turno)), ensure_ascii=False))
+        else:
+            print("\t".join(str(campo) for campo in turno))
+    return 0
+
+
+def comando_importar(args, cola):
+    especialidades = None if args.cualquier_especialidad else ESPECIALIDADES
+    reporte = importar_archivo(cola, args.ruta, especialidades, agenda=args.agenda)
+    for fila, motivos in reporte.errores:
+        print(f"Fila {fila}: {'; '.join(motivos)}", file=sys.stderr)
+    encolados = reporte.importados - reporte.reservados
+    _mostrar(args, {'importados': reporte.importados, 'reservados': reporte.reservados,
+                    'errores': len(reporte.errores)},
+             f"Pacientes encolados: {encolados} - reservados a futuro: {reporte.reservados} - "
+             f"filas con errores: {len(reporte.errores)}")
+    return 0
+
+
+def comando_estadisticas(args, cola):
+    stats = cola.obtener_estadisticas()
+    texto = "\n".join([
+        f"Total en cola: {stats['total']}",
+        f"Cola Emergencias: {stats['emergencias']}",
+        f"Cola Normal: {stats['normales']}",
+        f"Tiempo prom: {stats['tiempo_promedio']} min",
+    ] + [f"Nivel {nivel}: {cantidad}" for nivel, cantidad in stats['por_nivel'].items()]
+      + [f"{especialidad}: {cantidad}"
+         for especialidad, cantidad in stats['por_especialidad'].items()])
+    _mostrar(args, stats, texto)
+    return 0
+
+
+def comando_servir(args, cola):
+    import asyncio
+    from .servicio import servir
+
+    print(f"Atendiendo en http://{args.host}:{args.puerto} (Ctrl+C para terminar)", file=sys.stderr)
+    try:
+        asyncio.run(servir(cola, args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def comando_simular(args, cola):
+    from .simulacion import Escenario, barrer, cargar_traza
+
+    traza = cargar_traza(args.traza) if args.traza else None
+    escenarios = [Escenario(nombre=f"{medicos} médico(s) - semilla {semilla}", medicos=medicos,
+                            llegadas_por_hora=args.llegadas_por_hora,
+                            proporcion_emergencias=args.emergencias,
+                            mezcla_niveles=args.niveles, envejecimiento=args.envejecimiento,
+                            minutos_consulta=args.consulta, variacion_consulta=args.variacion,
+                            distribucion_consulta=args.distribucion, duracion=args.duracion,
+                            traza=traza, semilla=semilla)
+                  for medicos in args.medicos
+                  for semilla in range(args.semilla, args.semilla + args.repeticiones)]
+    resumenes = barrer(escenarios, args.procesos)
+
+    if args.json:
+        for resumen in resumenes:
+            print(json.dumps(resumen, ensure_ascii=False))
+        return 0
+
+    def minutos(valor):
+        return "-" if valor is None else f"{valor:.1f}"
+
+    print(f"{'escenario':<28} {'atendidos':>9} {'p50':>7} {'p90':>7} {'p99':>7} "
+          f"{'emerg p90':>9} {'normal p90':>10} {'ocupación':>9}")
+    for resumen in resumenes:
+        total = resumen['total']
+        ocupaciones = [datos['utilizacion'] for datos in resumen['por_especialidad'].values()
+                       if datos['utilizacion'] is not None]
+        ocupacion = sum(ocupaciones) / len(ocupaciones) if ocupaciones else 0
+        print(f"{resumen['escenario']:<28} {total['atendidos']:>9} {minutos(total['p50']):>7} "
+              f"{minutos(total['p90']):>7} {minutos(total['p99']):>7} "
+              f"{minutos(resumen['por_tipo']['EMERGENCIA']['p90']):>9} "
+              f"{minutos(resumen['por_tipo']['NORMAL']['p90']):>10} {ocupacion:>9.0%}")
+    return 0
+
+
+def comando_historial(args, cola):
+    if not args.historial:
+        print("Error: indicar el directorio con --historial DIR", file=sys.stderr)
+        return 2
+    from .historial import HistorialTurnos
+
+    historial = HistorialTurnos(args.historial, solo_lectura=True)
+    desde = datetime.strptime(args.desde, "%d/%m/%Y") if args.desde else None
+    hasta = datetime.strptime(args.hasta, "%d/%m/%Y") if args.hasta else None
+    try:
+        datos = historial.resumen(desde, hasta)
+        datos['por_especialidad'] = historial.esperas_por_especialidad(desde=desde, hasta=hasta)
+        datos['atendidos_por_hora'] = historial.atendidos_por_hora(desde, hasta)
+    except RuntimeError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    def percentiles(espera):
+        return " ".join(f"p{p}={'-' if valor is None else valor}" for p, valor in espera.items())
+
+    lineas = [
+        f"Turnos: {datos['total']} (atendidos {datos['atendidos']}, cancelados {datos['cancelados']})",
+        f"Espera (min): {percentiles(datos['espera'])}",
+        f"Emergencias: {percentiles(datos['espera_emergencias'])}",
+        f"Normales: {percentiles(datos['espera_normales'])}",
+    ]
+    for especialidad, espera in datos['por_especialidad'].items():
+        lineas.append(f"{especialidad}: {espera['atendidos']} atendidos, "
+                      f"promedio {espera['promedio']} min, p90 {espera['p90']} min")
+    lineas.extend(f"{hora:02d}h: {promedio}" for hora, promedio
+                  in enumerate(datos['atendidos_por_hora']) if promedio)
+    _mostrar(args, datos, "\n".join(lineas))
+    return 0
+
+
+def comando_pantalla(args, cola):
+    if not args.tablero:
+        print("Error: indicar el archivo con --tablero RUTA", file=sys.stderr)
+        return 2
+    try:
+        lector = LectorTablero(args.tablero)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    if args.especialidad is not None and args.especialidad not in lector.especialidades:
+        print(f"Error: {args.especialidad} no está en el tablero", file=sys.stderr)
+        return 1
+
+    def turnos(frente):
+        return "  ".join(f"#{ticket}" + (" 🚨" if nivel <= NIVEL_EMERGENCIA else "")
+                         for ticket, nivel in frente) or "-"
+
+    # Con --cada se muestra solo cuando cambió la publicación
+    ultima = None
+    with lector:
+        try:
+            while True:
+                if lector.secuencia() != ultima:
+                    vista = lector.leer(args.especialidad)
+                    if vista is None:
+                        print("Error: el tablero no terminó de publicarse", file=sys.stderr)
+                        return 1
+                    ultima = vista['secuencia']
+                    lineas = [f"En espera: {vista['total']} (emergencias {vista['emergencias']}), "
+                              f"espera prom: {vista['tiempo_promedio']} min"]
+                    if 'frente' in vista:
+                        lineas.append(f"Próximos: {turnos(vista['frente'])}")
+                    lineas.extend(f"{especialidad} ({datos['total']}): {turnos(datos['frente'])}"
+                                  for especialidad, datos in vista['por_especialidad'].items())
+                    _mostrar(args, vista, "\n".join(lineas))
+                if not args.cada:
+                    return 0
+                time.sleep(args.cada)
+        except KeyboardInterrupt:
+            return 0
+
+
+# Comandos que modifican la cola y obligan a guardarla
+MODIFICAN = {comando_encolar, comando_desencolar, comando_cancelar, comando_importar, comando_servir}
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m turnos",
+                                     description="Sistema de turnos médicos - Cola FIFO")
+    parser.add_argument("--archivo", default=ARCHIVO_POR_DEFECTO,
+                        help=f"archivo JSON de la cola (por defecto {ARCHIVO_POR_DEFECTO})")
+    parser.add_argument("--diario", metavar="DIR",
+                        help="usar un diario persistente en DIR en lugar del archivo JSON")
+    parser.add_argument("--json", action="store_true", help="salida en JSON (una línea por registro)")
+    parser.add_argument("--envejecimiento", type=float, metavar="MIN",
+                        help="minutos de espera en un nivel de triage antes de subir al siguiente")
+    parser.add_argument("--metricas", metavar="ARCHIVO",
+                        help="al terminar, escribir las métricas en ARCHIVO (formato Prometheus)")
+    parser.add_argument("--perfil", metavar="ARCHIVO",
+                        help="perfilar por muestreo y escribir las pilas colapsadas en ARCHIVO")
+    parser.add_argument("--historial", metavar="DIR",
+                        help="guardar cada turno atendido o cancelado en el historial de DIR")
+    parser.add_argument("--tablero", metavar="RUTA",
+                        help="publicar el frente de la cola para las pantallas en RUTA "
+                             "(mejor en /dev/shm)")
+    parser.add_argument("--avisos", metavar="ARCHIVO",
+                        help="avisar a los próximos de cada especialidad y a los llamados "
+                             "(pasarela local: anota cada aviso en ARCHIVO, JSONL)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    encolar = comandos.add_parser("encolar", help="agregar un paciente a la cola")
+    encolar.add_argument("nombre")
+    encolar.add_argument("telefono")
+    encolar.add_argument("especialidad")
+    encolar.add_argument("--fecha", help="DD/MM/AAAA (por defecto hoy); a futuro, se reserva")
+    encolar.add_argument("--hora", help="HH:MM (por defecto ahora)")
+    encolar.add_argument("--emergencia", action="store_true")
+    encolar.add_argument("--nivel", type=int, choices=range(1, NIVELES_TRIAGE + 1),
+                         help="triage de 1 (más urgente) a 5; por defecto 1 con --emergencia, si no 3")
+    encolar.add_argument("--cualquier-especialidad", action="store_true",
+                         help="aceptar especialidades fuera de la lista de la clínica")
+    encolar.set_defaults(funcion=comando_encolar)
+
+    desencolar = comandos.add_parser("desencolar", help="llamar al siguiente paciente")
+    desencolar.add_argument("--especialidad", help="solo la cola de esta especialidad")
+    desencolar.set_defaults(funcion=comando_desencolar)
+
+    cancelar = comandos.add_parser("cancelar", help="cancelar un turno por ticket o nombre")
+    cancelar.add_argument("objetivo", help="ticket o nombre del paciente")
+    cancelar.set_defaults(funcion=comando_cancelar)
+
+    buscar = comandos.add_parser("buscar", help="posición de un paciente por ticket o nombre")
+    buscar.add_argument("objetivo", help="ticket o nombre del paciente")
+    buscar.set_defaults(funcion=comando_buscar)
+
+    listar = comandos.add_parser("listar", help="listar la cola en orden de atención")
+    listar.add_argument("--offset", type=int, default=0)
+    listar.add_argument("--limit", type=int)
+    listar.add_argument("--tipo", choices=("EMERGENCIA", "NORMAL"))
+    listar.add_argument("--especialidad")
+    listar.set_defaults(funcion=comando_listar)
+
+    importar = comandos.add_parser("importar", help="encolar la agenda desde un CSV o JSONL")
+    importar.add_argument("ruta")
+    importar.add_argument("--cualquier-especialidad", action="store_true",
+                          help="aceptar especialidades fuera de la lista de la clínica")
+    importar.set_defaults(funcion=comando_importar)
+
+    estadisticas = comandos.add_parser("estadisticas", help="estadísticas de la cola")
+    estadisticas.set_defaults(funcion=comando_estadisticas)
+
+    servir = comandos.add_parser("servir", help="atender la cola por HTTP/JSON")
+    servir.add_argument("--host", default="127.0.0.1")
+    servir.add_argument("--puerto", type=int, default=8080)
+    servir.set_defaults(funcion=comando_servir)
+
+    simular = comandos.add_parser("simular", help="simular una jornada para dimensionar el plantel")
+    simular.add_argument("--traza", help="CSV de llegadas registradas (en lugar de Poisson)")
+    simular.add_argument("--llegadas-por-hora", type=float, default=20,
+                         help="llegadas por hora en toda la clínica (por defecto 20)")
+    simular.add_argument("--medicos", default=[1, 2, 3],
+                         type=lambda texto: [int(n) for n in texto.split(",")],
+                         help="médicos por especialidad; varios valores separados por coma "
+                              "se simulan como escenarios distintos (por defecto 1,2,3)")
+    simular.add_argument("--consulta", type=float, default=15, help="minutos medios por consulta")
+    simular.add_argument("--variacion", type=float, default=0.5,
+                         help="coeficiente de variación del tiempo de consulta")
+    simular.add_argument("--distribucion", choices=("lognormal", "exponencial", "fija"),
+                         default="lognormal")
+    simular.add_argument("--emergencias", type=float, default=0.1, help="proporción de emergencias")
+    simular.add_argument("--niveles", metavar="P1,...,P5",
+                         type=lambda texto: {nivel: float(peso) for nivel, peso
+                                             in enumerate(texto.split(","), 1) if float(peso) > 0},
+                         help="pesos de los niveles de triage 1 a 5 (en lugar de --emergencias)")
+    simular.add_argument("--duracion", type=float, default=600, help="minutos con llegadas")
+    simular.add_argument("--repeticiones", type=int, default=1, help="semillas por escenario")
+    simular.add_argument("--semilla", type=int, default=0)
+    simular.add_argument("--procesos", type=int, help="procesos del pool (por defecto, uno por CPU)")
+    simular.set_defaults(funcion=comando_simular, sin_cola=True)
+
+    historial = comandos.add_parser("historial",
+                                    help="esperas y atendidos por hora del historial (--historial)")
+    historial.add_argument("--desde", help="DD/MM/AAAA")
+    historial.add_argument("--hasta", help="DD/MM/AAAA (sin incluir)")
+    historial.set_defaults(funcion=comando_historial, sin_cola=True)
+
+    pantalla = comandos.add_parser("pantalla", help="mostrar el tablero publicado (--tablero)")
+    pantalla.add_argument("--especialidad", help="solo esta especialidad")
+    pantalla.add_argument("--cada", type=float, metavar="SEG",
+                          help="repetir cada SEG segundos cuando cambie (Ctrl+C para terminar)")
+    pantalla.set_defaults(funcion=comando_pantalla, sin_cola=True)
+
+    gui = comandos.add_parser("gui", help="abrir la interfaz gráfica")
+    gui.add_argument("--ingreso", metavar="ARCHIVO",
+                     help="tomar también los pacientes que los kioscos agregan a ARCHIVO "
+                          "(JSONL, una línea por paciente)")
+    gui.set_defaults(funcion=None)
+    return parser
+
+
+def _ejecutar(args, cola, agenda):
+    """Pasar a la cola las reservas que llegaron a su hora y correr el
+    comando, con métricas, perfilador, historial, tablero y avisos si se
+    pidieron"""
+    cola.configurar_envejecimiento(args.envejecimiento)
+    historial = None
+    if args.historial:
+        # NumPy (del historial) solo se carga si se pidió
+        from .historial import HistorialTurnos
+
+        historial = HistorialTurnos(args.historial)
+        cola.suscribir(historial.registrar)
+    tablero = TableroTurnos(args.tablero, cola) if args.tablero else None
+    despachador = avisador = None
+    if args.avisos:
+        # asyncio y los hilos del despachador solo se cargan si se pidió
+        from .avisos import AvisadorTurnos, DespachadorAvisos, PasarelaLocal
+
+        despachador = DespachadorAvisos(PasarelaLocal(args.avisos)).iniciar()
+        avisador = AvisadorTurnos(cola, despachador.ofrecer)
+    registro = None
+    if args.metricas:
+        registro = instrumentar_cola(cola, Registro())
+    perfilador = PerfiladorMuestreo().iniciar() if args.perfil else None
+    try:
+        # Con los observadores ya suscritos: las reservas liberadas se
+        # historian, se publican y se avisan como cualquier turno
+        agenda.liberar()
+        args.agenda = agenda
+        return args.funcion(args, cola)
+    finally:
+        if perfilador is not None:
+            perfilador.detener()
+            perfilador.escribir(args.perfil)
+        if registro is not None:
+            escribir_archivo(registro, args.metricas)
+        if historial is not None:
+            historial.cerrar()
+        if tablero is not None:
+            tablero.cerrar()
+        if despachador is not None:
+            avisador.cerrar()
+            despachador.detener()
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    if args.funcion is None:
+        # tkinter se importa solo aquí
+        from .gui import main as main_gui
+        main_gui(args.diario, args.envejecimiento, args.metricas, args.historial, args.tablero,
+                 args.avisos, args.ingreso)
+        return
+
+    if getattr(args, 'sin_cola', False):
+        sys.exit(args.funcion(args, None))
+
+    if args.diario:
+        # Cada cambio queda en el diario; cerrar() lo sincroniza
+        diario = DiarioTurnos(args.diario, durabilidad=SIEMPRE)
+        try:
+            cola = diario.recuperar()
+            agenda = diario.recuperar_agenda(AgendaTurnos(cola, ANTICIPACION_AGENDA))
+            codigo = _ejecutar(args, cola, agenda)
+        finally:
+            diario.cerrar()
+        sys.exit(codigo)
+
+    cola = cargar_cola(args.archivo)
+    agenda = cargar_agenda(args.archivo, AgendaTurnos(cola, ANTICIPACION_AGENDA))
+    codigo = _ejecutar(args, cola, agenda)
+    # cola.eventos: liberar() pudo encolar reservas aunque el comando solo lea
+    if codigo == 0 and (args.funcion in MODIFICAN or cola.eventos):
+        guardar_cola(cola, args.archivo, agenda)
+    sys.exit(codigo)
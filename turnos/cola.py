@@ -0,0 +1,1123 @@
+"""Motor de la cola de turnos, sin dependencias de interfaz gráfica"""
+import collections
+import heapq
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from .paciente import NIVEL_EMERGENCIA, NIVELES_TRIAGE, validar_nivel
+
+
+def normalizar_nombre(nombre):
+    """Clave de búsqueda de un nombre: minúsculas, sin tildes y con los
+    espacios colapsados ("  José  PÉREZ" -> "jose perez")"""
+    if not nombre.isascii():
+        nombre = "".join(c for c in unicodedata.normalize('NFKD', nombre)
+                         if not unicodedata.combining(c))
+    return " ".join(nombre.casefold().split())
+
+
+def _registro_us(paciente):
+    """Hora de registro en microsegundos enteros (sumas exactas, sin deriva)"""
+    return round(paciente.registro * 1_000_000)
+
+
+def combinar_estadisticas(agregados, ahora=None):
+    """Estadísticas (como ColaTurnos.obtener_estadisticas) de varias colas
+    a partir de sus agregados, sin juntar sus pacientes"""
+    total = emergencias = suma_registro_us = 0
+    mas_antiguo = None
+    por_especialidad = {}
+    por_nivel = {}
+    for parte in agregados:
+        total += parte['total']
+        emergencias += parte['emergencias']
+        suma_registro_us += parte['suma_registro_us']
+        registro = parte['registro_mas_antiguo']
+        if registro is not None and (mas_antiguo is None or registro < mas_antiguo):
+            mas_antiguo = registro
+        for especialidad, cantidad in parte['por_especialidad'].items():
+            por_especialidad[especialidad] = por_especialidad.get(especialidad, 0) + cantidad
+        for nivel, cantidad in parte['por_nivel'].items():
+            por_nivel[nivel] = por_nivel.get(nivel, 0) + cantidad
+    
+    if total == 0:
+        return {
+            'total': 0,
+            'emergencias': 0,
+            'normales': 0,
+            'tiempo_promedio': 0,
+            'por_especialidad': {},
+            'por_nivel': {},
+            'registro_mas_antiguo': None
+        }
+    
+    if ahora is None:
+        ahora = datetime.now().timestamp()
+    tiempo_promedio = (ahora * 1_000_000 - suma_registro_us / total) / 60_000_000
+    
+    return {
+        'total': total,
+        'emergencias': emergencias,
+        'normales': total - emergencias,
+        'tiempo_promedio': int(tiempo_promedio),
+        'por_especialidad': por_especialidad,
+        'por_nivel': dict(sorted(por_nivel.items())),
+        'registro_mas_antiguo': datetime.fromtimestamp(mas_antiguo)
+    }
+
+
+# Campos de las tuplas generadas por ColaTurnos.iterar_turnos
+CAMPOS_TURNO = ('posicion', 'ticket', 'paciente', 'telefono', 'hora',
+                'especialidad', 'tipo', 'minutos_espera', 'nivel')
+
+
+class ArbolFenwick:
+    """Árbol de Fenwick (Binary Indexed Tree) que crece por el final.
+
+    Sumas de prefijos, actualizaciones puntuales y búsqueda del k-ésimo
+    elemento en O(log n). Los índices empiezan en 1.
+    """
+    def __init__(self, valores=()):
+        # Construcción en O(n): cada nodo propaga su suma a su padre
+        self.arbol = [0]
+        self.arbol.extend(valores)
+        n = len(self.arbol)
+        for i in range(1, n):
+            padre = i + (i & -i)
+            if padre < n:
+                self.arbol[padre] += self.arbol[i]
+    
+    def __len__(self):
+        return len(self.arbol) - 1
+    
+    def agregar(self, valor):
+        """Agregar un valor al final y retornar su índice"""
+        i = len(self.arbol)
+        # El nodo i cubre el rango (i - lsb(i), i]: sumar lo que ya existe
+        suma = valor
+        limite = i - (i & -i)
+        j = i - 1
+        while j > limite:
+            suma += self.arbol[j]
+            j -= j & -j
+        self.arbol.append(suma)
+        return i
+    
+    def actualizar(self, i, delta):
+        """Sumar delta al elemento i"""
+        n = len(self.arbol)
+        while i < n:
+            self.arbol[i] += delta
+            i += i & -i
+    
+    def prefijo(self, i):
+        """Suma de los elementos 1..i"""
+        suma = 0
+        while i > 0:
+            suma += self.arbol[i]
+            i -= i & -i
+        return suma
+    
+    def buscar(self, k):
+        """Índice del menor i con prefijo(i) >= k, o 0 si no existe"""
+        n = len(self.arbol) - 1
+        pos = 0
+        paso = 1 << n.bit_length()
+        while paso:
+            siguiente = pos + paso
+            if siguiente <= n and self.arbol[siguiente] < k:
+                pos = siguiente
+                k -= self.arbol[siguiente]
+            paso >>= 1
+        return pos + 1 if pos < n else 0
+
+
+class ColaIndexada:
+    """Cola FIFO indexada por ticket.
+
+    Las cancelaciones dejan una lápida en lugar de desplazar elementos, y
+    un árbol de Fenwick sobre los números de secuencia (1 = vivo, 0 = lápida)
+    da la posición de cualquier ticket en O(log n). Un hueco está vivo solo
+    si su ticket sigue en la cola con esa secuencia: un ticket que salió y
+    volvió a entrar deja una lápida con su número.
+    """
+    # Lápidas toleradas antes de reconstruir (amortizado O(1) por operación)
+    MIN_COMPACTAR = 1024
+    
+    def __init__(self):
+        self._orden = []                # Tickets por secuencia (incluye lápidas)
+        self._inicio = 0                # Índice del frente en _orden
+        self._entradas = {}             # ticket -> (secuencia, paciente) vivos
+        self._fenwick = ArbolFenwick()
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def __contains__(self, ticket):
+        return ticket in self._entradas
+    
+    def __iter__(self):
+        for _, paciente in self.items():
+            yield paciente
+    
+    def items(self, desde=1):
+        """Recorrer (ticket, paciente) en orden FIFO saltando lápidas.
+        
+        Empieza en la posición `desde` (base 1), que se ubica en O(log n).
+        """
+        if desde > len(self._entradas):
+            return
+        inicio = self._inicio if desde <= 1 else self._fenwick.buscar(desde) - 1
+        orden = self._orden
+        entradas = self._entradas
+        for i in range(inicio, len(orden)):
+            entrada = entradas.get(orden[i])
+            if entrada is not None and entrada[0] == i + 1:
+                yield orden[i], entrada[1]
+    
+    def agregar(self, ticket, paciente):
+        """Agregar al final (enqueue) - O(log n)"""
+        secuencia = self._fenwick.agregar(1)
+        self._orden.append(ticket)
+        self._entradas[ticket] = (secuencia, paciente)
+    
+    def ticket_frente(self):
+        """Ticket del frente sin eliminarlo, o None si está vacía"""
+        orden = self._orden
+        # Descartar lápidas acumuladas en el frente
+        while self._inicio < len(orden) and not self._vivo(self._inicio):
+            self._inicio += 1
+        if self._inicio < len(orden):
+            return orden[self._inicio]
+        return None
+    
+    def _vivo(self, i):
+        """Si el hueco i de _orden (base 0) tiene un turno vivo"""
+        entrada = self._entradas.get(self._orden[i])
+        return entrada is not None and entrada[0] == i + 1
+    
+    def insertar_antes(self, ticket, paciente, siguiente):
+        """Agregar justo antes del ticket `siguiente` (al final si es None).
+        
+        Reusa la lápida pegada a `siguiente`, que es la que dejó el turno al
+        salir si no hubo cambios en el medio - O(log n). Si no hay lápida
+        (la cola se compactó), reconstruye - O(n).
+        """
+        if siguiente is None:
+            self.agregar(ticket, paciente)
+            return
+        i = self._entradas[siguiente][0] - 2   # Hueco anterior, base 0
+        if i >= 0 and not self._vivo(i):
+            self._orden[i] = ticket
+            self._entradas[ticket] = (i + 1, paciente)
+            self._fenwick.actualizar(i + 1, 1)
+            self._inicio = min(self._inicio, i)
+            return
+        self._entradas[ticket] = (0, paciente)
+        orden = self._vivos_en_orden()
+        orden.insert(orden.index(siguiente), ticket)
+        self._reconstruir(orden)
+    
+    def frente(self):
+        """Paciente del frente sin eliminarlo (peek)"""
+        ticket = self.ticket_frente()
+        return None if ticket is None else self._entradas[ticket][1]
+    
+    def obtener(self, ticket):
+        """Paciente con ese ticket, o None"""
+        entrada = self._entradas.get(ticket)
+        return None if entrada is None else entrada[1]
+    
+    def quitar(self, ticket):
+        """Quitar un ticket de cualquier posición dejando una lápida - O(log n)"""
+        entrada = self._entradas.pop(ticket, None)
+        if entrada is None:
+            return None
+        self._fenwick.actualizar(entrada[0], -1)
+        self._compactar_si_conviene()
+        return entrada[1]
+    
+    def posicion(self, ticket):
+        """Posición (base 1) del ticket dentro de esta cola, o None"""
+        entrada = self._entradas.get(ticket)
+        if entrada is None:
+            return None
+        return self._fenwick.prefijo(entrada[0])
+    
+    def en_posicion(self, k):
+        """(ticket, paciente) en la posición k (base 1), o None"""
+        if k < 1 or k > len(self._entradas):
+            return None
+        ticket = self._orden[self._fenwick.buscar(k) - 1]
+        return ticket, self._entradas[ticket][1]
+    
+    def _compactar_si_conviene(self):
+        """Reconstruir sin lápidas cuando superan a los elementos vivos"""
+        vivos = len(self._entradas)
+        if vivos == 0:
+            self._orden = []
+            self._inicio = 0
+            self._fenwick = ArbolFenwick()
+            return
+        if len(self._orden) - vivos <= max(self.MIN_COMPACTAR, vivos):
+            return
+        self._reconstruir(self._vivos_en_orden())
+    
+    def _vivos_en_orden(self):
+        return [self._orden[i] for i in range(self._inicio, len(self._orden)) if self._vivo(i)]
+    
+    def _reconstruir(self, orden):
+        """Rearmar sin lápidas con los tickets de `orden` (todos en _entradas)"""
+        for secuencia, ticket in enumerate(orden, 1):
+            self._entradas[ticket] = (secuencia, self._entradas[ticket][1])
+        self._orden = orden
+        self._inicio = 0
+        self._fenwick = ArbolFenwick([1] * len(orden))
+
+
+class IndiceNombres:
+    """Índice ordenado de los nombres en cola para buscar mientras se escribe.
+    
+    Cada nombre normalizado entra una vez por palabra, desde esa palabra
+    hasta el final ("ana gomez" y "gomez"), así un prefijo encuentra tanto
+    el nombre como el apellido. Las claves se guardan en bloques ordenados
+    de hasta 2 * CARGA y un prefijo se ubica con dos bisect.
+    
+    Encolar y desencolar solo actualizan un contador por nombre: los
+    nombres que aparecen o desaparecen se anotan y se aplican al índice
+    en la siguiente búsqueda, uno por uno (O(√n) cada uno) o, si son
+    muchos (una importación), reconstruyendo los bloques de una vez.
+    """
+    CARGA = 512
+    
+    def __init__(self):
+        self._bloques = []      # Listas ordenadas de "clave\0nombre"
+        self._maximos = []      # Última clave de cada bloque
+        self._cantidad = {}     # nombre -> turnos en cola con ese nombre
+        self._nuevos = {}       # Nombres todavía fuera de los bloques
+        self._eliminados = {}   # Nombres sin turnos todavía en los bloques
+    
+    def __len__(self):
+        return len(self._cantidad)
+    
+    def __contains__(self, nombre):
+        return nombre in self._cantidad
+    
+    def agregar(self, nombre):
+        """Contar un turno más con ese nombre (ya normalizado)"""
+        cantidad = self._cantidad.get(nombre, 0)
+        self._cantidad[nombre] = cantidad + 1
+        if cantidad == 0:
+            if nombre in self._eliminados:
+                del self._eliminados[nombre]
+            else:
+                self._nuevos[nombre] = None
+    
+    def quitar(self, nombre):
+        """Descontar un turno con ese nombre; sin turnos sale del índice"""
+        cantidad = self._cantidad[nombre] - 1
+        if cantidad:
+            self._cantidad[nombre] = cantidad
+            return
+        del self._cantidad[nombre]
+        if nombre in self._nuevos:
+            del self._nuevos[nombre]
+        else:
+            self._eliminados[nombre] = None
+    
+    def con_prefijo(self, prefijo, limite=10):
+        """Hasta `limite` nombres con una palabra que empieza con `prefijo`
+        (y sigue como él), en orden alfabético desde esa palabra"""
+        self._aplicar_cambios()
+        nombres = {}
+        bloques = self._bloques
+        i = bisect_left(self._maximos, prefijo)
+        if i == len(bloques):
+            return []
+        j = bisect_left(bloques[i], prefijo)
+        while i < len(bloques):
+            bloque = bloques[i]
+            for k in range(j, len(bloque)):
+                clave = bloque[k]
+                if not clave.startswith(prefijo):
+                    return list(nombres)
+                nombres[clave.partition("\0")[2]] = None
+                if len(nombres) == limite:
+                    return list(nombres)
+            i += 1
+            j = 0
+        return list(nombres)
+    
+    def parecidos(self, texto, limite=10):
+        """Hasta `limite` nombres que empiezan con `texto` salvo un error de
+        tipeo: una letra de más, de menos, cambiada o dos vecinas invertidas"""
+        self._aplicar_cambios()
+        nombres = {}
+        for variante in self._variantes(texto):
+            if self._hay_prefijo(variante):
+                for nombre in self.con_prefijo(variante, limite - len(nombres)):
+                    nombres[nombre] = None
+                if len(nombres) >= limite:
+                    break
+        return list(nombres)[:limite]
+    
+    def _variantes(self, texto):
+        """Textos a un error de tipeo de `texto` que vale la pena buscar.
+        
+        Solo se cambian o agregan letras que de verdad siguen a lo anterior
+        en el índice, y solo hasta donde el texto deja de coincidir con él
+        (el error no puede estar después). Cambiar la última letra o
+        agregar al final sobra: el prefijo sin la última letra ya lo cubre.
+        """
+        n = len(texto)
+        variantes = {}
+        for i in range(n):
+            anterior = texto[:i]
+            if i and not self._hay_prefijo(anterior):
+                break
+            variantes[anterior + texto[i + 1:]] = None
+            if i < n - 1:
+                variantes[anterior + texto[i + 1] + texto[i] + texto[i + 2:]] = None
+            for letra in self._siguientes(anterior):
+                if i < n - 1 and letra != texto[i]:
+                    variantes[anterior + letra + texto[i + 1:]] = None
+                variantes[anterior + letra + texto[i:]] = None
+        variantes.pop(texto, None)
+        return [variante for variante in variantes if variante and variante.strip() == variante]
+    
+    def _siguientes(self, prefijo):
+        """Letras que siguen a `prefijo` en alguna clave, saltando con bisect"""
+        letras = []
+        largo = len(prefijo)
+        desde = prefijo
+        while True:
+            clave = self._primera_desde(desde)
+            if clave is None or not clave.startswith(prefijo):
+                return letras
+            letra = clave[largo]   # Las claves terminan en "\0" + nombre: siempre hay una más
+            if letra != "\0":
+                letras.append(letra)
+            desde = prefijo + chr(ord(letra) + 1)
+    
+    def _primera_desde(self, texto):
+        """Primera clave >= texto, o None"""
+        i = bisect_left(self._maximos, texto)
+        if i == len(self._bloques):
+            return None
+        bloque = self._bloques[i]
+        return bloque[bisect_left(bloque, texto)]
+    
+    def _hay_prefijo(self, prefijo):
+        clave = self._primera_desde(prefijo)
+        return clave is not None and clave.startswith(prefijo)
+    
+    @staticmethod
+    def _claves(nombre):
+        palabras = nombre.split(" ")
+        return [" ".join(palabras[i:]) + "\0" + nombre for i in range(len(palabras))]
+    
+    def _aplicar_cambios(self):
+        """Llevar a los bloques los nombres anotados por agregar y quitar"""
+        cambios = len(self._nuevos) + len(self._eliminados)
+        if not cambios:
+            return
+        if cambios > len(self._cantidad) // 8:
+            # Reconstruir ordena en C: más barato que muchas altas sueltas
+            claves = sorted(clave for nombre in self._cantidad for clave in self._claves(nombre))
+            self._bloques = [claves[i:i + self.CARGA] for i in range(0, len(claves), self.CARGA)]
+            self._maximos = [bloque[-1] for bloque in self._bloques]
+        else:
+            for nombre in self._eliminados:
+                for clave in self._claves(nombre):
+                    self._borrar(clave)
+            for nombre in self._nuevos:
+                for clave in self._claves(nombre):
+                    self._insertar(clave)
+        self._nuevos = {}
+        self._eliminados = {}
+    
+    def _insertar(self, clave):
+        bloques = self._bloques
+        if not bloques:
+            bloques.append([clave])
+            self._maximos.append(clave)
+            return
+        i = bisect_left(self._maximos, clave)
+        if i == len(bloques):
+            # Mayor que todas: va al final del último bloque
+            i -= 1
+            bloques[i].append(clave)
+            self._maximos[i] = clave
+        else:
+            insort(bloques[i], clave)
+        bloque = bloques[i]
+        if len(bloque) > 2 * self.CARGA:
+            bloques[i:i + 1] = [bloque[:self.CARGA], bloque[self.CARGA:]]
+            self._maximos[i:i + 1] = [bloque[self.CARGA - 1], bloque[-1]]
+    
+    def _borrar(self, clave):
+        i = bisect_left(self._maximos, clave)
+        bloque = self._bloques[i]
+        del bloque[bisect_left(bloque, clave)]
+        if not bloque:
+            del self._bloques[i]
+            del self._maximos[i]
+        elif self._maximos[i] == clave:
+            self._maximos[i] = bloque[-1]
+
+
+class ColaTurnos:
+    """Implementación de Cola (Queue) con FIFO para gestión de turnos.
+    
+    Los turnos se ordenan por nivel de triage (1 a 5) y por orden de
+    llegada dentro de cada nivel. Con `envejecimiento` (minutos, igual para
+    todos los niveles o un diccionario nivel -> minutos) el turno que más
+    espera en un nivel pasa al final del nivel siguiente, así ningún nivel
+    queda sin atender aunque lleguen urgencias sin parar.
+    """
+    # Par vacío para especialidades sin turnos (no se modifica nunca)
+    _SIN_COLAS = tuple(ColaIndexada() for _ in range(NIVELES_TRIAGE))
+    
+    def __init__(self, envejecimiento=None, reloj=time.time):
+        # Una cola FIFO por nivel de triage (índice 0 = nivel 1, el más urgente)
+        self.niveles = tuple(ColaIndexada() for _ in range(NIVELES_TRIAGE))
+        
+        # Subcolas por especialidad: especialidad -> colas por nivel.
+        # Cada turno está a la vez en la cola global y en la de su especialidad,
+        # así cada consultorio atiende su frente sin mirar otras especialidades
+        self.colas_especialidad = {}
+        
+        # Índices hash para cancelar y buscar sin recorrer las colas
+        self.siguiente_ticket = 1
+        self._por_ticket = {}   # ticket -> paciente
+        self._por_nombre = {}   # (nombre normalizado, nivel) -> {ticket: paciente} en orden de la cola
+        self._nombres = IndiceNombres()   # Prefijos de los nombres, para sugerir
+        
+        # Agregados para estadísticas en O(1)
+        self._suma_registro_us = 0   # Suma de horas de registro (microsegundos)
+        self._emergencias = 0        # Turnos con triage de emergencia
+        self._emergencias_especialidad = {}
+        
+        # Envejecimiento: ticket -> momento en que subió a su nivel actual
+        # (los que no subieron cuentan desde su hora de registro)
+        self.reloj = reloj
+        self._umbrales = ()
+        self._promovidos = {}
+        self._promovidos_por_registro = []   # heap (registro, ticket), perezoso
+        self.promociones = 0                 # Cambios de nivel desde que se creó la cola
+        # Por nivel con umbral, heap perezoso (desde, ticket) de lo que espera
+        # en él: el orden FIFO del nivel no es el de espera (un promovido entra
+        # al final con su hora de subida, reinsertar vuelve al medio)
+        self._por_espera = tuple([] for _ in range(NIVELES_TRIAGE))
+        self.configurar_envejecimiento(envejecimiento)
+        
+        # Funciones notificadas en cada cambio: funcion(evento, ticket, paciente),
+        # y cuántos cambios de cada evento hubo desde que se creó la cola
+        self._observadores = []
+        self.eventos = collections.Counter()
+    
+    def configurar_envejecimiento(self, envejecimiento):
+        """Minutos de espera en un nivel antes de subir al siguiente (None: nunca)"""
+        umbrales = [None] * (NIVELES_TRIAGE + 1)
+        if isinstance(envejecimiento, dict):
+            for nivel, minutos in envejecimiento.items():
+                umbrales[validar_nivel(nivel)] = minutos * 60
+        elif envejecimiento is not None:
+            umbrales[2:] = [envejecimiento * 60] * (NIVELES_TRIAGE - 1)
+        umbrales[1] = None   # El nivel 1 no tiene a dónde subir
+        self._umbrales = tuple(umbrales)
+        for indice, (cola, heap) in enumerate(zip(self.niveles, self._por_espera)):
+            heap.clear()
+            if umbrales[indice + 1] is not None:
+                heap.extend((self._promovidos.get(ticket, paciente.registro), ticket)
+                            for ticket, paciente in cola.items())
+                heapq.heapify(heap)
+    
+    def suscribir(self, funcion):
+        """Registrar una función a notificar en cada encolar/desencolar/cancelar/
+        promover/reinsertar/deshacer"""
+        self._observadores.append(funcion)
+    
+    def desuscribir(self, funcion):
+        """Dejar de notificar a una función registrada con suscribir"""
+        self._observadores.remove(funcion)
+    
+    def _notificar(self, evento, ticket, paciente):
+        self.eventos[evento] += 1
+        for funcion in self._observadores:
+            funcion(evento, ticket, paciente)
+    
+    def encolar(self, paciente):
+        """Agregar paciente al final de la cola de su nivel (enqueue).
+        
+        Retorna el ticket único asignado al turno.
+        """
+        ticket = self.siguiente_ticket
+        self._agregar(ticket, paciente)
+        self._notificar('encolar', ticket, paciente)
+        return ticket
+    
+    def encolar_lote(self, pacientes):
+        """Encolar varios pacientes en orden; retorna la lista de tickets"""
+        tickets = []
+        for paciente in pacientes:
+            ticket = self.siguiente_ticket
+            self._agregar(ticket, paciente)
+            self._notificar('encolar', ticket, paciente)
+            tickets.append(ticket)
+        return tickets
+    
+    def restaurar(self, ticket, paciente, nivel=None, desde=None):
+        """Volver a encolar un turno persistido conservando su ticket.
+        
+        Se agrega al final de la cola de `nivel` (por defecto el de su
+        triage) como encolar, pero sin notificar a los observadores: es
+        estado recuperado, no un turno nuevo. `desde` es el momento en que
+        subió a ese nivel, si llegó por envejecimiento.
+        """
+        if ticket in self._por_ticket:
+            raise ValueError(f"El ticket {ticket} ya está en la cola")
+        self._agregar(ticket, paciente, nivel, desde)
+    
+    def reinsertar(self, ticket, paciente, nivel, siguiente=None, desde=None):
+        """Poner un turno en la cola de `nivel` justo antes del ticket
+        `siguiente` (al final si es None); si ya está en la cola, se mueve.
+        
+        Sirve para deshacer un desencolar, una cancelación o un cambio de
+        nivel (ver turnos.versiones): el turno vuelve a su lugar. `desde` es
+        el momento en que subió a ese nivel, si llegó por envejecimiento.
+        """
+        if ticket in self._por_ticket:
+            self._quitar(ticket)
+        validar_nivel(nivel)
+        if siguiente is not None and siguiente not in self.niveles[nivel - 1]:
+            raise ValueError(f"El ticket {siguiente} no está en el nivel {nivel}")
+        self._agregar(ticket, paciente, nivel, desde, siguiente)
+        self._notificar('reinsertar', ticket, paciente)
+    
+    def _agregar(self, ticket, paciente, nivel=None, desde=None, siguiente=None):
+        """Alta de un turno en las colas, los índices y los agregados (al
+        final de su nivel, o antes del ticket `siguiente`)"""
+        self.siguiente_ticket = max(self.siguiente_ticket, ticket + 1)
+        paciente.ticket = ticket
+        
+        indice = (paciente.nivel if nivel is None else nivel) - 1
+        if siguiente is None:
+            self.niveles[indice].agregar(ticket, paciente)   # Al final de su nivel
+            self._colas_de(paciente.especialidad)[indice].agregar(ticket, paciente)
+        else:
+            cola = self.niveles[indice]
+            cola.insertar_antes(ticket, paciente, siguiente)
+            subcola = self._colas_de(paciente.especialidad)[indice]
+            subcola.insertar_antes(ticket, paciente, self._siguiente_en(subcola, cola, ticket))
+        if desde is not None:
+            self._marcar_promovido(ticket, paciente, desde)
+        if self._umbrales[indice + 1] is not None:
+            heapq.heappush(self._por_espera[indice], (paciente.registro if desde is None else desde, ticket))
+        
+        self._por_ticket[ticket] = paciente
+        nombre = normalizar_nombre(paciente.nombre)
+        tickets = self._por_nombre.setdefault((nombre, indice), {})
+        tickets[ticket] = paciente
+        if siguiente is not None and len(tickets) > 1:
+            # Los homónimos van en orden de la cola (ver cancelar_turno)
+            self._por_nombre[(nombre, indice)] = {
+                t: tickets[t] for t in sorted(tickets, key=self.niveles[indice].posicion)}
+        self._nombres.agregar(nombre)
+        self._suma_registro_us += _registro_us(paciente)
+        if paciente.es_emergencia:
+            self._emergencias += 1
+            especialidad = paciente.especialidad
+            self._emergencias_especialidad[especialidad] = self._emergencias_especialidad.get(especialidad, 0) + 1
+    
+    @staticmethod
+    def _siguiente_en(subcola, cola, ticket):
+        """Primer ticket de `subcola` que va después de `ticket` en `cola`
+        (que los contiene a todos en el mismo orden), o None - O(log² n)"""
+        posicion = cola.posicion(ticket)
+        bajo, alto = 1, len(subcola) + 1
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if cola.posicion(subcola.en_posicion(medio)[0]) > posicion:
+                alto = medio
+            else:
+                bajo = medio + 1
+        return None if bajo > len(subcola) else subcola.en_posicion(bajo)[0]
+    
+    def _colas_de(self, especialidad):
+        """Colas por nivel de una especialidad, creándolas si hace falta"""
+        colas = self.colas_especialidad.get(especialidad)
+        if colas is None:
+            colas = self.colas_especialidad[especialidad] = tuple(
+                ColaIndexada() for _ in range(NIVELES_TRIAGE))
+        return colas
+    
+    def _colas_en_orden(self, especialidad=None):
+        """Colas por nivel, globales o de una especialidad"""
+        if especialidad is None:
+            return self.niveles
+        return self.colas_especialidad.get(especialidad, self._SIN_COLAS)
+    
+    def desencolar(self, especialidad=None):
+        """Eliminar y retornar el primer paciente de la cola (dequeue).
+        
+        Con `especialidad` se atiende el frente de esa especialidad (para
+        un consultorio), respetando los niveles de triage dentro de ella.
+        """
+        self.envejecer()
+        # Prioridad: el nivel más urgente con pacientes, FIFO dentro de él
+        for cola in self._colas_en_orden(especialidad):
+            ticket = cola.ticket_frente()
+            if ticket is not None:
+                paciente = self._quitar(ticket)  # Elimina del frente (FIFO)
+                self._notificar('desencolar', ticket, paciente)
+                return paciente
+        return None
+    
+    def cancelar_turno(self, nombre_paciente):
+        """Cancelar el primer turno (en orden de atención) con ese nombre"""
+        ticket = self._ticket_por_nombre(nombre_paciente)
+        if ticket is None:
+            return False
+        return self.cancelar_ticket(ticket)
+    
+    def cancelar_ticket(self, ticket):
+        """Cancelar turno por ticket - O(log n), sin desplazar la cola"""
+        if ticket not in self._por_ticket:
+            return False
+        paciente = self._quitar(ticket)
+        self._notificar('cancelar', ticket, paciente)
+        return True
+    
+    def _retirar(self, ticket):
+        """Sacar un turno recién encolado al deshacerlo (ver turnos.versiones).
+        
+        No es una cancelación: se notifica 'deshacer', así el historial, el
+        estimador y los avisos no lo cuentan como un turno que salió.
+        """
+        paciente = self._quitar(ticket)
+        self._notificar('deshacer', ticket, paciente)
+        return paciente
+    
+    def promover(self, ticket, nivel, desde=None):
+        """Mover un turno al final de la cola de `nivel` - O(log n).
+        
+        Lo usa el envejecimiento (y sirve para cambiar el triage de un
+        turno en espera). `desde` es el momento del cambio (por defecto,
+        ahora). Retorna False si el ticket no está en la cola.
+        """
+        paciente = self._por_ticket.get(ticket)
+        if paciente is None:
+            return False
+        indice = validar_nivel(nivel) - 1
+        actual = self._indice_nivel(ticket, self.niveles)
+        colas = self.colas_especialidad[paciente.especialidad]
+        self.niveles[actual].quitar(ticket)
+        colas[actual].quitar(ticket)
+        self.niveles[indice].agregar(ticket, paciente)
+        colas[indice].agregar(ticket, paciente)
+        nombre = normalizar_nombre(paciente.nombre)
+        self._quitar_nombre((nombre, actual), ticket)
+        self._por_nombre.setdefault((nombre, indice), {})[ticket] = paciente
+        desde = self.reloj() if desde is None else desde
+        self._marcar_promovido(ticket, paciente, desde)
+        if self._umbrales[indice + 1] is not None:
+            heapq.heappush(self._por_espera[indice], (desde, ticket))
+        self.promociones += 1
+        self._notificar('promover', ticket, paciente)
+        return True
+    
+    def _marcar_promovido(self, ticket, paciente, desde):
+        if ticket not in self._promovidos:
+            heapq.heappush(self._promovidos_por_registro, (paciente.registro, ticket))
+        self._promovidos[ticket] = desde
+    
+    def envejecer(self, ahora=None):
+        """Subir de nivel a los turnos que superaron la espera configurada.
+        
+        El que más espera en un nivel no es siempre el del frente (los
+        promovidos y los reinsertados no llegan en orden de espera): se
+        mira el tope del heap del nivel, O(log n) por turno promovido más
+        las entradas viejas que se descartan. Se llama sola al desencolar y
+        al ver el frente. Retorna cuántos turnos subieron.
+        """
+        umbrales = self._umbrales
+        if not any(umbrales):
+            return 0
+        if ahora is None:
+            ahora = self.reloj()
+        promovidos = 0
+        # Del menos urgente al más urgente: quien sube puede seguir subiendo
+        for nivel in range(NIVELES_TRIAGE, 1, -1):
+            umbral = umbrales[nivel]
+            if umbral is None:
+                continue
+            cola = self.niveles[nivel - 1]
+            heap = self._por_espera[nivel - 1]
+            while heap:
+                desde, ticket = heap[0]
+                if ahora - desde < umbral:
+                    break
+                heapq.heappop(heap)
+                # Entrada vieja: el turno salió del nivel o cambió su espera
+                if (ticket not in cola
+                        or self._promovidos.get(ticket, self._por_ticket[ticket].registro) != desde):
+                    continue
+                # Sube con la hora en que le tocaba, no con la de este
+                # chequeo: el resultado no depende de cada cuánto se llame
+                self.promover(ticket, nivel - 1, desde + umbral)
+                promovidos += 1
+        return promovidos
+    
+    def nivel_actual(self, ticket):
+        """(nivel en que espera, momento en que subió a él o None), o None"""
+        if ticket not in self._por_ticket:
+            return None
+        return (self._indice_nivel(ticket, self.niveles) + 1, self._promovidos.get(ticket))
+    
+    def buscar_paciente(self, nombre_paciente):
+        """Buscar paciente y retornar (paciente, posición_global)"""
+        ticket = self._ticket_por_nombre(nombre_paciente)
+        if ticket is None:
+            return (None, -1)
+        return self.buscar_ticket(ticket)
+    
+    def buscar_ticket(self, ticket):
+        """Buscar por ticket y retornar (paciente, posición_global)"""
+        paciente = self._por_ticket.get(ticket)
+        if paciente is None:
+            return (None, -1)
+        
+        return (paciente, self._posicion(ticket, self.niveles))
+    
+    def buscar_ticket_especialidad(self, ticket):
+        """Buscar por ticket y retornar (paciente, posición en su especialidad)"""
+        paciente = self._por_ticket.get(ticket)
+        if paciente is None:
+            return (None, -1)
+        colas = self.colas_especialidad[paciente.especialidad]
+        return (paciente, self._posicion(ticket, colas))
+    
+    @staticmethod
+    def _indice_nivel(ticket, colas):
+        for indice, cola in enumerate(colas):
+            if ticket in cola:
+                return indice
+        return None
+    
+    def _posicion(self, ticket, colas):
+        """Posición de un ticket dentro de unas colas por nivel"""
+        # Los niveles más urgentes van primero; dentro del nivel, su posición FIFO
+        posicion = 0
+        for cola in colas:
+            en_cola = cola.posicion(ticket)
+            if en_cola is not None:
+                return posicion + en_cola
+            posicion += len(cola)
+        return None
+    
+    def turno_en_posicion(self, posicion):
+        """(ticket, paciente) en la posición global indicada (base 1), o None"""
+        for cola in self.niveles:
+            if posicion <= len(cola):
+                return cola.en_posicion(posicion)
+            posicion -= len(cola)
+        return None
+    
+    def _ticket_por_nombre(self, nombre_paciente):
+        """Primer ticket en orden de atención con ese nombre, o None"""
+        nombre = normalizar_nombre(nombre_paciente)
+        # Gana el nivel más urgente y, dentro de él, el primero de la cola
+        # (cada diccionario está en el orden de su nivel)
+        for indice in range(NIVELES_TRIAGE):
+            tickets = self._por_nombre.get((nombre, indice))
+            if tickets:
+                return next(iter(tickets))
+        return None
+    
+    def sugerir(self, texto, limite=10):
+        """Turnos para sugerir mientras se escribe un nombre.
+        
+        Los nombres con una palabra que empieza con `texto` (sin importar
+        tildes ni mayúsculas) o, si no hay ninguno, los que empiezan así
+        salvo un error de tipeo. Retorna hasta `limite` pares (ticket,
+        paciente); los homónimos van juntos, en orden de atención.
+        """
+        clave = normalizar_nombre(texto)
+        if not clave or limite <= 0:
+            return []
+        nombres = self._nombres.con_prefijo(clave, limite)
+        if not nombres and len(clave) >= 3:
+            # Con menos de 3 letras casi cualquier nombre está a un error
+            nombres = self._nombres.parecidos(clave, limite)
+        turnos = []
+        for nombre in nombres:
+            for indice in range(NIVELES_TRIAGE):
+                for ticket, paciente in self._por_nombre.get((nombre, indice), {}).items():
+                    turnos.append((ticket, paciente))
+                    if len(turnos) == limite:
+                        return turnos
+        return turnos
+    
+    def _quitar(self, ticket):
+        """Quitar un turno de las colas, los índices y los agregados"""
+        paciente = self._por_ticket.pop(ticket)
+        indice = self._indice_nivel(ticket, self.niveles)
+        self.niveles[indice].quitar(ticket)
+        self.colas_especialidad[paciente.especialidad][indice].quitar(ticket)
+        self._promovidos.pop(ticket, None)
+        
+        nombre = normalizar_nombre(paciente.nombre)
+        self._quitar_nombre((nombre, indice), ticket)
+        self._nombres.quitar(nombre)
+        
+        self._suma_registro_us -= _registro_us(paciente)
+        if paciente.es_emergencia:
+            self._emergencias -= 1
+            self._emergencias_especialidad[paciente.especialidad] -= 1
+        return paciente
+    
+    def _quitar_nombre(self, clave, ticket):
+        tickets = self._por_nombre[clave]
+        del tickets[ticket]
+        if not tickets:
+            del self._por_nombre[clave]
+    
+    def turnos(self):
+        """Recorrer (ticket, paciente) en orden de atención"""
+        for cola in self.niveles:
+            yield from cola.items()
+    
+    def iterar_turnos(self, offset=0, limit=None, tipo=None, especialidad=None):
+        """Recorrer los turnos en orden de atención sin armar la lista completa.
+        
+        Genera tuplas con los campos de CAMPOS_TURNO. El reloj se lee una sola
+        vez y el salto a `offset` cuesta O(log n); con `especialidad` se
+        recorre solo su subcola. La posición es siempre la global.
+        
+        El tipo (EMERGENCIA o NORMAL) es el del triage del paciente, que no
+        cambia al envejecer; con `tipo` el salto a `offset` recorre los
+        turnos salteados.
+        """
+        ahora = datetime.now().timestamp()
+        restantes = -1 if limit is None else limit
+        if restantes == 0:
+            return
+        
+        colas = self._colas_en_orden(especialidad)
+        base = 0
+        for indice, (cola, cola_global) in enumerate(zip(colas, self.niveles)):
+            nivel = indice + 1
+            if tipo == 'EMERGENCIA' and nivel > NIVEL_EMERGENCIA:
+                return   # Una emergencia nunca espera en un nivel menos urgente
+            if tipo is None and offset >= len(cola):
+                # Saltar colas enteras y ubicar el inicio con el árbol de Fenwick
+                offset -= len(cola)
+                base += len(cola_global)
+                continue
+            
+            desde = offset + 1 if tipo is None else 1
+            posicion = base + (offset if tipo is None else 0)
+            for ticket, paciente in cola.items(desde):
+                if especialidad is None:
+                    posicion += 1
+                else:
+                    posicion = base + cola_global.posicion(ticket)
+                tipo_turno = 'EMERGENCIA' if paciente.es_emergencia else 'NORMAL'
+                if tipo is not None:
+                    if tipo_turno != tipo:
+                        continue
+                    if offset:
+                        offset -= 1
+                        continue
+                
+                minutos = int((ahora - paciente.registro) / 60)
+                yield (posicion, ticket, paciente.nombre, paciente.telefono,
+                       paciente.hora, paciente.especialidad, tipo_turno, minutos, nivel)
+                restantes -= 1
+                if restantes == 0:
+                    return
+            if tipo is None:
+                offset = 0
+            base += len(cola_global)
+    
+    def contar_turnos(self, tipo=None, especialidad=None):
+        """Cantidad de turnos que recorrería iterar_turnos con esos filtros - O(1)"""
+        if especialidad is None:
+            emergencias = self._emergencias
+        else:
+            emergencias = self._emergencias_especialidad.get(especialidad, 0)
+        if tipo == 'EMERGENCIA':
+            return emergencias
+        total = self.tamaño(especialidad)
+        if tipo == 'NORMAL':
+            return total - emergencias
+        return total
+    
+    def obtener_lista_completa(self):
+        """Obtener lista completa de pacientes en orden de atención.
+        
+        Versión en diccionarios de iterar_turnos, que es preferible para
+        recorrer la cola o mostrar solo una parte.
+        """
+        return [{
+            'posicion': posicion,
+            'ticket': ticket,
+            'paciente': nombre,
+            'telefono': telefono,
+            'hora': hora,
+            'especialidad': especialidad,
+            'tipo': tipo,
+            'tiempo_espera': f"{minutos} min",
+            'nivel': nivel
+        } for (posicion, ticket, nombre, telefono, hora,
+               especialidad, tipo, minutos, nivel) in self.iterar_turnos()]
+    
+    def obtener_estadisticas(self):
+        """Calcular estadísticas de las colas en O(k) con k especialidades.
+        
+        Usa los agregados mantenidos en encolar/desencolar/cancelar: el tiempo
+        promedio es ahora - media(hora de registro), sin recorrer pacientes.
+        """
+        return combinar_estadisticas([self.agregados()])
+    
+    def agregados(self):
+        """Agregados de la cola que se pueden sumar entre colas (ver
+        combinar_estadisticas): conteos, suma de horas de registro y la
+        hora de registro más antigua (timestamp o None)"""
+        mas_antiguo = self._registro_mas_antiguo()
+        return {
+            'total': self.tamaño(),
+            'emergencias': self._emergencias,
+            'suma_registro_us': self._suma_registro_us,
+            'registro_mas_antiguo': mas_antiguo,
+            'por_especialidad': self.conteo_por_especialidad(),
+            'por_nivel': {nivel: len(cola) for nivel, cola in enumerate(self.niveles, 1) if cola}
+        }
+    
+    def conteo_por_especialidad(self):
+        """especialidad -> pacientes en cola (solo las que tienen alguno)"""
+        conteo = {}
+        for especialidad, colas in self.colas_especialidad.items():
+            cantidad = sum(len(cola) for cola in colas)
+            if cantidad:
+                conteo[especialidad] = cantidad
+        return conteo
+    
+    def registro_mas_antiguo(self):
+        """Hora de registro del paciente que más espera, o None - O(1) amortizado"""
+        registro = self._registro_mas_antiguo()
+        return None if registro is None else datetime.fromtimestamp(registro)
+    
+    def _registro_mas_antiguo(self):
+        # En cada nivel, entre los que llegaron directo, el más antiguo es el
+        # del frente (la hora de registro crece con el orden de llegada); los
+        # que subieron por envejecimiento se siguen aparte en un heap
+        registros = [cola.frente().registro for cola in self.niveles if cola]
+        heap = self._promovidos_por_registro
+        while heap and heap[0][1] not in self._promovidos:
+            heapq.heappop(heap)
+        if heap:
+            registros.append(heap[0][0])
+        return min(registros) if registros else None
+    
+    def primeros(self, limite, especialidad=None):
+        """Los primeros `limite` turnos (ticket, paciente, nivel) en orden de
+        atención, globales o de una especialidad - O(limite + niveles).
+        
+        No envejece la cola (se puede llamar desde un observador).
+        """
+        resultado = []
+        for nivel, cola in enumerate(self._colas_en_orden(especialidad), 1):
+            if len(resultado) >= limite:
+                break
+            # ticket_frente descarta las lápidas del frente (las que deja en
+            # la subcola de la especialidad un llamado global) antes de recorrer
+            if not cola or cola.ticket_frente() is None:
+                continue
+            for ticket, paciente in cola.items():
+                resultado.append((ticket, paciente, nivel))
+                if len(resultado) >= limite:
+                    break
+        return resultado
+    
+    def registro_medio(self):
+        """Hora de registro media (timestamp) de los que esperan, o None - O(1);
+        el tiempo promedio de espera es ahora menos este valor"""
+        total = len(self._por_ticket)
+        return self._suma_registro_us / total / 1_000_000 if total else None
+    
+    def ver_primero(self, especialidad=None):
+        """Ver el primer paciente (global o de una especialidad) sin eliminarlo (peek)"""
+        self.envejecer()
+        for cola in self._colas_en_orden(especialidad):
+            if cola:
+                return cola.frente()
+        return None
+    
+    def esta_vacia(self, especialidad=None):
+        """Verificar si la cola (global o de una especialidad) está vacía"""
+        return self.tamaño(especialidad) == 0
+    
+    def tamaño(self, especialidad=None):
+        """Retornar tamaño total de las colas de todos los niveles (globales o de una especialidad)"""
+        return sum(len(cola) for cola in self._colas_en_orden(especialidad))
+
+
+# IMPLEMENTACIÓN DE COLA (QUEUE) CON FIFO
+# ========================================
+#
+# ESTRUCTURA DE DATOS: Cola (Queue)
+# - ColaIndexada: lista de tickets + puntero al frente + índice hash por ticket
+# - Una cola por nivel de triage (1 a 5); las emergencias son los niveles 1 y 2
+# - Cada cola mantiene orden FIFO estricto
+# - Árbol de Fenwick sobre los números de secuencia para conocer posiciones
+#
+# OPERACIONES PRINCIPALES:
+# 1. ENCOLAR (enqueue): agregar al FINAL de la cola de su nivel
+#    - Tiempo: O(log n) (alta en el árbol de Fenwick)
+#    - Retorna un ticket único para el turno
+#
+# 2. DESENCOLAR (dequeue): eliminar del FRENTE del nivel más urgente con turnos
+#    - Tiempo: O(log n), el frente avanza saltando lápidas (amortizado O(1))
+#
+# 3. VER FRENTE (peek): ver primer elemento sin eliminarlo
+#    - Tiempo: O(1) amortizado (a lo sumo 5 niveles)
+#
+# 4. CANCELAR (por ticket o nombre): lápida perezosa, sin desplazar la cola
+#    - Tiempo: O(log n) (índice hash + actualización del árbol)
+#    - Cuando las lápidas superan a los vivos se compacta: amortizado O(1)
+#
+# 5. BUSCAR POSICIÓN (por ticket o nombre): tamaños de los niveles anteriores
+#    más la suma de prefijo en el árbol de su nivel
+#    - Tiempo: O(log n)
+#    - Por nombre: índice (nombre, nivel) en orden de la cola, el primero en O(1)
+#    - Nombres sin tildes ni mayúsculas ("Gomez" encuentra a "Gómez")
+#
+# 6. SUGERIR (mientras se escribe): prefijo de cualquier palabra del nombre
+#    - Claves ordenadas en bloques: ubicar el prefijo en O(log n)
+#    - Alta o baja de un nombre nuevo: O(√n) por palabra
+#    - Sin resultados: variantes a un error de tipeo, probando solo letras
+#      que siguen en el índice
+#
+# PRINCIPIO FIFO:
+# "First In, First Out" - El primero en entrar es el primero en salir
+# Como una fila en el banco: quien llega primero, es atendido primero
+#
+# SUBCOLAS POR ESPECIALIDAD:
+# - Cada turno está en la cola global y en la cola del mismo nivel de su
+#   especialidad; desencolar(especialidad) atiende ese frente
+# - Tamaño y frente por especialidad en O(1), posiciones en O(log n)
+#
+# PRIORIDAD POR TRIAGE:
+# - El nivel 1 se procesa primero, después el 2, y así hasta el 5
+# - Dentro de cada nivel se respeta FIFO estricto
+# - Nadie "salta" a otro turno de su mismo nivel
+# - Posición de un turno = turnos en niveles más urgentes + posición en su nivel
+#
+# ENVEJECIMIENTO (opcional):
+# - Quien espera más de N minutos en su nivel pasa al FINAL del nivel siguiente
+# - Solo hay que mirar el frente de cada nivel: O(log n) por turno promovido
+# - La espera máxima queda acotada aunque lleguen urgencias sin parar
@@ -0,0 +1,156 @@
+"""Modo concurrente de ColaTurnos: varios hilos productores, un consumidor.
+
+Los productores (kioscos de registro, reservas telefónicas) dejan pacientes
+en un buffer de ingreso sin tomar el cerrojo: deque.append es atómico en
+CPython. El hilo dueño de la cola (el de Tk, vía root.after) los drena por
+lotes. El resto de las operaciones se serializan con un cerrojo y las
+lecturas devuelven copias consistentes.
+
+IngresoArchivo es un productor listo para usar: sigue un archivo JSONL al
+que los kioscos agregan un paciente por línea. La interfaz lo activa con
+`python -m turnos gui --ingreso ARCHIVO`, que envuelve su cola en una
+ColaTurnosConcurrente y la drena con root.after. Quien embebe la cola con
+productores propios usa el envoltorio directamente (ver
+benchmarks/estres_productores.py).
+"""
+import json
+import os
+import threading
+import types
+from collections import deque
+from datetime import datetime
+
+from .cola import ColaTurnos
+from .importacion import paciente_desde_fila
+from .paciente import ESPECIALIDADES
+
+
+class ColaTurnosConcurrente:
+    """Envoltorio seguro para hilos de una ColaTurnos.
+
+    Cualquier método de ColaTurnos puede llamarse sobre el envoltorio: se
+    ejecuta con el cerrojo tomado, y los generadores (iterar_turnos, turnos)
+    se materializan en listas antes de soltarlo.
+    """
+    def __init__(self, cola=None):
+        self.cola = cola if cola is not None else ColaTurnos()
+        self.cerrojo = threading.RLock()
+        self._ingreso = deque()   # Buffer de ingreso de los productores
+
+    def ofrecer(self, paciente):
+        """Dejar un paciente para encolar (desde cualquier hilo, sin bloquear).
+
+        El ticket se asigna al drenar; queda en paciente.ticket.
+        """
+        self._ingreso.append(paciente)
+
+    def pendientes(self):
+        """Pacientes ofrecidos que aún no se encolaron"""
+        return len(self._ingreso)
+
+    def drenar(self, maximo=None):
+        """Encolar lo acumulado en el buffer de ingreso; retorna los tickets.
+
+        Respeta el orden de llegada al buffer, así cada productor conserva
+        su FIFO dentro de cada prioridad.
+        """
+        ingreso = self._ingreso
+        lote = []
+        while ingreso and (maximo is None or len(lote) < maximo):
+            lote.append(ingreso.popleft())
+        if not lote:
+            return []
+        with self.cerrojo:
+            return self.cola.encolar_lote(lote)
+
+    def instantanea(self, offset=0, limit=None, tipo=None, especialidad=None):
+        """(estadísticas, filas) leídas juntas, sin cambios entre una y otra"""
+        with self.cerrojo:
+            return (self.cola.obtener_estadisticas(),
+                    list(self.cola.iterar_turnos(offset, limit, tipo, especialidad)))
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self.cola, nombre)
+        if not callable(atributo):
+            return atributo
+
+        def con_cerrojo(*args, **kwargs):
+            with self.cerrojo:
+                resultado = atributo(*args, **kwargs)
+                if isinstance(resultado, types.GeneratorType):
+                    resultado = list(resultado)
+                return resultado
+
+        return con_cerrojo
+
+
+class IngresoArchivo:
+    """Hilo productor: sigue un archivo JSONL y ofrece cada paciente a una
+    ColaTurnosConcurrente.
+
+    Cada línea es un objeto con las columnas de turnos.importacion; la fecha
+    y la hora son las de la llegada (las de la línea se ignoran). Se lee
+    desde el final que tenga el archivo al iniciar (lo anterior ya se
+    ingresó) y cada `intervalo` segundos se miran las líneas nuevas. Las
+    inválidas se anotan en `errores` como (línea, [motivos]), con las
+    líneas contadas desde ese final.
+    """
+    def __init__(self, cola, ruta, especialidades=ESPECIALIDADES, intervalo=0.2):
+        self.cola = cola
+        self.ruta = ruta
+        self.especialidades = especialidades
+        self.intervalo = intervalo
+        self.ofrecidos = 0
+        self.errores = deque(maxlen=1000)
+        self._lineas = 0
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        """Empezar a seguir el archivo (se crea si no existe); retorna self"""
+        archivo = open(self.ruta, 'a+', encoding='utf-8')
+        archivo.seek(0, os.SEEK_END)
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._seguir, args=(archivo,),
+                                      name="ingreso-turnos", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        """Dejar de seguir el archivo (una línea a medio escribir se descarta)"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _seguir(self, archivo):
+        resto = ""
+        with archivo:
+            while not self._detener.is_set():
+                bloque = archivo.read()
+                if not bloque:
+                    self._detener.wait(self.intervalo)
+                    continue
+                # La última parte puede ser una línea que el kiosco no terminó
+                *lineas, resto = (resto + bloque).split("\n")
+                for linea in lineas:
+                    self._lineas += 1
+                    self._ingresar(linea.strip())
+
+    def _ingresar(self, linea):
+        if not linea:
+            return
+        try:
+            fila = json.loads(linea)
+        except json.JSONDecodeError as error:
+            self.errores.append((self._lineas, [f"JSON inválido: {error.msg}"]))
+            return
+        if isinstance(fila, dict):
+            ahora = datetime.now()
+            fila = dict(fila, fecha=ahora.strftime("%d/%m/%Y"), hora=ahora.strftime("%H:%M"))
+        paciente, errores = paciente_desde_fila(fila, self.especialidades)
+        if errores:
+            self.errores.append((self._lineas, errores))
+            return
+        self.cola.ofrecer(paciente)
+        self.ofrecidos += 1
@@ -0,0 +1,382 @@
+"""Diario de escritura anticipada (write-ahead log) para ColaTurnos.
+
+Cada encolar, desencolar, cancelar y promover se agrega a un archivo binario
+compacto antes de seguir. Cada tanto se escribe una instantánea de la cola
+viva y se empieza un diario nuevo, así la recuperación lee la instantánea
+más una cola de registros proporcional a la cola viva, no a la historia.
+Un turno reinsertado en el medio de la cola (al deshacer) se registra con
+su nivel y el ticket ante el que volvió, así el orden exacto se recupera
+sin escribir una instantánea; un encolar deshecho, como una baja.
+
+Con recuperar_agenda() el diario guarda también las reservas a futuro de
+una AgendaTurnos (reservar, y cancelar o liberar, que la quitan), y la
+instantánea las incluye. Una reserva liberada se quita después de que sus
+turnos entraron a la cola: una caída justo en el medio la deja en los
+dos lugares, nunca en ninguno.
+
+Archivos dentro del directorio:
+    cola.snap         instantánea de la generación g
+    diario.<g>.wal    operaciones posteriores a esa instantánea
+
+Formato de cada registro: crc32 (uint32) | largo (uint32) | operación (uint8)
+| datos. El CRC cubre operación y datos; un registro incompleto o corrupto
+al final del diario (escritura cortada por una caída) se descarta.
+
+El byte de tipo de cada turno es su nivel de triage; en diarios anteriores
+a los niveles era 0/1 (normal/emergencia) y se lee como nivel 3 o 1. La
+instantánea guarda además el nivel en que espera cada turno (puede haber
+subido por envejecimiento) y, al final, las reservas de la agenda; las de
+formato TURNOS01 y TURNOS02 (sin agenda) se siguen leyendo.
+"""
+import math
+import os
+import struct
+import time
+import zlib
+
+from .cola import ColaTurnos
+from .paciente import NIVEL_POR_DEFECTO_NORMAL, Paciente
+
+ENCOLAR = 1
+DESENCOLAR = 2
+CANCELAR = 3
+PROMOVER = 4
+REINSERTAR = 5
+RESERVAR = 6
+QUITAR_RESERVA = 7
+
+# Modos de durabilidad
+SIEMPRE = 'siempre'   # fsync en cada operación
+LOTE = 'lote'         # fsync agrupado (group commit) por cantidad o tiempo
+NINGUNO = 'ninguno'   # sin fsync: solo lo que el sistema operativo escriba
+
+_CABECERA = struct.Struct('<IIB')
+_TICKET = struct.Struct('<Q')
+_TURNO = struct.Struct('<QqB')
+_TEXTO = struct.Struct('<H')
+_PROMOVER = struct.Struct('<QBd')     # ticket, nivel, desde
+_NIVEL_ACTUAL = struct.Struct('<Bd')  # nivel en que espera, desde (NaN: el suyo)
+_REINSERTAR = struct.Struct('<BdQ')   # nivel, desde (NaN: el suyo), siguiente (0: al final)
+_INSTANTANEA = struct.Struct('<8sQQQ')
+_AGENDA = struct.Struct('<QQ')        # siguiente reserva, reservas
+_MAGICO = b'TURNOS03'
+_MAGICO_SIN_AGENDA = b'TURNOS02'
+_MAGICO_SIN_NIVELES = b'TURNOS01'
+
+ARCHIVO_INSTANTANEA = 'cola.snap'
+
+
+def _codificar_turno(ticket, paciente):
+    registro_us = round(paciente.registro * 1_000_000)
+    partes = [_TURNO.pack(ticket, registro_us, paciente.nivel)]
+    for texto in (paciente.nombre, paciente.telefono, paciente.fecha,
+                  paciente.hora, paciente.especialidad):
+        datos = texto.encode('utf-8')
+        partes.append(_TEXTO.pack(len(datos)))
+        partes.append(datos)
+    return b''.join(partes)
+
+
+def _decodificar_turno(datos, desplazamiento=0):
+    """Retorna (ticket, paciente, desplazamiento siguiente)"""
+    ticket, registro_us, nivel = _TURNO.unpack_from(datos, desplazamiento)
+    desplazamiento += _TURNO.size
+    textos = []
+    for _ in range(5):
+        (largo,) = _TEXTO.unpack_from(datos, desplazamiento)
+        desplazamiento += _TEXTO.size
+        textos.append(bytes(datos[desplazamiento:desplazamiento + largo]).decode('utf-8'))
+        desplazamiento += largo
+    nombre, telefono, fecha, hora, especialidad = textos
+    paciente = Paciente(nombre, telefono, fecha, hora, especialidad,
+                        nivel=nivel or NIVEL_POR_DEFECTO_NORMAL)
+    paciente.registro = registro_us / 1_000_000
+    return ticket, paciente, desplazamiento
+
+
+def _fsync_directorio(directorio):
+    # Hace durable el rename de la instantánea (no disponible en Windows)
+    if hasattr(os, 'O_DIRECTORY'):
+        descriptor = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+class DiarioTurnos:
+    """Diario persistente de una ColaTurnos.
+
+    Uso:
+        diario = DiarioTurnos("datos/", durabilidad=LOTE)
+        cola = diario.recuperar()   # cola lista y ya suscrita al diario
+        diario.recuperar_agenda(AgendaTurnos(cola))   # opcional: las reservas
+        ...
+        diario.cerrar()
+    """
+    def __init__(self, directorio, durabilidad=LOTE, lote_maximo=64,
+                 espera_maxima=0.05, compactar_minimo=10_000, compactar_factor=2):
+        if durabilidad not in (SIEMPRE, LOTE, NINGUNO):
+            raise ValueError(f"Durabilidad desconocida: {durabilidad}")
+        self.directorio = directorio
+        self.durabilidad = durabilidad
+        self.lote_maximo = lote_maximo        # Registros por fsync en modo LOTE
+        self.espera_maxima = espera_maxima    # Segundos máximos sin fsync en modo LOTE
+        # Se compacta cuando el diario supera max(minimo, factor * cola viva)
+        self.compactar_minimo = compactar_minimo
+        self.compactar_factor = compactar_factor
+
+        self.cola = None
+        self.agenda = None
+        self.generacion = 0
+        self._reservas = {}            # reserva -> paciente, en orden de reserva
+        self._siguiente_reserva = 1
+        self._archivo = None
+        self._registros = 0            # Registros en el diario actual
+        self._pendientes = 0           # Registros escritos sin fsync
+        self._ultimo_fsync = time.monotonic()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta_diario(self, generacion):
+        return os.path.join(self.directorio, f'diario.{generacion}.wal')
+
+    # ---- Recuperación ----
+
+    def recuperar(self):
+        """Reconstruir la cola desde la instantánea y la cola del diario"""
+        if self.cola is not None:
+            raise RuntimeError("El diario ya tiene una cola asociada")
+
+        cola = ColaTurnos()
+        self.generacion = self._leer_instantanea(cola)
+        ruta = self._ruta_diario(self.generacion)
+        self._registros = self._reproducir(cola, ruta) if os.path.exists(ruta) else 0
+
+        # Diarios de generaciones anteriores quedaron cubiertos por la instantánea
+        self._borrar_diarios_viejos()
+
+        self._archivo = open(ruta, 'ab')
+        self.cola = cola
+        cola.suscribir(self.registrar)
+        return cola
+
+    def _leer_instantanea(self, cola):
+        ruta = os.path.join(self.directorio, ARCHIVO_INSTANTANEA)
+        if not os.path.exists(ruta):
+            return 0
+        with open(ruta, 'rb') as archivo:
+            datos = archivo.read()
+
+        magico, generacion, siguiente_ticket, cantidad = _INSTANTANEA.unpack_from(datos)
+        if magico not in (_MAGICO, _MAGICO_SIN_AGENDA, _MAGICO_SIN_NIVELES):
+            raise ValueError(f"{ruta} no es una instantánea de turnos")
+        (crc,) = struct.unpack_from('<I', datos, len(datos) - 4)
+        if zlib.crc32(memoryview(datos)[:-4]) != crc:
+            raise ValueError(f"{ruta} está corrupta (CRC inválido)")
+
+        desplazamiento = _INSTANTANEA.size
+        for _ in range(cantidad):
+            ticket, paciente, desplazamiento = _decodificar_turno(datos, desplazamiento)
+            nivel = desde = None
+            if magico != _MAGICO_SIN_NIVELES:
+                nivel, desde = _NIVEL_ACTUAL.unpack_from(datos, desplazamiento)
+                desplazamiento += _NIVEL_ACTUAL.size
+                if math.isnan(desde):
+                    desde = None
+            cola.restaurar(ticket, paciente, nivel, desde)
+        cola.siguiente_ticket = max(cola.siguiente_ticket, siguiente_ticket)
+
+        if magico == _MAGICO:
+            self._siguiente_reserva, cantidad = _AGENDA.unpack_from(datos, desplazamiento)
+            desplazamiento += _AGENDA.size
+            for _ in range(cantidad):
+                reserva, paciente, desplazamiento = _decodificar_turno(datos, desplazamiento)
+                self._reservas[reserva] = paciente
+        return generacion
+
+    def _reproducir(self, cola, ruta):
+        """Aplicar los registros válidos del diario; truncar una cola cortada"""
+        with open(ruta, 'rb') as archivo:
+            datos = memoryview(archivo.read())
+
+        desplazamiento = 0
+        registros = 0
+        while desplazamiento + _CABECERA.size <= len(datos):
+            crc, largo, operacion = _CABECERA.unpack_from(datos, desplazamiento)
+            inicio = desplazamiento + _CABECERA.size
+            fin = inicio + largo
+            if fin > len(datos):
+                break
+            cuerpo = datos[inicio:fin]
+            if zlib.crc32(cuerpo, zlib.crc32(bytes((operacion,)))) != crc:
+                break
+
+            if operacion == ENCOLAR:
+                ticket, paciente, _ = _decodificar_turno(cuerpo)
+                cola.restaurar(ticket, paciente)
+            elif operacion == PROMOVER:
+                ticket, nivel, desde = _PROMOVER.unpack_from(cuerpo)
+                cola.promover(ticket, nivel, desde)
+            elif operacion == REINSERTAR:
+                nivel, desde, siguiente = _REINSERTAR.unpack_from(cuerpo)
+                ticket, paciente, _ = _decodificar_turno(cuerpo, _REINSERTAR.size)
+                cola.reinsertar(ticket, paciente, nivel, siguiente or None,
+                                None if math.isnan(desde) else desde)
+            elif operacion == RESERVAR:
+                reserva, paciente, _ = _decodificar_turno(cuerpo)
+                self._reservas[reserva] = paciente
+                self._siguiente_reserva = max(self._siguiente_reserva, reserva + 1)
+            elif operacion == QUITAR_RESERVA:
+                (reserva,) = _TICKET.unpack_from(cuerpo)
+                self._reservas.pop(reserva, None)
+            else:
+                # Desencolar y cancelar se reproducen igual: quitar el ticket
+                (ticket,) = _TICKET.unpack_from(cuerpo)
+                cola.cancelar_ticket(ticket)
+            desplazamiento = fin
+            registros += 1
+
+        if desplazamiento < len(datos):
+            with open(ruta, 'r+b') as archivo:
+                archivo.truncate(desplazamiento)
+        return registros
+
+    def _borrar_diarios_viejos(self):
+        actual = os.path.basename(self._ruta_diario(self.generacion))
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith('diario.') and nombre.endswith('.wal') and nombre != actual:
+                os.remove(os.path.join(self.directorio, nombre))
+
+    def recuperar_agenda(self, agenda):
+        """Cargar en `agenda` (vacía, de la cola recuperada) las reservas
+        recuperadas y registrar desde ahora sus cambios"""
+        if self.cola is None:
+            raise RuntimeError("Recuperar primero la cola")
+        if self.agenda is not None:
+            raise RuntimeError("El diario ya tiene una agenda asociada")
+        for reserva, paciente in self._reservas.items():
+            agenda.restaurar(reserva, paciente)
+        agenda.siguiente_reserva = max(agenda.siguiente_reserva, self._siguiente_reserva)
+        self.agenda = agenda
+        agenda.suscribir(self.registrar_agenda)
+        return agenda
+
+    # ---- Escritura ----
+
+    def registrar(self, evento, ticket, paciente):
+        """Observador de ColaTurnos: agregar la operación al diario"""
+        if evento == 'encolar':
+            self._escribir(ENCOLAR, _codificar_turno(ticket, paciente))
+        elif evento == 'reinsertar':
+            # El turno volvió al medio de su nivel: se anota ante quién
+            nivel, desde = self.cola.nivel_actual(ticket)
+            cola_nivel = self.cola.niveles[nivel - 1]
+            siguiente = cola_nivel.en_posicion(cola_nivel.posicion(ticket) + 1)
+            self._escribir(REINSERTAR, _REINSERTAR.pack(
+                nivel, math.nan if desde is None else desde,
+                0 if siguiente is None else siguiente[0]) + _codificar_turno(ticket, paciente))
+        elif evento == 'promover':
+            nivel, desde = self.cola.nivel_actual(ticket)
+            self._escribir(PROMOVER, _PROMOVER.pack(ticket, nivel, desde))
+        else:
+            # desencolar, cancelar o deshacer (un encolar deshecho sale como
+            # una cancelación: al recuperar solo importa que ya no está)
+            operacion = DESENCOLAR if evento == 'desencolar' else CANCELAR
+            self._escribir(operacion, _TICKET.pack(ticket))
+        self._compactar_si_conviene()
+
+    def registrar_agenda(self, evento, reserva, paciente):
+        """Observador de AgendaTurnos: agregar la reserva o su baja al diario"""
+        if evento == 'reservar':
+            self._escribir(RESERVAR, _codificar_turno(reserva, paciente))
+            self._reservas[reserva] = paciente
+            self._siguiente_reserva = max(self._siguiente_reserva, reserva + 1)
+        else:
+            # Cancelar y liberar se registran igual: la reserva sale de la agenda
+            self._escribir(QUITAR_RESERVA, _TICKET.pack(reserva))
+            self._reservas.pop(reserva, None)
+        self._compactar_si_conviene()
+
+    def _compactar_si_conviene(self):
+        vivos = self.cola.tamaño() + len(self._reservas)
+        if self._registros > max(self.compactar_minimo, self.compactar_factor * vivos):
+            self.compactar()
+
+    def _escribir(self, operacion, cuerpo):
+        crc = zlib.crc32(cuerpo, zlib.crc32(bytes((operacion,))))
+        self._archivo.write(_CABECERA.pack(crc, len(cuerpo), operacion))
+        self._archivo.write(cuerpo)
+        self._registros += 1
+        self._pendientes += 1
+
+        if self.durabilidad == SIEMPRE:
+            self.sincronizar()
+        elif self.durabilidad == LOTE:
+            # Group commit: un fsync cubre todo el lote acumulado
+            if (self._pendientes >= self.lote_maximo
+                    or time.monotonic() - self._ultimo_fsync >= self.espera_maxima):
+                self.sincronizar()
+
+    def sincronizar_pendientes(self):
+        """Cerrar el lote abierto si quedó algún registro sin fsync.
+
+        En modo LOTE el último lote solo se cierra en la siguiente operación;
+        llamar a esto periódicamente acota cuánto puede quedar sin persistir.
+        """
+        if self._pendientes:
+            self.sincronizar()
+
+    def sincronizar(self):
+        """Forzar a disco los registros pendientes"""
+        self._archivo.flush()
+        if self.durabilidad != NINGUNO:
+            os.fsync(self._archivo.fileno())
+        self._pendientes = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def compactar(self):
+        """Escribir una instantánea de la cola viva y empezar un diario nuevo"""
+        nueva = self.generacion + 1
+        partes = [b'']
+        cantidad = 0
+        for ticket, paciente in self.cola.turnos():
+            nivel, desde = self.cola.nivel_actual(ticket)
+            partes.append(_codificar_turno(ticket, paciente))
+            partes.append(_NIVEL_ACTUAL.pack(nivel, math.nan if desde is None else desde))
+            cantidad += 1
+        partes[0] = _INSTANTANEA.pack(_MAGICO, nueva, self.cola.siguiente_ticket, cantidad)
+        partes.append(_AGENDA.pack(self._siguiente_reserva, len(self._reservas)))
+        partes.extend(_codificar_turno(reserva, paciente)
+                      for reserva, paciente in self._reservas.items())
+        datos = b''.join(partes)
+
+        # Escribir aparte y renombrar: la instantánea anterior sigue válida
+        # hasta que el rename (atómico) la reemplaza
+        ruta = os.path.join(self.directorio, ARCHIVO_INSTANTANEA)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(datos)
+            archivo.write(struct.pack('<I', zlib.crc32(datos)))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+        _fsync_directorio(self.directorio)
+
+        anterior = self._ruta_diario(self.generacion)
+        self._archivo.close()
+        self.generacion = nueva
+        self._archivo = open(self._ruta_diario(nueva), 'ab')
+        self._registros = 0
+        self._pendientes = 0
+        os.remove(anterior)
+
+    def cerrar(self):
+        """Sincronizar y cerrar el diario; la cola deja de registrarse"""
+        if self._archivo is None:
+            return
+        self.sincronizar()
+        self._archivo.close()
+        self._archivo = None
+        self.cola.desuscribir(self.registrar)
+        if self.agenda is not None:
+            self.agenda.desuscribir(self.registrar_agenda)
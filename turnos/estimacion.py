@@ -0,0 +1,162 @@
+"""Estimación adaptativa del tiempo de espera.
+
+Un observador de ColaTurnos marca la hora de cada llamado (desencolar) y
+mantiene, por especialidad, un promedio exponencial (EWMA) del intervalo
+entre llamados y de su varianza. Ese intervalo ya refleja cuántos médicos
+atienden y a qué ritmo, así que la espera de un turno es la cantidad de
+pacientes por delante en su especialidad (emergencias incluidas) por el
+intervalo medio, con una banda de confianza.
+
+Un llamado deshecho (el turno vuelve con 'reinsertar', ver
+turnos.versiones) retira su muestra: la estadística vuelve a como estaba
+antes de él. Un encolar deshecho ('deshacer') no es un llamado y no
+cuenta.
+
+Consultas: estimar(ticket) es O(log n) (posición en la subcola),
+estimar_posicion(especialidad, posicion) es O(1) y
+estimar_posiciones(especialidad, desde, cantidad) calcula la
+especialidad una vez para varias posiciones seguidas.
+"""
+import math
+import time
+from collections import deque
+
+MINUTOS_POR_CONSULTA = 15
+Z_CONFIANZA = 1.645   # Banda del 90 % (normal)
+LLAMADOS_DESHACIBLES = 1000   # Llamados por especialidad cuya muestra se puede retirar
+
+
+class EstadisticaEspecialidad:
+    """EWMA del intervalo entre llamados de una especialidad (en segundos)"""
+    def __init__(self, media, varianza):
+        self.media = media
+        self.varianza = varianza
+        self.observaciones = 0
+        self.ultimo_llamado = None   # Hora del último llamado
+        self.inicio = None           # Desde cuándo corre el intervalo actual
+        # (ticket, estado anterior) de los últimos llamados, para deshacerlos
+        self.llamados = deque(maxlen=LLAMADOS_DESHACIBLES)
+
+    def _estado(self):
+        return (self.media, self.varianza, self.observaciones, self.ultimo_llamado, self.inicio)
+
+    def llamar(self, ticket, ahora, alfa, maximo, quedan):
+        """Registrar el llamado de `ticket`; `quedan` indica si la subcola sigue con turnos"""
+        self.llamados.append((ticket, self._estado()))
+        if self.inicio is not None:
+            intervalo = ahora - self.inicio
+            if intervalo <= maximo:
+                self.observar(intervalo, alfa)
+        self.ultimo_llamado = ahora
+        self.inicio = ahora if quedan else None
+
+    def deshacer_llamado(self, ticket):
+        """Volver a antes del llamado de `ticket` si fue el último; retorna si lo hizo"""
+        if not self.llamados or self.llamados[-1][0] != ticket:
+            return False
+        _, estado = self.llamados.pop()
+        (self.media, self.varianza, self.observaciones,
+         self.ultimo_llamado, self.inicio) = estado
+        return True
+
+    def observar(self, intervalo, alfa):
+        diferencia = intervalo - self.media
+        incremento = alfa * diferencia
+        self.media += incremento
+        self.varianza = (1 - alfa) * (self.varianza + diferencia * incremento)
+        self.observaciones += 1
+
+    @property
+    def llamados_por_hora(self):
+        return 3600 / self.media if self.media else None
+
+
+class EstimadorEspera:
+    """Estimador de espera por especialidad, suscrito a una ColaTurnos.
+
+    `minutos_por_consulta` es la estimación inicial (y el valor de las
+    especialidades sin llamados todavía). Los intervalos en que la
+    especialidad estuvo sin pacientes no cuentan: el reloj de cada
+    intervalo arranca en el último llamado o cuando llegó alguien a una
+    subcola vacía. `maximo_minutos` descarta pausas largas (almuerzo, fin
+    del turno) como observaciones.
+    """
+    def __init__(self, cola, minutos_por_consulta=MINUTOS_POR_CONSULTA, alfa=0.2,
+                 variacion_inicial=0.5, maximo_minutos=120, reloj=time.time):
+        self.cola = cola
+        self.alfa = alfa
+        self.media_inicial = minutos_por_consulta * 60
+        self.varianza_inicial = (variacion_inicial * self.media_inicial) ** 2
+        self.maximo = maximo_minutos * 60
+        self.reloj = reloj
+        self.especialidades = {}   # especialidad -> EstadisticaEspecialidad
+        cola.suscribir(self.registrar)
+
+    def cerrar(self):
+        """Dejar de observar la cola"""
+        self.cola.desuscribir(self.registrar)
+
+    def estadistica(self, especialidad):
+        datos = self.especialidades.get(especialidad)
+        if datos is None:
+            datos = self.especialidades[especialidad] = EstadisticaEspecialidad(
+                self.media_inicial, self.varianza_inicial)
+        return datos
+
+    def registrar(self, evento, ticket, paciente):
+        """Observador de ColaTurnos"""
+        ahora = self.reloj()
+        datos = self.estadistica(paciente.especialidad)
+        if evento == 'reinsertar' and datos.deshacer_llamado(ticket):
+            return
+        if evento in ('encolar', 'reinsertar'):
+            # Si la subcola estaba vacía, el intervalo empieza ahora
+            if self.cola.tamaño(paciente.especialidad) == 1:
+                datos.inicio = ahora
+        elif evento == 'desencolar':
+            datos.llamar(ticket, ahora, self.alfa, self.maximo,
+                         self.cola.tamaño(paciente.especialidad))
+
+    def estimar_posicion(self, especialidad, posicion):
+        """(minutos estimados, mínimo, máximo) para la posición `posicion`
+        dentro de la subcola de la especialidad - O(1)"""
+        datos = self.estadistica(especialidad)
+        media = datos.media
+        # Lo que falta del intervalo en curso, y un intervalo entero por
+        # cada paciente por delante
+        restante = self._restante(datos)
+        delante = posicion - 1
+        estimado = restante + delante * media
+        desvio = math.sqrt(max(delante, 1) * datos.varianza)
+        margen = Z_CONFIANZA * desvio
+        return (estimado / 60, max(0.0, estimado - margen) / 60, (estimado + margen) / 60)
+
+    def estimar_posiciones(self, especialidad, desde, cantidad):
+        """Minutos estimados de `cantidad` posiciones seguidas de la subcola,
+        desde la posición `desde`: la especialidad se calcula una vez (para
+        las filas visibles de una tabla)"""
+        datos = self.estadistica(especialidad)
+        media = datos.media
+        restante = self._restante(datos)
+        return [(restante + delante * media) / 60 for delante in range(desde - 1, desde - 1 + cantidad)]
+
+    def _restante(self, datos):
+        """Segundos que faltan del intervalo en curso"""
+        if datos.inicio is None:
+            return datos.media
+        return max(0.0, datos.media - (self.reloj() - datos.inicio))
+
+    def estimar(self, ticket):
+        """(minutos estimados, mínimo, máximo) de un turno, o None - O(log n)"""
+        paciente, posicion = self.cola.buscar_ticket_especialidad(ticket)
+        if paciente is None:
+            return None
+        return self.estimar_posicion(paciente.especialidad, posicion)
+
+    def resumen(self):
+        """especialidad -> minutos entre llamados, desvío, llamados por hora y observaciones"""
+        return {especialidad: {'minutos_entre_llamados': datos.media / 60,
+                               'desvio_minutos': math.sqrt(datos.varianza) / 60,
+                               'llamados_por_hora': datos.llamados_por_hora,
+                               'observaciones': datos.observaciones}
+                for especialidad, datos in self.especialidades.items()}
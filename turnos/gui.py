@@ -0,0 +1,935 @@
+"""Interfaz Tkinter del sistema de turnos"""
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog, filedialog
+from datetime import datetime
+
+from . import validacion
+from .agenda import AgendaTurnos
+from .cola import ColaTurnos
+from .concurrencia import ColaTurnosConcurrente, IngresoArchivo
+from .diario import DiarioTurnos
+from .estimacion import EstimadorEspera
+from .importacion import importar_archivo
+from .metricas import Registro, escribir_archivo, instrumentar_cola
+from .paciente import ESPECIALIDADES, Paciente
+from .tablero import TableroTurnos
+from .versiones import VersionesCola
+
+
+# Cada cuánto se drena el buffer de ingreso en modo concurrente (ms), y
+# cuántos pacientes por vez: una ráfaga grande se reparte en varias pasadas
+INTERVALO_INGRESO = 100
+MAXIMO_DRENADO = 2000
+# A lo sumo un refresco de la vista por cuadro (ms): los cambios de un mismo
+# cuadro se juntan en uno
+INTERVALO_CUADRO = 50
+# Cada cuánto se revisan los minutos de espera mostrados (ms)
+INTERVALO_RELOJ = 1000
+# Minutos antes de su turno en que un paciente con reserva entra a la cola
+ANTICIPACION_AGENDA = 15
+# Cada cuánto se cierra el lote abierto del diario (ms)
+INTERVALO_DIARIO = 200
+# Cada cuánto se publican los cambios juntados en el tablero de la sala (ms)
+INTERVALO_TABLERO = 100
+# Cada cuánto se reescribe el archivo de métricas (ms)
+INTERVALO_METRICAS = 15000
+# Operaciones que se pueden deshacer (Ctrl+Z)
+MAXIMO_DESHACER = 1000
+# Sugerencias que se muestran mientras se escribe un nombre
+LIMITE_SUGERENCIAS = 8
+
+# Opciones del combo de triage; la primera deja el nivel según la casilla de emergencia
+OPCIONES_TRIAGE = ("Según emergencia", "1 - Inmediato", "2 - Muy urgente",
+                   "3 - Urgente", "4 - Poco urgente", "5 - No urgente")
+
+
+class GestorTurnosApp:
+    def __init__(self, root, cola_turnos=None, metricas=None):
+        self.root = root
+        self.root.title("Sistema de Turnos Médicos - Cola FIFO")
+        self.root.geometry("1200x800")
+        self.root.configure(bg="#f5f5f5")
+        
+        # Cola principal con índices por ticket (ver ColaTurnos); puede venir
+        # ya recuperada de un diario persistente o, con productores en otros
+        # hilos (main() con ruta_ingreso), envuelta en ColaTurnosConcurrente
+        self.cola_turnos = cola_turnos if cola_turnos is not None else ColaTurnos()
+        
+        # Estimación inicial por consulta; el estimador la ajusta con el ritmo
+        # real de llamados de cada especialidad
+        self.tiempo_por_consulta = 15
+        self.estimador = EstimadorEspera(self.cola_turnos, self.tiempo_por_consulta)
+        
+        self.especialidades = list(ESPECIALIDADES)
+        
+        # Turnos con fecha y hora a futuro: esperan en la agenda y el reloj
+        # los pasa a la cola ANTICIPACION_AGENDA minutos antes
+        self.agenda = AgendaTurnos(self.cola_turnos, ANTICIPACION_AGENDA)
+        
+        # Versiones de la cola: deshacer un llamado o una cancelación por error
+        self.versiones = VersionesCola(self.cola_turnos, MAXIMO_DESHACER)
+        
+        # Vista virtual de la tabla: solo existen las filas visibles.
+        # ticket (= iid del Treeview) -> valores mostrados, y su orden
+        self._filas = {}
+        self._orden_filas = []
+        self._desplazamiento = 0   # Índice (base 0) de la primera fila visible
+        
+        # Con un Registro de métricas se mide también el refresco de la interfaz
+        self.metricas = metricas
+        if metricas is not None:
+            for nombre in ('actualizar_interfaz', 'actualizar_tabla'):
+                setattr(self, nombre, metricas.cronometrar(
+                    getattr(self, nombre), 'turnos_interfaz_segundos',
+                    "Latencia del refresco de la interfaz", operacion=nombre))
+        
+        self.crear_interfaz()
+        
+        # Refresco diferido: encolar, llamar o cancelar solo marcan la vista
+        # como desactualizada (observador de la cola) y un after() la redibuja
+        # en el próximo cuadro
+        self._sucio = False
+        self._tabla_sucia = False
+        self._refresco = None   # id del after() pendiente
+        self._hilo_interfaz = threading.get_ident()
+        self.cola_turnos.suscribir(self._cola_cambiada)
+        self.actualizar_interfaz()
+        self.root.after(INTERVALO_RELOJ, self._tic_reloj)
+        
+        # En modo concurrente otros hilos ofrecen pacientes: drenarlos desde aquí,
+        # el único hilo que toca los widgets
+        if isinstance(self.cola_turnos, ColaTurnosConcurrente):
+            self.root.after(INTERVALO_INGRESO, self._drenar_ingresos)
+    
+    def validar_solo_letras(self, char):
+        return (char.isalpha() or char.isspace() or 
+                char in "áéíóúüñÁÉÍÓÚÜÑ'-" or char == "")
+    
+    def validar_solo_numeros(self, char):
+        return char.isdigit() or char == ""
+    
+    def validar_nombre_completo(self, nombre):
+        return validacion.validar_nombre_completo(nombre)
+    
+    def validar_telefono_completo(self, telefono):
+        return validacion.validar_telefono_completo(telefono)
+    
+    def crear_interfaz(self):
+        # Header
+        header_frame = tk.Frame(self.root, bg="#E53E3E", height=80)
+        header_frame.pack(fill=tk.X)
+        header_frame.pack_propagate(False)
+        
+        title_label = tk.Label(header_frame, 
+                              text="🏥 SISTEMA DE TURNOS MÉDICOS - COLA FIFO (First In, First Out)", 
+                              font=("Segoe UI", 18, "bold"), fg="white", bg="#E53E3E")
+        title_label.pack(expand=True)
+        
+        # Contenedor principal
+        main_container = tk.Frame(self.root, bg="#f5f5f5")
+        main_container.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+        
+        # Tres columnas
+        self.frame_registro = tk.Frame(main_container, bg="white", relief=tk.FLAT, bd=1)
+        self.frame_registro.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+        
+        self.frame_lista = tk.Frame(main_container, bg="white", relief=tk.FLAT, bd=1)
+        self.frame_lista.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+        
+        self.frame_control = tk.Frame(main_container, bg="white", relief=tk.FLAT, bd=1)
+        self.frame_control.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        
+        self.crear_seccion_registro()
+        self.crear_seccion_lista()
+        self.crear_seccion_control()
+    
+    def crear_seccion_registro(self):
+        header_registro = tk.Frame(self.frame_registro, bg="#f8f9fa", height=60)
+        header_registro.pack(fill=tk.X, padx=2, pady=2)
+        header_registro.pack_propagate(False)
+        
+        icon_label = tk.Label(header_registro, text="🏥", font=("Segoe UI", 16), bg="#f8f9fa")
+        icon_label.pack(side=tk.LEFT, padx=15, pady=15)
+        
+        title_label = tk.Label(header_registro, text="REGISTRAR EN COLA", 
+                              font=("Segoe UI", 12, "bold"), bg="#f8f9fa", fg="#2d3748")
+        title_label.pack(side=tk.LEFT, pady=15)
+        
+        content_frame = tk.Frame(self.frame_registro, bg="white")
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        vcmd_letras = (self.root.register(self.validar_solo_letras), '%S')
+        vcmd_numeros = (self.root.register(self.validar_solo_numeros), '%S')
+        
+        # Nombre
+        tk.Label(content_frame, text="👤 Nombre del Paciente:", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.entry_paciente = tk.Entry(content_frame, font=("Segoe UI", 10), bg="#f7fafc", 
+                                      relief=tk.FLAT, bd=5, validate='key', validatecommand=vcmd_letras)
+        self.entry_paciente.pack(fill=tk.X, pady=(0, 15), ipady=5)
+        
+        # Teléfono
+        tk.Label(content_frame, text="📞 Teléfono:", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.entry_telefono = tk.Entry(content_frame, font=("Segoe UI", 10), bg="#f7fafc", 
+                                      relief=tk.FLAT, bd=5, validate='key', validatecommand=vcmd_numeros)
+        self.entry_telefono.pack(fill=tk.X, pady=(0, 15), ipady=5)
+        
+        # Fecha
+        tk.Label(content_frame, text="📅 Fecha (DD/MM/AAAA):", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.entry_fecha = tk.Entry(content_frame, font=("Segoe UI", 10), bg="#f7fafc", 
+                                   relief=tk.FLAT, bd=5)
+        self.entry_fecha.pack(fill=tk.X, pady=(0, 15), ipady=5)
+        self.entry_fecha.insert(0, datetime.now().strftime("%d/%m/%Y"))
+        
+        # Hora
+        tk.Label(content_frame, text="🕐 Hora (HH:MM):", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.entry_hora = tk.Entry(content_frame, font=("Segoe UI", 10), bg="#f7fafc", 
+                                  relief=tk.FLAT, bd=5)
+        self.entry_hora.pack(fill=tk.X, pady=(0, 15), ipady=5)
+        self.entry_hora.insert(0, datetime.now().strftime("%H:%M"))
+        
+        # Especialidad
+        tk.Label(content_frame, text="🏥 Especialidad:", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.combo_especialidad = ttk.Combobox(content_frame, values=self.especialidades, 
+                                              font=("Segoe UI", 10), state="readonly")
+        self.combo_especialidad.pack(fill=tk.X, pady=(0, 20), ipady=5)
+        
+        # Checkbox emergencia
+        self.var_emergencia = tk.BooleanVar()
+        check_frame = tk.Frame(content_frame, bg="white")
+        check_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        check_emergencia = tk.Checkbutton(check_frame, text="🚨 EMERGENCIA (COLA PRIORITARIA)", 
+                                         variable=self.var_emergencia, font=("Segoe UI", 10, "bold"),
+                                         bg="white", fg="#E53E3E", selectcolor="white")
+        check_emergencia.pack()
+        
+        # Nivel de triage (1 = más urgente)
+        tk.Label(content_frame, text="🩺 Triage:", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.combo_triage = ttk.Combobox(content_frame, values=OPCIONES_TRIAGE, 
+                                        font=("Segoe UI", 10), state="readonly")
+        self.combo_triage.current(0)
+        self.combo_triage.pack(fill=tk.X, pady=(0, 25), ipady=5)
+        
+        # Botones
+        btn_registrar = tk.Button(content_frame, text="➕ ENCOLAR PACIENTE", 
+                                 command=self.registrar_paciente,
+                                 bg="#48BB78", fg="white",
+                                 font=("Segoe UI", 11, "bold"), relief=tk.FLAT, 
+                                 cursor="hand2", height=2)
+        btn_registrar.pack(fill=tk.X, pady=(0, 10))
+        
+        btn_limpiar = tk.Button(content_frame, text="🗑 LIMPIAR CAMPOS", 
+                               command=self.limpiar_campos,
+                               bg="#A0AEC0", fg="white",
+                               font=("Segoe UI", 11, "bold"), relief=tk.FLAT, 
+                               cursor="hand2", height=2)
+        btn_limpiar.pack(fill=tk.X, pady=(0, 10))
+        
+        btn_importar = tk.Button(content_frame, text="📥 IMPORTAR AGENDA (CSV/JSONL)", 
+                                command=self.importar_agenda,
+                                bg="#4A5568", fg="white",
+                                font=("Segoe UI", 10, "bold"), relief=tk.FLAT, 
+                                cursor="hand2", height=1)
+        btn_importar.pack(fill=tk.X, pady=(0, 30))
+        
+        # Consulta tiempo
+        consulta_frame = tk.Frame(content_frame, bg="#f8f9fa", relief=tk.FLAT, bd=1)
+        consulta_frame.pack(fill=tk.X, pady=(20, 0))
+        
+        consulta_header = tk.Label(consulta_frame, text="🔍 CONSULTAR POSICIÓN EN COLA", 
+                                  font=("Segoe UI", 11, "bold"), bg="#f8f9fa", fg="#2d3748")
+        consulta_header.pack(pady=15)
+        
+        consulta_content = tk.Frame(consulta_frame, bg="#f8f9fa")
+        consulta_content.pack(fill=tk.X, padx=15, pady=(0, 15))
+        
+        tk.Label(consulta_content, text="Nombre del Paciente:", 
+                font=("Segoe UI", 9, "bold"), bg="#f8f9fa", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.entry_consultar = tk.Entry(consulta_content, font=("Segoe UI", 10), bg="white", 
+                                       relief=tk.FLAT, bd=5, validate='key', validatecommand=vcmd_letras)
+        self.entry_consultar.pack(fill=tk.X, pady=(0, 15), ipady=5)
+        self.entry_consultar.bind("<KeyRelease>", self.actualizar_sugerencias)
+        self.entry_consultar.bind("<Down>", lambda event: self._enfocar_sugerencias())
+        
+        # Sugerencias mientras se escribe (sin tildes ni mayúsculas, con errores de tipeo)
+        self.sugerencias = []
+        self.lista_sugerencias = tk.Listbox(consulta_content, font=("Segoe UI", 9), bg="white",
+                                            relief=tk.FLAT, bd=0, height=LIMITE_SUGERENCIAS,
+                                            activestyle="none", selectbackground="#4299E1",
+                                            exportselection=False)
+        self.lista_sugerencias.bind("<Double-Button-1>", lambda event: self.consultar_tiempo_espera())
+        self.lista_sugerencias.bind("<Return>", lambda event: self.consultar_tiempo_espera())
+        
+        btn_consultar = tk.Button(consulta_content, text="⏱ CONSULTAR TIEMPO", 
+                                 command=self.consultar_tiempo_espera,
+                                 bg="#4299E1", fg="white",
+                                 font=("Segoe UI", 10, "bold"), relief=tk.FLAT, 
+                                 cursor="hand2", height=1)
+        btn_consultar.pack(fill=tk.X)
+    
+    def crear_seccion_lista(self):
+        header_lista = tk.Frame(self.frame_lista, bg="#f8f9fa", height=60)
+        header_lista.pack(fill=tk.X, padx=2, pady=2)
+        header_lista.pack_propagate(False)
+        
+        icon_label = tk.Label(header_lista, text="📋", font=("Segoe UI", 16), bg="#f8f9fa")
+        icon_label.pack(side=tk.LEFT, padx=15, pady=15)
+        
+        title_label = tk.Label(header_lista, text="COLA DE ESPERA (FIFO)", 
+                              font=("Segoe UI", 12, "bold"), bg="#f8f9fa", fg="#2d3748")
+        title_label.pack(side=tk.LEFT, pady=15)
+        
+        table_frame = tk.Frame(self.frame_lista, bg="white")
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
+        
+        columns = ("Pos", "Paciente", "Teléfono", "Hora", "Especialidad", "Tipo", "Nivel", "Tiempo Esp.", "Estimado")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=20)
+        
+        column_config = {
+            "Pos": 50,
+            "Paciente": 120, 
+            "Teléfono": 100,
+            "Hora": 80,
+            "Especialidad": 120,
+            "Tipo": 80,
+            "Nivel": 50,
+            "Tiempo Esp.": 90,
+            "Estimado": 90
+        }
+        
+        for col in columns:
+            self.tree.heading(col, text=col, anchor=tk.CENTER)
+            self.tree.column(col, width=column_config[col], anchor=tk.CENTER, minwidth=50)
+        
+        self.tree.tag_configure("emergencia", background="#ffebee", foreground="#d32f2f")
+        self.tree.tag_configure("normal", background="#f9f9f9", foreground="#333333")
+        
+        # La barra vertical recorre la cola completa, no las filas cargadas
+        self.scrollbar_v = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self._comando_scroll)
+        scrollbar_v = self.scrollbar_v
+        self.tree.bind("<MouseWheel>", self._rueda_mouse)
+        self.tree.bind("<Button-4>", lambda event: self._desplazar(-3))
+        self.tree.bind("<Button-5>", lambda event: self._desplazar(3))
+        
+        scrollbar_h = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=scrollbar_h.set)
+        
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar_v.grid(row=0, column=1, sticky="ns")
+        scrollbar_h.grid(row=1, column=0, sticky="ew")
+        
+        table_frame.grid_rowconfigure(0, weight=1)
+        table_frame.grid_columnconfigure(0, weight=1)
+    
+    def crear_seccion_control(self):
+        header_control = tk.Frame(self.frame_control, bg="#f8f9fa", height=60)
+        header_control.pack(fill=tk.X, padx=2, pady=2)
+        header_control.pack_propagate(False)
+        
+        icon_label = tk.Label(header_control, text="🎛", font=("Segoe UI", 16), bg="#f8f9fa")
+        icon_label.pack(side=tk.LEFT, padx=15, pady=15)
+        
+        title_label = tk.Label(header_control, text="PANEL DE CONTROL", 
+                              font=("Segoe UI", 12, "bold"), bg="#f8f9fa", fg="#2d3748")
+        title_label.pack(side=tk.LEFT, pady=15)
+        
+        control_content = tk.Frame(self.frame_control, bg="white")
+        control_content.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
+        
+        btn_llamar = tk.Button(control_content, text="📢 DESENCOLAR (LLAMAR SIGUIENTE)", 
+                              command=self.llamar_siguiente_paciente,
+                              bg="#E53E3E", fg="white",
+                              font=("Segoe UI", 12, "bold"), relief=tk.FLAT, cursor="hand2",
+                              height=3)
+        btn_llamar.pack(fill=tk.X, pady=(15, 15))
+        
+        # Llamado por consultorio: solo el frente de esa especialidad
+        tk.Label(control_content, text="🩺 Mi consultorio:", 
+                font=("Segoe UI", 9, "bold"), bg="white", fg="#4a5568").pack(anchor=tk.W, pady=(0, 5))
+        self.combo_consultorio = ttk.Combobox(control_content, values=self.especialidades, 
+                                             font=("Segoe UI", 10), state="readonly")
+        self.combo_consultorio.pack(fill=tk.X, pady=(0, 5), ipady=3)
+        
+        btn_llamar_consultorio = tk.Button(control_content, text="📢 LLAMAR SIGUIENTE DE MI CONSULTORIO", 
+                                          command=self.llamar_siguiente_consultorio,
+                                          bg="#C53030", fg="white",
+                                          font=("Segoe UI", 10, "bold"), relief=tk.FLAT, cursor="hand2",
+                                          height=2)
+        btn_llamar_consultorio.pack(fill=tk.X, pady=(0, 15))
+        
+        btn_cancelar = tk.Button(control_content, text="❌ CANCELAR TURNO", 
+                               command=self.cancelar_turno_seleccionado,
+                               bg="#ED8936", fg="white",
+                               font=("Segoe UI", 11, "bold"), relief=tk.FLAT, cursor="hand2",
+                               height=2)
+        btn_cancelar.pack(fill=tk.X, pady=(0, 15))
+        
+        btn_deshacer = tk.Button(control_content, text="↶ DESHACER (Ctrl+Z)", 
+                                command=self.deshacer_ultima_operacion,
+                                bg="#718096", fg="white",
+                                font=("Segoe UI", 11, "bold"), relief=tk.FLAT, cursor="hand2",
+                                height=2)
+        btn_deshacer.pack(fill=tk.X, pady=(0, 15))
+        self.root.bind("<Control-z>", self.deshacer_con_teclado)
+        
+        btn_buscar = tk.Button(control_content, text="🔍 BUSCAR EN COLA", 
+                              command=self.buscar_paciente_dialog,
+                              bg="#805AD5", fg="white",
+                              font=("Segoe UI", 11, "bold"), relief=tk.FLAT, cursor="hand2",
+                              height=2)
+        btn_buscar.pack(fill=tk.X, pady=(0, 30))
+        
+        # Estadísticas
+        stats_header = tk.Frame(control_content, bg="#edf2f7")
+        stats_header.pack(fill=tk.X, pady=(20, 0))
+        
+        stats_icon = tk.Label(stats_header, text="📊", font=("Segoe UI", 14), bg="#edf2f7")
+        stats_icon.pack(side=tk.LEFT, padx=10, pady=10)
+        
+        stats_title = tk.Label(stats_header, text="ESTADÍSTICAS", 
+                              font=("Segoe UI", 11, "bold"), bg="#edf2f7", fg="#2d3748")
+        stats_title.pack(side=tk.LEFT, pady=10)
+        
+        self.stats_container = tk.Frame(control_content, bg="#edf2f7", relief=tk.FLAT, bd=1)
+        self.stats_container.pack(fill=tk.X, pady=(0, 20))
+        
+        self.label_total = tk.Label(self.stats_container, text="Total en cola: 0", 
+                                   font=("Segoe UI", 10, "bold"), bg="#edf2f7", fg="#2d3748")
+        self.label_total.pack(pady=8)
+        
+        self.label_emergencias = tk.Label(self.stats_container, text="🚨 Cola Emergencias: 0", 
+                                         font=("Segoe UI", 10, "bold"), bg="#edf2f7", fg="#E53E3E")
+        self.label_emergencias.pack(pady=3)
+        
+        self.label_normales = tk.Label(self.stats_container, text="📋 Cola Normal: 0", 
+                                      font=("Segoe UI", 10, "bold"), bg="#edf2f7", fg="#48BB78")
+        self.label_normales.pack(pady=3)
+        
+        self.label_tiempo_prom = tk.Label(self.stats_container, text="⏱ Tiempo prom: 0 min", 
+                                         font=("Segoe UI", 10, "bold"), bg="#edf2f7", fg="#ED8936")
+        self.label_tiempo_prom.pack(pady=8)
+        
+        self.label_reservas = tk.Label(self.stats_container, text="📅 Reservas: 0", 
+                                      font=("Segoe UI", 10, "bold"), bg="#edf2f7", fg="#4A5568")
+        self.label_reservas.pack(pady=(0, 8))
+        
+        # Próximo paciente
+        next_header = tk.Frame(control_content, bg="#e6fffa")
+        next_header.pack(fill=tk.X, pady=(20, 0))
+        
+        next_icon = tk.Label(next_header, text="👆", font=("Segoe UI", 14), bg="#e6fffa")
+        next_icon.pack(side=tk.LEFT, padx=10, pady=10)
+        
+        next_title = tk.Label(next_header, text="FRENTE DE LA COLA", 
+                             font=("Segoe UI", 11, "bold"), bg="#e6fffa", fg="#2d3748")
+        next_title.pack(side=tk.LEFT, pady=10)
+        
+        self.next_container = tk.Frame(control_content, bg="#e6fffa", relief=tk.FLAT, bd=1)
+        self.next_container.pack(fill=tk.X)
+        
+        self.label_proximo = tk.Label(self.next_container, text="Cola vacía", 
+                                     font=("Segoe UI", 10, "bold"), bg="#e6fffa", fg="#38B2AC")
+        self.label_proximo.pack(pady=15)
+    
+    def registrar_paciente(self):
+        paciente = self.entry_paciente.get().strip()
+        telefono = self.entry_telefono.get().strip()
+        fecha = self.entry_fecha.get().strip()
+        hora = self.entry_hora.get().strip()
+        especialidad = self.combo_especialidad.get()
+        es_emergencia = self.var_emergencia.get()
+        opcion = self.combo_triage.current()
+        nivel = opcion if opcion > 0 else None
+        
+        errores = validacion.errores_registro(paciente, telefono, especialidad)
+        
+        if errores:
+            mensaje_error = "❌ ERROR EN REGISTRO\n\nMotivo(s):\n" + "\n".join(f"• {error}" for error in errores)
+            messagebox.showerror("Error", mensaje_error)
+            return
+        
+        nuevo_paciente = Paciente(paciente, telefono, fecha, hora, especialidad, es_emergencia, nivel)
+        
+        # Turno a futuro: queda en la agenda hasta que se acerque su horario
+        if self.agenda.es_futuro(nuevo_paciente):
+            reserva = self.agenda.reservar(nuevo_paciente)
+            messagebox.showinfo("Turno Reservado", 
+                              f"📅 Turno reservado para el {fecha} a las {hora}\n\nReserva: {reserva}\nNombre: {paciente}\nEspecialidad: {especialidad}\n\nEntra a la cola {ANTICIPACION_AGENDA} minutos antes")
+            self.programar_refresco()
+            self.limpiar_campos()
+            return
+        
+        # ENCOLAR: Agregar al final de la cola correspondiente
+        ticket = self.cola_turnos.encolar(nuevo_paciente)
+        _, posicion = self.cola_turnos.buscar_ticket(ticket)
+        
+        tipo = f"{'EMERGENCIA' if nuevo_paciente.es_emergencia else 'NORMAL'} (nivel {nuevo_paciente.nivel})"
+        messagebox.showinfo("Paciente Encolado", 
+                          f"✅ Paciente agregado a cola {tipo}\n\nTicket: {ticket}\nNombre: {paciente}\nEspecialidad: {especialidad}\n\nPosición: {posicion}")
+        
+        self.limpiar_campos()
+    
+    def importar_agenda(self):
+        ruta = filedialog.askopenfilename(
+            title="Importar agenda",
+            filetypes=[("Agenda", "*.csv *.jsonl"), ("Todos", "*.*")])
+        if not ruta:
+            return
+        
+        try:
+            reporte = importar_archivo(self.cola_turnos, ruta, self.especialidades, agenda=self.agenda)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Error", f"No se pudo importar {ruta}:\n{error}")
+            return
+        
+        # Un solo aviso para toda la importación (y un solo refresco, diferido)
+        if reporte.reservados:
+            self.programar_refresco()   # Las reservas no pasan por la cola
+        mensaje = (f"✅ Pacientes encolados: {reporte.importados - reporte.reservados}\n"
+                   f"📅 Reservados para más tarde: {reporte.reservados}\n"
+                   f"❌ Filas con errores: {len(reporte.errores)}")
+        if reporte.errores:
+            detalle = [f"Fila {fila}: {'; '.join(motivos)}" for fila, motivos in reporte.errores[:10]]
+            mensaje += "\n\n" + "\n".join(detalle)
+            if len(reporte.errores) > 10:
+                mensaje += f"\n... y {len(reporte.errores) - 10} más"
+        messagebox.showinfo("Importación de agenda", mensaje)
+    
+    def llamar_siguiente_paciente(self):
+        # DESENCOLAR: Eliminar del frente de la cola
+        paciente = self.cola_turnos.desencolar()
+        
+        if paciente:
+            self.anunciar_llamado(paciente)
+        else:
+            messagebox.showwarning("Cola Vacía", "No hay pacientes en la cola")
+    
+    def llamar_siguiente_consultorio(self):
+        especialidad = self.combo_consultorio.get()
+        if not especialidad:
+            messagebox.showwarning("Consultorio", "Seleccione la especialidad de su consultorio")
+            return
+        
+        # DESENCOLAR: frente de la subcola de la especialidad
+        paciente = self.cola_turnos.desencolar(especialidad)
+        
+        if paciente:
+            self.anunciar_llamado(paciente)
+        else:
+            messagebox.showwarning("Cola Vacía", f"No hay pacientes de {especialidad} en la cola")
+    
+    def anunciar_llamado(self, paciente):
+        tipo = "EMERGENCIA" if paciente.es_emergencia else "NORMAL"
+        messagebox.showinfo("Desencolando Paciente", 
+                          f"📢 SIGUIENTE PACIENTE:\n\n{paciente.nombre}\nTipo: {tipo}\nEspecialidad: {paciente.especialidad}\nTeléfono: {paciente.telefono}")
+    
+    def cancelar_turno_seleccionado(self):
+        selected_item = self.tree.selection()
+        if not selected_item:
+            messagebox.showwarning("Selección", "Seleccione un turno para cancelar")
+            return
+        
+        # El iid de cada fila es el ticket del turno
+        ticket = int(selected_item[0])
+        item_values = self.tree.item(selected_item[0])['values']
+        nombre_paciente = item_values[1]
+        
+        respuesta = messagebox.askyesno("Confirmar", 
+                                      f"¿Cancelar turno de {nombre_paciente}?")
+        
+        if respuesta:
+            if self.cola_turnos.cancelar_ticket(ticket):
+                messagebox.showinfo("Cancelado", f"Turno de {nombre_paciente} cancelado")
+            else:
+                messagebox.showerror("Error", "No se pudo cancelar")
+    
+    def deshacer_con_teclado(self, event):
+        # En un campo de texto Ctrl+Z es del campo, no de la cola
+        if isinstance(event.widget, (tk.Entry, ttk.Entry, tk.Text)):
+            return
+        self.deshacer_ultima_operacion()
+        return "break"
+    
+    def deshacer_ultima_operacion(self):
+        # Vuelve la cola a como estaba antes del último encolar, llamado o
+        # cancelación, previa confirmación; el observador de la cola
+        # programa el refresco
+        pendiente = self.versiones.pendiente()
+        if pendiente is None:
+            messagebox.showwarning("Deshacer", "No hay operaciones para deshacer")
+            return
+        evento, ticket, paciente = pendiente
+        if evento == 'encolar':
+            pregunta = f"¿Deshacer el registro de {paciente.nombre} (ticket {ticket})?\nEl turno sale de la cola."
+        elif evento == 'desencolar':
+            pregunta = f"¿Deshacer el llamado de {paciente.nombre} (ticket {ticket})?\nEl turno vuelve a su lugar en la cola."
+        else:
+            pregunta = f"¿Deshacer la cancelación de {paciente.nombre} (ticket {ticket})?\nEl turno vuelve a su lugar en la cola."
+        if messagebox.askyesno("Deshacer", pregunta):
+            self.versiones.deshacer()
+    
+    def buscar_paciente_dialog(self):
+        nombre = simpledialog.askstring("Buscar", "Nombre del paciente:")
+        
+        if nombre:
+            paciente, posicion = self.cola_turnos.buscar_paciente(nombre)
+            
+            if paciente:
+                tiempo_espera = datetime.now() - paciente.hora_registro
+                minutos = int(tiempo_espera.total_seconds() / 60)
+                tiempo_estimado = self.texto_estimado(paciente.ticket)
+                
+                tipo = "EMERGENCIA" if paciente.es_emergencia else "NORMAL"
+                
+                messagebox.showinfo("Encontrado", 
+                                  f"Paciente: {paciente.nombre}\n" +
+                                  f"Posición en cola: {posicion}\n" +
+                                  f"Tipo: {tipo}\n" +
+                                  f"Triage: nivel {self.cola_turnos.nivel_actual(paciente.ticket)[0]}\n" +
+                                  f"Especialidad: {paciente.especialidad}\n" +
+                                  f"Tiempo esperando: {minutos} min\n" +
+                                  f"Tiempo estimado: {tiempo_estimado}")
+            else:
+                messagebox.showwarning("No Encontrado", self.texto_no_encontrado(nombre))
+    
+    def consultar_tiempo_espera(self):
+        nombre = self.entry_consultar.get().strip()
+        
+        # Una sugerencia elegida manda sobre lo escrito (homónimos incluidos)
+        seleccion = self.lista_sugerencias.curselection()
+        if seleccion:
+            ticket, _ = self.sugerencias[seleccion[0]]
+            paciente, posicion = self.cola_turnos.buscar_ticket(ticket)
+        elif not nombre:
+            messagebox.showerror("Error", "Ingrese nombre del paciente")
+            return
+        else:
+            paciente, posicion = self.cola_turnos.buscar_paciente(nombre)
+        
+        if paciente:
+            tiempo_espera = datetime.now() - paciente.hora_registro
+            minutos = int(tiempo_espera.total_seconds() / 60)
+            tiempo_estimado = self.texto_estimado(paciente.ticket)
+            
+            messagebox.showinfo("Tiempo de Espera", 
+                              f"Paciente: {paciente.nombre}\n" +
+                              f"Posición: {posicion}\n" +
+                              f"Esperando: {minutos} min\n" +
+                              f"Tiempo estimado: {tiempo_estimado}")
+            
+            self.entry_consultar.delete(0, tk.END)
+            self.actualizar_sugerencias()
+        else:
+            messagebox.showwarning("No Encontrado", self.texto_no_encontrado(nombre))
+    
+    def actualizar_sugerencias(self, event=None):
+        """Rellenar la lista de sugerencias con lo escrito en la consulta"""
+        if event is not None and event.keysym in ("Down", "Up", "Return"):
+            return
+        texto = self.entry_consultar.get()
+        self.sugerencias = self.cola_turnos.sugerir(texto, LIMITE_SUGERENCIAS) if texto.strip() else []
+        self.lista_sugerencias.delete(0, tk.END)
+        for ticket, paciente in self.sugerencias:
+            self.lista_sugerencias.insert(tk.END, f"#{ticket}  {paciente.nombre} - {paciente.especialidad}")
+        if self.sugerencias:
+            self.lista_sugerencias.config(height=len(self.sugerencias))
+            self.lista_sugerencias.pack(fill=tk.X, pady=(0, 15), after=self.entry_consultar)
+        else:
+            self.lista_sugerencias.pack_forget()
+    
+    def _enfocar_sugerencias(self):
+        if self.sugerencias:
+            self.lista_sugerencias.focus_set()
+            self.lista_sugerencias.selection_clear(0, tk.END)
+            self.lista_sugerencias.selection_set(0)
+            self.lista_sugerencias.activate(0)
+    
+    def texto_no_encontrado(self, nombre):
+        """Aviso de nombre no encontrado, con los parecidos que sí están en cola"""
+        texto = f"Paciente {nombre} no está en cola"
+        parecidos = dict.fromkeys(paciente.nombre for _, paciente in self.cola_turnos.sugerir(nombre, 5))
+        if parecidos:
+            texto += "\n\n¿Quiso decir?\n" + "\n".join(parecidos)
+        return texto
+    
+    def texto_estimado(self, ticket):
+        """Espera estimada de un turno con su banda, p. ej. '25 min (15-35)'"""
+        estimacion = self.estimador.estimar(ticket)
+        if estimacion is None:
+            return "-"
+        estimado, minimo, maximo = estimacion
+        return f"{round(estimado)} min ({round(minimo)}-{round(maximo)})"
+    
+    def limpiar_campos(self):
+        self.entry_paciente.delete(0, tk.END)
+        self.entry_telefono.delete(0, tk.END)
+        self.entry_fecha.delete(0, tk.END)
+        self.entry_fecha.insert(0, datetime.now().strftime("%d/%m/%Y"))
+        self.entry_hora.delete(0, tk.END)
+        self.entry_hora.insert(0, datetime.now().strftime("%H:%M"))
+        self.combo_especialidad.set("")
+        self.var_emergencia.set(False)
+        self.combo_triage.current(0)
+    
+    def _drenar_ingresos(self):
+        self.cola_turnos.drenar(MAXIMO_DRENADO)
+        self.root.after(INTERVALO_INGRESO, self._drenar_ingresos)
+    
+    def _cola_cambiada(self, evento, ticket, paciente):
+        # Puede llegar desde otro hilo: ahí solo se marca y el reloj lo recoge
+        # (los widgets y root.after son solo del hilo de la interfaz)
+        if threading.get_ident() == self._hilo_interfaz:
+            self.programar_refresco()
+        else:
+            self._sucio = True
+    
+    def programar_refresco(self, solo_tabla=False):
+        """Marcar la vista como desactualizada; se redibuja en el próximo cuadro"""
+        if solo_tabla:
+            self._tabla_sucia = True
+        else:
+            self._sucio = True
+        if self._refresco is None:
+            self._refresco = self.root.after(INTERVALO_CUADRO, self._refrescar)
+    
+    def _refrescar(self):
+        self._refresco = None
+        if self._sucio:
+            self._sucio = self._tabla_sucia = False
+            self.actualizar_interfaz()
+        elif self._tabla_sucia:
+            self._tabla_sucia = False
+            self.actualizar_tabla()
+    
+    def _tic_reloj(self):
+        # Las reservas que llegan a su horario se encolan (y marcan la vista)
+        self.agenda.liberar()
+        if self._sucio:
+            self.programar_refresco()
+        elif self._refresco is None:
+            self.actualizar_esperas()
+        self.root.after(INTERVALO_RELOJ, self._tic_reloj)
+    
+    def actualizar_esperas(self):
+        """Reescribir solo las celdas de espera y de estimado que cambiaron de
+        minuto y el tiempo promedio, sin rearmar la tabla"""
+        filas = list(self.cola_turnos.iterar_turnos(offset=self._desplazamiento,
+                                                    limit=len(self._orden_filas)))
+        estimados = self._estimados(filas)
+        for turno in filas:
+            ticket = turno[1]
+            valores = self._filas.get(ticket)
+            if valores is None:
+                # La ventana cambió sin aviso: redibujarla entera
+                self.programar_refresco(solo_tabla=True)
+                break
+            espera = f"{turno[7]} min"
+            eta = estimados[ticket]
+            if valores[7] != espera:
+                self.tree.set(ticket, "Tiempo Esp.", espera)
+            if valores[8] != eta:
+                self.tree.set(ticket, "Estimado", eta)
+            self._filas[ticket] = valores[:7] + (espera, eta)
+        
+        promedio = f"⏱ Tiempo prom: {self.cola_turnos.obtener_estadisticas()['tiempo_promedio']} min"
+        if self.label_tiempo_prom.cget("text") != promedio:
+            self.label_tiempo_prom.config(text=promedio)
+    
+    def _estimados(self, filas):
+        """ticket -> estimado de las filas visibles. Las filas de una
+        especialidad van en el orden de su subcola, así alcanza con buscar
+        la posición de la primera (O(log n)) y calcular la especialidad una
+        vez; las demás siguen por posición"""
+        grupos = {}   # especialidad -> (posición de su primera fila, tickets)
+        for turno in filas:
+            ticket, especialidad = turno[1], turno[5]
+            grupo = grupos.get(especialidad)
+            if grupo is None:
+                posicion = self.cola_turnos.buscar_ticket_especialidad(ticket)[1]
+                grupo = grupos[especialidad] = (posicion, [])
+            grupo[1].append(ticket)
+        estimados = {}
+        for especialidad, (desde, tickets) in grupos.items():
+            minutos = self.estimador.estimar_posiciones(especialidad, desde, len(tickets))
+            estimados.update(zip(tickets, (f"{round(valor)} min" for valor in minutos)))
+        return estimados
+    
+    def _filas_por_pagina(self):
+        return int(self.tree.cget("height"))
+    
+    def _comando_scroll(self, accion, cantidad, unidad=None):
+        """Comando de la barra vertical ('moveto' o 'scroll')"""
+        if accion == "moveto":
+            self._desplazamiento = int(float(cantidad) * self.cola_turnos.tamaño())
+            self.programar_refresco(solo_tabla=True)
+        else:
+            paso = self._filas_por_pagina() if unidad == "pages" else 1
+            self._desplazar(int(cantidad) * paso)
+    
+    def _rueda_mouse(self, event):
+        self._desplazar(-3 if event.delta > 0 else 3)
+        return "break"
+    
+    def _desplazar(self, filas):
+        self._desplazamiento += filas
+        self.programar_refresco(solo_tabla=True)
+    
+    def actualizar_tabla(self):
+        """Llenar solo las filas visibles (scroll virtual) y reutilizar las existentes"""
+        total = self.cola_turnos.tamaño()
+        por_pagina = self._filas_por_pagina()
+        self._desplazamiento = max(0, min(self._desplazamiento, total - por_pagina))
+        
+        ventana = {}
+        filas = list(self.cola_turnos.iterar_turnos(offset=self._desplazamiento, limit=por_pagina))
+        estimados = self._estimados(filas)
+        for turno in filas:
+            posicion, ticket, nombre, telefono, hora, especialidad, tipo, minutos, nivel = turno
+            ventana[ticket] = (posicion, nombre, telefono, hora, especialidad, tipo, nivel,
+                               f"{minutos} min", estimados[ticket])
+        
+        # Quitar las filas que salieron de la ventana
+        for ticket in self._orden_filas:
+            if ticket not in ventana:
+                self.tree.delete(ticket)
+                del self._filas[ticket]
+        orden = [ticket for ticket in self._orden_filas if ticket in ventana]
+        
+        # Insertar, mover o actualizar solo lo que cambió
+        for indice, (ticket, valores) in enumerate(ventana.items()):
+            if ticket not in self._filas:
+                tags = ("emergencia",) if valores[5] == "EMERGENCIA" else ("normal",)
+                self.tree.insert("", indice, iid=ticket, values=valores, tags=tags)
+                orden.insert(indice, ticket)
+            else:
+                if orden[indice] != ticket:
+                    self.tree.move(ticket, "", indice)
+                    orden.remove(ticket)
+                    orden.insert(indice, ticket)
+                if self._filas[ticket] != valores:
+                    self.tree.item(ticket, values=valores)
+            self._filas[ticket] = valores
+        self._orden_filas = orden
+        
+        if total:
+            self.scrollbar_v.set(self._desplazamiento / total,
+                                 (self._desplazamiento + len(orden)) / total)
+        else:
+            self.scrollbar_v.set(0, 1)
+    
+    def actualizar_interfaz(self):
+        # Tabla: solo la ventana visible
+        self.actualizar_tabla()
+        
+        # Actualizar estadísticas
+        stats = self.cola_turnos.obtener_estadisticas()
+        self.label_total.config(text=f"Total en cola: {stats['total']}")
+        self.label_emergencias.config(text=f"🚨 Cola Emergencias: {stats['emergencias']}")
+        self.label_normales.config(text=f"📋 Cola Normal: {stats['normales']}")
+        self.label_tiempo_prom.config(text=f"⏱ Tiempo prom: {stats['tiempo_promedio']} min")
+        self.label_reservas.config(text=f"📅 Reservas: {len(self.agenda)}")
+        
+        # Actualizar próximo paciente (frente de la cola)
+        proximo = self.cola_turnos.ver_primero()
+        if proximo:
+            tipo = "🚨 EMERGENCIA" if proximo.es_emergencia else "📋 NORMAL"
+            texto = f"{proximo.nombre}\n{tipo}\n{proximo.especialidad}"
+            self.label_proximo.config(text=texto, fg="#2d3748")
+        else:
+            self.label_proximo.config(text="Cola vacía", fg="#38B2AC")
+
+
+def main(directorio_diario=None, envejecimiento=None, ruta_metricas=None, directorio_historial=None,
+         ruta_tablero=None, ruta_avisos=None, ruta_ingreso=None):
+    root = tk.Tk()
+    
+    # Con diario, la cola sobrevive a una caída del proceso
+    diario = DiarioTurnos(directorio_diario) if directorio_diario is not None else None
+    cola = diario.recuperar() if diario is not None else ColaTurnos()
+    cola.configurar_envejecimiento(envejecimiento)
+    
+    # Turnos atendidos y cancelados, para los percentiles de espera
+    # (NumPy se carga solo si se pidió)
+    historial = None
+    if directorio_historial is not None:
+        from .historial import HistorialTurnos
+        
+        historial = HistorialTurnos(directorio_historial)
+        cola.suscribir(historial.registrar)
+    
+    # Frente de la cola para las pantallas de la sala de espera
+    # (los cambios se juntan y se publican a lo sumo cada INTERVALO_TABLERO)
+    tablero = None
+    if ruta_tablero is not None:
+        tablero = TableroTurnos(ruta_tablero, cola, espera_maxima=INTERVALO_TABLERO / 1000)
+    
+    # Avisos por teléfono a los próximos y a los llamados, despachados desde
+    # un hilo aparte (por ahora con la pasarela local, que los anota)
+    despachador = None
+    if ruta_avisos is not None:
+        from .avisos import AvisadorTurnos, DespachadorAvisos, PasarelaLocal
+        
+        despachador = DespachadorAvisos(PasarelaLocal(ruta_avisos)).iniciar()
+        AvisadorTurnos(cola, despachador.ofrecer)
+    
+    metricas = None
+    if ruta_metricas is not None:
+        metricas = instrumentar_cola(cola, Registro())
+        
+        def exportar():
+            escribir_archivo(metricas, ruta_metricas)
+            root.after(INTERVALO_METRICAS, exportar)
+        
+        root.after(INTERVALO_METRICAS, exportar)
+    
+    # Kioscos de registro que agregan pacientes a un archivo JSONL: un hilo
+    # lo sigue y ofrece cada uno; la interfaz drena el buffer con after()
+    ingreso = None
+    if ruta_ingreso is not None:
+        ingreso = IngresoArchivo(ColaTurnosConcurrente(cola), ruta_ingreso).iniciar()
+    
+    app = GestorTurnosApp(root, cola if ingreso is None else ingreso.cola, metricas)
+    
+    if diario is not None:
+        # Las reservas a futuro se guardan en el mismo diario que la cola
+        diario.recuperar_agenda(app.agenda)
+        app.actualizar_interfaz()
+        
+        def sincronizar():
+            diario.sincronizar_pendientes()
+            root.after(INTERVALO_DIARIO, sincronizar)
+        
+        root.after(INTERVALO_DIARIO, sincronizar)
+    
+    if tablero is not None:
+        def publicar():
+            tablero.publicar_pendientes()
+            root.after(INTERVALO_TABLERO, publicar)
+        
+        root.after(INTERVALO_TABLERO, publicar)
+    try:
+        root.mainloop()
+    finally:
+        if ingreso is not None:
+            ingreso.detener()
+        if diario is not None:
+            diario.cerrar()
+        if historial is not None:
+            historial.cerrar()
+        if tablero is not None:
+            tablero.cerrar()
+        if despachador is not None:
+            despachador.detener()
+        if metricas is not None:
+            escribir_archivo(metricas, ruta_metricas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""Historial columnar de turnos terminados (atendidos o cancelados).
+
+Cada turno que sale de la cola, llamado por desencolar o cancelado, se
+agrega como una fila. Cada columna es su propio archivo binario de solo
+agregado, con valores de ancho fijo en little-endian, así se puede mapear
+en memoria y leer como un arreglo de NumPy sin convertir filas a objetos:
+    registro.f8        hora de registro (segundos epoch, float64)
+    llamado.f8         hora de salida de la cola (float64)
+    especialidad.u2    código de especialidad (uint16)
+    nivel.u1           nivel de triage con que se registró (uint8); el tipo
+                       (emergencia o normal) se deriva de él
+    resultado.u1       ATENDIDO, CANCELADO o DESHECHO (uint8)
+    especialidades.txt nombre de cada código, uno por línea y en orden
+
+Un turno que vuelve a la cola al deshacer su salida (evento 'reinsertar',
+ver turnos.versiones) retira su fila: si todavía no se escribió se
+descarta, y si ya está en disco se marca DESHECHO y los análisis no la
+cuentan. Un encolar deshecho ('deshacer') no es una salida y no deja fila.
+
+Las filas se juntan en memoria y se escriben por lotes. Si una caída deja
+columnas de distinto largo, al abrir se descartan las filas incompletas.
+
+Los análisis (percentiles de espera, atendidos por hora, distribución por
+especialidad) necesitan NumPy (dependencia opcional, ver
+requirements-historial.txt) y recorren las columnas mapeadas de forma
+vectorizada. Sin NumPy el historial se sigue escribiendo y columnas()
+entrega memoryviews sobre los archivos mapeados.
+
+Uso:
+    historial = HistorialTurnos("historial")
+    cola.suscribir(historial.registrar)
+    ...
+    historial.percentiles_espera(especialidad="Cardiología")
+"""
+import array
+import mmap
+from collections import deque
+import os
+import sys
+import time
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional: solo hace falta para los análisis
+    numpy = None
+
+from .paciente import NIVEL_EMERGENCIA
+
+ATENDIDO = 0
+CANCELADO = 1
+DESHECHO = 2     # Salida deshecha después de escrita (no cuenta)
+
+# Nombre de la columna, tipo de array.array y tipo de NumPy equivalente
+COLUMNAS = (
+    ('registro', 'd', '<f8'),
+    ('llamado', 'd', '<f8'),
+    ('especialidad', 'H', '<u2'),
+    ('nivel', 'B', 'u1'),
+    ('resultado', 'B', 'u1'),
+)
+ARCHIVO_ESPECIALIDADES = 'especialidades.txt'
+
+_RESULTADO_POR_EVENTO = {'desencolar': ATENDIDO, 'cancelar': CANCELADO}
+_PERCENTILES = (50, 90, 95, 99)
+SALIDAS_DESHACIBLES = 1000   # Últimas filas que se pueden retirar al deshacer
+
+
+def _archivo_columna(nombre, tipo_numpy):
+    return f"{nombre}.{tipo_numpy.lstrip('<')}"
+
+
+def _requiere_numpy():
+    if numpy is None:
+        raise RuntimeError("Los análisis del historial necesitan NumPy "
+                           "(pip install -r requirements-historial.txt)")
+
+
+class HistorialTurnos:
+    """Historial de turnos terminados en `directorio`, en columnas mapeables.
+
+    registrar(evento, ticket, paciente) se suscribe a una ColaTurnos; las
+    filas se escriben cada `lote` turnos y en sincronizar() / cerrar().
+    `reloj` da la hora de salida (por defecto time.time). Con solo_lectura
+    no se toca ningún archivo: así se consulta un historial que otro
+    proceso está escribiendo (se ven las filas completas al abrir).
+    """
+    def __init__(self, directorio, lote=256, reloj=time.time, solo_lectura=False):
+        self.directorio = directorio
+        self.lote = lote
+        self.reloj = reloj
+        self.solo_lectura = solo_lectura
+        if not solo_lectura:
+            os.makedirs(directorio, exist_ok=True)
+
+        self._especialidades = []
+        ruta = os.path.join(directorio, ARCHIVO_ESPECIALIDADES)
+        if os.path.exists(ruta):
+            with open(ruta, encoding='utf-8') as archivo:
+                self._especialidades = archivo.read().splitlines()
+        self._codigos = {nombre: codigo for codigo, nombre in enumerate(self._especialidades)}
+
+        # Filas completas en disco: lo que tengan todas las columnas
+        rutas = [self._ruta(nombre) for nombre, _, _ in COLUMNAS]
+        filas = min(os.path.getsize(ruta) // array.array(tipo).itemsize
+                    if os.path.exists(ruta) else 0
+                    for ruta, (_, tipo, _) in zip(rutas, COLUMNAS))
+        self._escritas = filas
+        self._pendientes = [array.array(tipo) for _, tipo, _ in COLUMNAS]
+        self._salidas = deque(maxlen=SALIDAS_DESHACIBLES)   # (ticket, fila) de las últimas
+        self._archivos = []
+        if solo_lectura:
+            return
+        self._archivo_especialidades = open(ruta, 'a', encoding='utf-8')
+        for ruta, (_, tipo, _) in zip(rutas, COLUMNAS):
+            archivo = open(ruta, 'ab')
+            archivo.truncate(filas * array.array(tipo).itemsize)
+            self._archivos.append(archivo)
+
+    def _ruta(self, nombre):
+        tipo_numpy = next(tipo for columna, _, tipo in COLUMNAS if columna == nombre)
+        return os.path.join(self.directorio, _archivo_columna(nombre, tipo_numpy))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __len__(self):
+        return self._escritas + len(self._pendientes[0])
+
+    @property
+    def especialidades(self):
+        """Nombre de cada código de especialidad"""
+        return list(self._especialidades)
+
+    def _codigo(self, especialidad):
+        codigo = self._codigos.get(especialidad)
+        if codigo is None:
+            codigo = len(self._especialidades)
+            # El nombre llega al disco antes que cualquier fila que lo use
+            self._archivo_especialidades.write(especialidad + "\n")
+            self._archivo_especialidades.flush()
+            self._especialidades.append(especialidad)
+            self._codigos[especialidad] = codigo
+        return codigo
+
+    def registrar(self, evento, ticket, paciente):
+        """Observador de ColaTurnos: guarda los turnos atendidos y cancelados
+        y retira la fila de una salida deshecha"""
+        resultado = _RESULTADO_POR_EVENTO.get(evento)
+        if resultado is not None:
+            self.agregar(paciente.registro, self.reloj(), paciente.especialidad,
+                         paciente.nivel, resultado)
+            self._salidas.append((ticket, len(self) - 1))
+        elif evento == 'reinsertar' and self._salidas and self._salidas[-1][0] == ticket:
+            # Deshacer va de la última operación hacia atrás: si el turno
+            # salió, su salida es la última que queda sin deshacer
+            self._retirar(self._salidas.pop()[1])
+
+    def _retirar(self, fila):
+        """Descartar la fila si es la última pendiente, o marcarla DESHECHO
+        si ya está en disco"""
+        if fila >= self._escritas:
+            if fila == len(self) - 1:
+                for pendientes in self._pendientes:
+                    pendientes.pop()
+            return
+        # Los archivos de columna se abren para agregar; este cambio va en su lugar
+        with open(self._ruta('resultado'), 'r+b') as archivo:
+            archivo.seek(fila * array.array('B').itemsize)
+            archivo.write(bytes((DESHECHO,)))
+
+    def agregar(self, registro, llamado, especialidad, nivel, resultado=ATENDIDO):
+        """Agregar una fila (horas en segundos epoch)"""
+        if not self._archivos:
+            raise ValueError("El historial está cerrado o abierto solo para lectura")
+        registros, llamados, especialidades, niveles, resultados = self._pendientes
+        registros.append(registro)
+        llamados.append(llamado)
+        especialidades.append(self._codigo(especialidad))
+        niveles.append(nivel)
+        resultados.append(resultado)
+        if len(registros) >= self.lote:
+            self.sincronizar()
+
+    def sincronizar(self, fsync=False):
+        """Escribir las filas pendientes (y con fsync, forzarlas al disco)"""
+        if self._pendientes[0]:
+            for archivo, pendientes in zip(self._archivos, self._pendientes):
+                if sys.byteorder == 'big':
+                    pendientes.byteswap()
+                pendientes.tofile(archivo)
+            self._escritas += len(self._pendientes[0])
+            self._pendientes = [array.array(tipo) for _, tipo, _ in COLUMNAS]
+        for archivo in self._archivos:
+            archivo.flush()
+            if fsync:
+                os.fsync(archivo.fileno())
+
+    def cerrar(self):
+        if not self._archivos:
+            return
+        self.sincronizar(fsync=True)
+        for archivo in self._archivos:
+            archivo.close()
+        self._archivos = []
+        self._archivo_especialidades.close()
+
+    def columnas(self):
+        """nombre -> columna de solo lectura con las filas escritas hasta ahora.
+
+        Con NumPy son numpy.memmap; sin NumPy, memoryviews sobre un mmap
+        (con el orden de bytes de la máquina).
+        """
+        if self._archivos:
+            self.sincronizar()
+        filas = self._escritas
+        resultado = {}
+        for nombre, tipo, tipo_numpy in COLUMNAS:
+            if numpy is not None:
+                if filas:
+                    resultado[nombre] = numpy.memmap(self._ruta(nombre), dtype=tipo_numpy,
+                                                     mode='r', shape=(filas,))
+                else:
+                    resultado[nombre] = numpy.empty(0, dtype=tipo_numpy)
+                continue
+            largo = filas * array.array(tipo).itemsize
+            if not largo:
+                resultado[nombre] = memoryview(array.array(tipo))
+                continue
+            with open(self._ruta(nombre), 'rb') as archivo:
+                mapa = mmap.mmap(archivo.fileno(), largo, access=mmap.ACCESS_READ)
+            resultado[nombre] = memoryview(mapa).cast(tipo)
+        return resultado
+
+    # Análisis (NumPy)
+
+    def _filtrar(self, columnas, desde, hasta, especialidad, emergencia, resultado):
+        """Máscara de filas; desde/hasta acotan la hora de llamado y aceptan
+        datetime o segundos epoch. Las filas DESHECHO no pasan nunca."""
+        condiciones = []
+        if resultado is not None:
+            condiciones.append(columnas['resultado'] == resultado)
+        else:
+            condiciones.append(columnas['resultado'] != DESHECHO)
+        if desde is not None:
+            condiciones.append(columnas['llamado'] >= _segundos(desde))
+        if hasta is not None:
+            condiciones.append(columnas['llamado'] < _segundos(hasta))
+        if especialidad is not None:
+            codigo = self._codigos.get(especialidad)
+            if codigo is None:
+                return numpy.zeros(len(columnas['llamado']), dtype=bool)
+            condiciones.append(columnas['especialidad'] == codigo)
+        if emergencia is not None:
+            es_emergencia = columnas['nivel'] <= NIVEL_EMERGENCIA
+            condiciones.append(es_emergencia if emergencia else ~es_emergencia)
+        mascara = condiciones[0]
+        for condicion in condiciones[1:]:
+            mascara &= condicion
+        return mascara
+
+    def esperas(self, desde=None, hasta=None, especialidad=None, emergencia=None,
+                resultado=ATENDIDO):
+        """Minutos de espera de cada turno que cumple los filtros (arreglo NumPy).
+
+        Por defecto solo los atendidos; resultado=None incluye los cancelados
+        (su espera es hasta la cancelación).
+        """
+        _requiere_numpy()
+        columnas = self.columnas()
+        mascara = self._filtrar(columnas, desde, hasta, especialidad, emergencia, resultado)
+        llamado, registro = columnas['llamado'][mascara], columnas['registro'][mascara]
+        return numpy.subtract(llamado, registro) / 60
+
+    def percentiles_espera(self, percentiles=_PERCENTILES, **filtros):
+        """{percentil: minutos} de la espera (None si no hay turnos); acepta
+        los filtros de esperas()"""
+        esperas = self.esperas(**filtros)
+        if not len(esperas):
+            return {p: None for p in percentiles}
+        valores = numpy.percentile(esperas, percentiles)
+        return {p: round(float(valor), 1) for p, valor in zip(percentiles, valores)}
+
+    def atendidos_por_hora(self, desde=None, hasta=None, especialidad=None):
+        """Promedio de turnos atendidos en cada hora del día (lista de 24), por
+        hora local de llamado y sobre los días con algún atendido"""
+        _requiere_numpy()
+        columnas = self.columnas()
+        mascara = self._filtrar(columnas, desde, hasta, especialidad, None, ATENDIDO)
+        llamado = columnas['llamado'][mascara]
+        if not len(llamado):
+            return [0.0] * 24
+
+        # Desfase horario de cada día UTC (cambia con el horario de verano),
+        # calculado una vez por día y no por fila
+        dias = (llamado // 86400).astype(numpy.int64)
+        primero = int(dias.min())
+        desfases = numpy.array([time.localtime(dia * 86400 + 43200).tm_gmtoff
+                                for dia in range(primero, int(dias.max()) + 1)], dtype=numpy.float64)
+        local = llamado + desfases[dias - primero]
+        horas = ((local // 3600) % 24).astype(numpy.intp)
+        dias_locales = (local // 86400).astype(numpy.int64)
+        con_atendidos = numpy.count_nonzero(numpy.bincount(dias_locales - dias_locales.min()))
+        por_hora = numpy.bincount(horas, minlength=24) / con_atendidos
+        return [round(float(valor), 2) for valor in por_hora]
+
+    def esperas_por_especialidad(self, percentiles=_PERCENTILES, desde=None, hasta=None,
+                                 emergencia=None):
+        """especialidad -> {'atendidos', 'promedio', 'p50', ...} en minutos.
+
+        Un solo ordenamiento estable por código (radix sobre uint16) agrupa
+        las esperas; cada grupo es un tramo contiguo.
+        """
+        _requiere_numpy()
+        columnas = self.columnas()
+        mascara = self._filtrar(columnas, desde, hasta, None, emergencia, ATENDIDO)
+        codigos, llamado, registro = (columnas['especialidad'][mascara], columnas['llamado'][mascara],
+                                      columnas['registro'][mascara])
+        orden = numpy.argsort(codigos, kind='stable')
+        esperas = (llamado[orden] - registro[orden]) / 60
+        cantidades = numpy.bincount(codigos, minlength=len(self._especialidades))
+        resultado = {}
+        inicio = 0
+        for codigo, cantidad in enumerate(cantidades.tolist()):
+            if not cantidad:
+                continue
+            grupo = esperas[inicio:inicio + cantidad]
+            inicio += cantidad
+            datos = {'atendidos': cantidad, 'promedio': round(float(grupo.mean()), 1)}
+            for p, valor in zip(percentiles, numpy.percentile(grupo, percentiles)):
+                datos[f"p{p}"] = round(float(valor), 1)
+            resultado[self._especialidades[codigo]] = datos
+        return resultado
+
+    def resumen(self, desde=None, hasta=None):
+        """Totales, percentiles de espera y tasa de cancelación del período"""
+        _requiere_numpy()
+        columnas = self.columnas()
+        mascara = self._filtrar(columnas, desde, hasta, None, None, None)
+        resultados = columnas['resultado'][mascara]
+        total = len(resultados)
+        cancelados = int(numpy.count_nonzero(resultados == CANCELADO))
+        return {
+            'total': total,
+            'atendidos': total - cancelados,
+            'cancelados': cancelados,
+            'tasa_cancelacion': round(cancelados / total, 3) if total else None,
+            'espera': self.percentiles_espera(desde=desde, hasta=hasta),
+            'espera_emergencias': self.percentiles_espera(desde=desde, hasta=hasta, emergencia=True),
+            'espera_normales': self.percentiles_espera(desde=desde, hasta=hasta, emergencia=False),
+        }
+
+
+def _segundos(momento):
+    """Segundos epoch de un datetime (o del número tal cual)"""
+    return momento.timestamp() if hasattr(momento, 'timestamp') else float(momento)
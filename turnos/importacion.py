@@ -0,0 +1,173 @@
+"""Importación masiva de la agenda (CSV o JSONL) a una ColaTurnos.
+
+Las filas se leen en streaming, se validan con las mismas reglas que el
+formulario de registro y se encolan por lotes. Los errores se acumulan en
+un reporte por fila en lugar de mostrarse uno a uno.
+
+Columnas (CSV con encabezado, o claves de cada objeto JSONL):
+    nombre, telefono, fecha, hora, especialidad, emergencia, nivel
+`emergencia` es opcional y acepta 1/0, si/no, true/false, x. `nivel` es el
+triage (1 a 5), también opcional: sin él, una emergencia es nivel 1 y el
+resto nivel 3.
+
+Con una AgendaTurnos, las filas con turno a futuro se reservan en ella en
+lugar de encolarse (entran a la cola cuando se acerca su horario).
+"""
+import csv
+import json
+from itertools import islice
+
+from . import validacion
+from .paciente import NIVELES_TRIAGE, Paciente, validar_nivel
+
+TAMAÑO_LOTE = 1000
+
+_VERDADEROS = frozenset(("1", "si", "sí", "s", "true", "x", "yes", "emergencia"))
+
+
+class ReporteImportacion:
+    """Resultado de una importación: filas aceptadas (encoladas o reservadas
+    en la agenda) y errores por fila"""
+    def __init__(self):
+        self.importados = 0
+        self.tickets = []
+        self.reservados = 0
+        self.reservas = []
+        self.errores = []   # (número de fila, [motivos])
+
+    @property
+    def filas(self):
+        return self.importados + len(self.errores)
+
+
+def _texto(valor):
+    return "" if valor is None else str(valor).strip()
+
+
+def _es_emergencia(valor):
+    if isinstance(valor, bool):
+        return valor
+    return _texto(valor).lower() in _VERDADEROS
+
+
+def _nivel(valor):
+    """Nivel de triage de una celda (None si está vacía); ValueError si es inválido"""
+    if isinstance(valor, bool):
+        raise ValueError(valor)
+    if isinstance(valor, int):
+        return validar_nivel(valor)
+    texto = _texto(valor)
+    return validar_nivel(int(texto)) if texto else None
+
+
+def importar_filas(cola, filas, especialidades=None, tamaño_lote=TAMAÑO_LOTE, agenda=None):
+    """Validar y encolar un iterable de diccionarios; retorna un ReporteImportacion.
+
+    Con `especialidades`, las filas con una especialidad fuera de la lista
+    se rechazan (igual que el combo del formulario). Con `agenda`, los
+    turnos a futuro se reservan en ella.
+    """
+    reporte = ReporteImportacion()
+    _importar(cola, enumerate(filas, 1), especialidades, tamaño_lote, reporte, agenda)
+    return reporte
+
+
+def importar_csv(cola, archivo, especialidades=None, tamaño_lote=TAMAÑO_LOTE, agenda=None):
+    """Importar un CSV con encabezado (archivo abierto en modo texto)"""
+    reporte = ReporteImportacion()
+    _importar(cola, _leer_csv(archivo, reporte), especialidades, tamaño_lote, reporte, agenda)
+    reporte.errores.sort(key=lambda error: error[0])
+    return reporte
+
+
+def importar_jsonl(cola, archivo, especialidades=None, tamaño_lote=TAMAÑO_LOTE, agenda=None):
+    """Importar un objeto JSON por línea (archivo abierto en modo texto)"""
+    reporte = ReporteImportacion()
+    _importar(cola, _leer_jsonl(archivo, reporte), especialidades, tamaño_lote, reporte, agenda)
+    reporte.errores.sort(key=lambda error: error[0])
+    return reporte
+
+
+def importar_archivo(cola, ruta, especialidades=None, tamaño_lote=TAMAÑO_LOTE, agenda=None):
+    """Importar según la extensión: .jsonl/.ndjson como JSONL, el resto como CSV"""
+    importar = importar_jsonl if ruta.lower().endswith((".jsonl", ".ndjson")) else importar_csv
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        return importar(cola, archivo, especialidades, tamaño_lote, agenda)
+
+
+def paciente_desde_fila(fila, especialidades=None):
+    """Validar una fila (diccionario con las columnas de la importación);
+    retorna (paciente, None) o (None, [motivos])"""
+    if not isinstance(fila, dict):
+        return None, ["La fila no es un registro"]
+    nombre = _texto(fila.get("nombre"))
+    telefono = _texto(fila.get("telefono"))
+    especialidad = _texto(fila.get("especialidad"))
+    errores = validacion.errores_registro(nombre, telefono, especialidad, especialidades)
+    try:
+        nivel = _nivel(fila.get("nivel"))
+    except ValueError:
+        errores = errores + [f"El nivel de triage debe ser de 1 a {NIVELES_TRIAGE}"]
+    if errores:
+        return None, errores
+    return Paciente(nombre, telefono, _texto(fila.get("fecha")), _texto(fila.get("hora")),
+                    especialidad, _es_emergencia(fila.get("emergencia")), nivel), None
+
+
+def _importar(cola, numeradas, especialidades, tamaño_lote, reporte, agenda=None):
+    numeradas = iter(numeradas)
+    ahora = agenda.reloj() if agenda is not None else None
+
+    while True:
+        bloque = list(islice(numeradas, tamaño_lote))
+        if not bloque:
+            return
+
+        lote = []
+        for numero, fila in bloque:
+            paciente, errores = paciente_desde_fila(fila, especialidades)
+            if errores:
+                reporte.errores.append((numero, errores))
+                continue
+            if agenda is not None and agenda.es_futuro(paciente, ahora):
+                reporte.reservas.append(agenda.reservar(paciente))
+                reporte.reservados += 1
+                reporte.importados += 1
+            else:
+                lote.append(paciente)
+
+        if lote:
+            reporte.tickets.extend(cola.encolar_lote(lote))
+            reporte.importados += len(lote)
+
+
+def _leer_csv(archivo, reporte):
+    lector = csv.DictReader(archivo)
+    try:
+        lector.fieldnames
+    except csv.Error as error:
+        # Sin encabezado no se pueden interpretar las filas
+        reporte.errores.append((lector.reader.line_num, [f"CSV inválido: {error}"]))
+        return
+    while True:
+        try:
+            fila = next(lector)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            # La fila mal formada (campo demasiado largo...) se saltea; el
+            # line_num del DictReader todavía es el de la fila anterior
+            reporte.errores.append((lector.reader.line_num, [f"CSV inválido: {error}"]))
+            continue
+        yield lector.line_num, fila
+
+
+def _leer_jsonl(archivo, reporte):
+    for numero, linea in enumerate(archivo, 1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            yield numero, json.loads(linea)
+        except json.JSONDecodeError as error:
+            reporte.errores.append((numero, [f"JSON inválido: {error.msg}"]))
@@ -0,0 +1,366 @@
+"""Métricas de la cola de turnos: contadores, histogramas de latencia e
+indicadores, exportables en el formato de texto de Prometheus.
+
+instrumentar_cola() envuelve una vez las operaciones de una ColaTurnos
+(en la instancia, sin tocar la clase) para contar llamadas y medir su
+latencia, y registra indicadores de profundidad por tipo, nivel y
+especialidad que se leen de la cola recién al exportar. Los cambios los
+cuenta la propia cola por evento (ColaTurnos.eventos: encolar,
+desencolar, cancelar...). Cada envoltura cuenta todas las llamadas y mide
+una de cada `muestreo` (1: todas): medir cuesta dos lecturas del reloj y
+una búsqueda en el histograma, que pesan en operaciones de pocos µs.
+
+PerfiladorMuestreo es un perfilador por muestreo opcional: un hilo mira la
+pila de otro cada pocos milisegundos y acumula pilas colapsadas (el
+formato de flamegraph.pl y speedscope).
+
+Uso:
+    metricas = Registro()
+    instrumentar_cola(cola, metricas)
+    ...
+    escribir_archivo(metricas, "turnos.prom")   # o GET /metrics en el servicio
+"""
+import bisect
+import collections
+import os
+import sys
+import threading
+import time
+
+# Límites (segundos) de los histogramas de latencia: 1 µs a 2,5 s
+LIMITES_LATENCIA = tuple(float(f"{base}e{exponente}")
+                         for exponente in range(-6, 1) for base in (1, 2.5, 5))[:-1]
+
+# Por defecto se mide 1 de cada tantas llamadas a cada operación de la cola
+MUESTREO_POR_DEFECTO = 64
+
+# Operaciones de ColaTurnos que se miden. cancelar_turno y buscar_paciente
+# llaman a cancelar_ticket y buscar_ticket: esas llamadas internas también
+# cuentan en su propia operación. El envejecimiento se mide dentro de
+# desencolar y ver_primero
+OPERACIONES_COLA = ('encolar', 'encolar_lote', 'desencolar', 'cancelar_ticket',
+                    'cancelar_turno', 'buscar_ticket', 'buscar_paciente', 'sugerir',
+                    'obtener_estadisticas')
+
+
+class Contador:
+    """Valor que solo crece"""
+    __slots__ = ('valor',)
+
+    def __init__(self):
+        self.valor = 0
+
+    def incrementar(self, cantidad=1):
+        self.valor += cantidad
+
+
+class Histograma:
+    """Conteos por intervalo (no acumulados; se acumulan al exportar)"""
+    __slots__ = ('limites', 'conteos', 'suma')
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)   # El último es +Inf
+        self.suma = 0.0
+
+    def observar(self, valor, veces=1):
+        self.conteos[bisect.bisect_left(self.limites, valor)] += veces
+        self.suma += valor * veces
+
+    @property
+    def cantidad(self):
+        return sum(self.conteos)
+
+    def percentil(self, p):
+        """Límite superior del intervalo que contiene el percentil p, o None"""
+        if not self.cantidad:
+            return None
+        objetivo = p / 100 * self.cantidad
+        acumulado = 0
+        for limite, conteo in zip(self.limites, self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return limite
+        return float('inf')
+
+
+class _Familia:
+    def __init__(self, nombre, ayuda, tipo):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.tipo = tipo
+        self.hijos = {}   # tupla ordenada de etiquetas -> métrica
+
+
+class Registro:
+    """Conjunto de métricas con nombre; exportar() las escribe para Prometheus"""
+    def __init__(self):
+        self._familias = {}
+        self._indicadores = []   # (nombre, ayuda, funcion, tipo)
+
+    def _familia(self, nombre, ayuda, tipo):
+        familia = self._familias.get(nombre)
+        if familia is None:
+            familia = self._familias[nombre] = _Familia(nombre, ayuda, tipo)
+        elif familia.tipo != tipo:
+            raise ValueError(f"La métrica {nombre} ya existe como {familia.tipo}")
+        return familia
+
+    def contador(self, nombre, ayuda="", **etiquetas):
+        """Contador con esas etiquetas, creándolo si hace falta"""
+        hijos = self._familia(nombre, ayuda, 'counter').hijos
+        clave = tuple(sorted(etiquetas.items()))
+        contador = hijos.get(clave)
+        if contador is None:
+            contador = hijos[clave] = Contador()
+        return contador
+
+    def histograma(self, nombre, ayuda="", limites=LIMITES_LATENCIA, **etiquetas):
+        """Histograma con esas etiquetas, creándolo si hace falta"""
+        hijos = self._familia(nombre, ayuda, 'histogram').hijos
+        clave = tuple(sorted(etiquetas.items()))
+        histograma = hijos.get(clave)
+        if histograma is None:
+            histograma = hijos[clave] = Histograma(limites)
+        return histograma
+
+    def indicador(self, nombre, ayuda, funcion, tipo='gauge'):
+        """Métrica calculada al exportar (gauge, o counter si el valor
+        ya lo acumula otro objeto).
+
+        `funcion()` retorna pares (etiquetas, valor), con las etiquetas en
+        un diccionario.
+        """
+        self._indicadores.append((nombre, ayuda, funcion, tipo))
+
+    def cronometrar(self, funcion, nombre, ayuda="", muestreo=1, **etiquetas):
+        """Envolver `funcion` para medir su latencia en el histograma `nombre`.
+
+        Con `muestreo` > 1 se mide una de cada `muestreo` llamadas; la
+        envoltura cuenta todas (su llamadas() da el total).
+        """
+        histograma = self.histograma(nombre, ayuda, **etiquetas)
+        return _cronometrada(funcion, histograma, muestreo)
+
+    def exportar(self):
+        """Todas las métricas en el formato de texto de Prometheus (0.0.4)"""
+        lineas = []
+        for familia in self._familias.values():
+            lineas.append(f"# HELP {familia.nombre} {_escapar_ayuda(familia.ayuda)}")
+            lineas.append(f"# TYPE {familia.nombre} {familia.tipo}")
+            for clave, metrica in familia.hijos.items():
+                if familia.tipo == 'counter':
+                    lineas.append(f"{familia.nombre}{_etiquetas(clave)} {_numero(metrica.valor)}")
+                    continue
+                acumulado = 0
+                for limite, conteo in zip(metrica.limites + (float('inf'),), metrica.conteos):
+                    acumulado += conteo
+                    le = clave + (('le', _numero(limite)),)
+                    lineas.append(f"{familia.nombre}_bucket{_etiquetas(le)} {acumulado}")
+                lineas.append(f"{familia.nombre}_sum{_etiquetas(clave)} {_numero(metrica.suma)}")
+                lineas.append(f"{familia.nombre}_count{_etiquetas(clave)} {metrica.cantidad}")
+        for nombre, ayuda, funcion, tipo in self._indicadores:
+            lineas.append(f"# HELP {nombre} {_escapar_ayuda(ayuda)}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for etiquetas, valor in funcion():
+                clave = tuple(sorted(etiquetas.items()))
+                lineas.append(f"{nombre}{_etiquetas(clave)} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer() and abs(valor) < 1e15:
+        return str(int(valor))
+    return repr(valor)
+
+
+def _escapar_ayuda(texto):
+    return texto.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _etiquetas(clave):
+    if not clave:
+        return ""
+    partes = []
+    for nombre, valor in clave:
+        valor = str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        partes.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def _cronometrada(funcion, histograma, muestreo):
+    # Es el camino caliente: todo en variables locales y la observación en
+    # línea (sin llamar a Histograma.observar). Las llamadas se cuentan en
+    # la clausura y no en un Contador: incrementar un atributo en cada
+    # llamada se nota. Si la función lanza una excepción la llamada se
+    # cuenta pero no se mide
+    reloj = time.perf_counter
+    buscar = bisect.bisect_left
+    limites = histograma.limites
+    conteos = histograma.conteos
+    llamadas = 0
+
+    def medida(*args, **kwargs):
+        nonlocal llamadas
+        llamadas += 1
+        if llamadas % muestreo:
+            return funcion(*args, **kwargs)
+        inicio = reloj()
+        resultado = funcion(*args, **kwargs)
+        duracion = reloj() - inicio
+        conteos[buscar(limites, duracion)] += 1
+        histograma.suma += duracion
+        return resultado
+
+    medida.llamadas = lambda: llamadas
+    medida.__wrapped__ = funcion
+    medida.__name__ = getattr(funcion, '__name__', 'medida')
+    medida.__doc__ = getattr(funcion, '__doc__', None)
+    return medida
+
+
+def instrumentar_cola(cola, registro, muestreo=MUESTREO_POR_DEFECTO, operaciones=OPERACIONES_COLA):
+    """Medir las operaciones de `cola` y exponer su profundidad en `registro`.
+
+    Las envolturas son atributos de la instancia, puestos una sola vez: las
+    demás colas no pagan nada. (Cambiar la clase de la instancia ya creada
+    por una subclase, en cambio, hace más lentos en CPython todos sus
+    accesos a atributos.)
+    Registra:
+        turnos_eventos_total{evento}           cambios de la cola
+        turnos_operaciones_total{operacion}    llamadas (todas)
+        turnos_operacion_segundos{operacion}   histograma de latencia de 1 de
+                                               cada `muestreo` llamadas
+        turnos_promovidos_total                turnos que subieron de nivel
+        turnos_en_cola{tipo} / {nivel} / {especialidad}   profundidad actual
+    Con una ColaTurnosConcurrente se instrumenta la cola envuelta. Una cola
+    se instrumenta una sola vez (ver metricas_de).
+    """
+    base = getattr(cola, 'cola', cola)
+    if metricas_de(base) is not None:
+        raise ValueError("La cola ya está instrumentada")
+    ayuda = "Latencia de las operaciones de la cola (llamadas medidas)"
+    envolturas = {}
+    for operacion in operaciones:
+        envolturas[operacion] = registro.cronometrar(
+            getattr(base, operacion), 'turnos_operacion_segundos', ayuda, muestreo=muestreo,
+            operacion=operacion)
+        setattr(base, operacion, envolturas[operacion])
+    base._metricas = registro
+    registro.indicador('turnos_operaciones_total', "Llamadas a las operaciones de la cola",
+                       lambda: [({'operacion': operacion}, envoltura.llamadas())
+                                for operacion, envoltura in envolturas.items()],
+                       tipo='counter')
+
+    # Los cambios (por evento) y los de nivel los cuenta la cola: se leen
+    # al exportar, como la profundidad
+    registro.indicador('turnos_eventos_total', "Cambios de la cola por evento",
+                       lambda: [({'evento': evento}, total)
+                                for evento, total in list(base.eventos.items())],
+                       tipo='counter')
+    registro.indicador('turnos_promovidos_total', "Turnos que cambiaron de nivel de triage",
+                       lambda: [({}, base.promociones)], tipo='counter')
+
+    def por_tipo():
+        emergencias = base.contar_turnos('EMERGENCIA')
+        yield {'tipo': 'EMERGENCIA'}, emergencias
+        yield {'tipo': 'NORMAL'}, base.tamaño() - emergencias
+
+    def por_nivel():
+        for nivel, cola_nivel in enumerate(base.niveles, 1):
+            yield {'nivel': nivel}, len(cola_nivel)
+
+    def por_especialidad():
+        for especialidad in base.colas_especialidad:
+            yield {'especialidad': especialidad}, base.tamaño(especialidad)
+
+    registro.indicador('turnos_en_cola', "Turnos en espera por tipo", por_tipo)
+    registro.indicador('turnos_en_cola_nivel', "Turnos en espera por nivel de triage actual", por_nivel)
+    registro.indicador('turnos_en_cola_especialidad', "Turnos en espera por especialidad",
+                       por_especialidad)
+    return registro
+
+
+def metricas_de(cola):
+    """Registro con que se instrumentó la cola, o None"""
+    return getattr(getattr(cola, 'cola', cola), '_metricas', None)
+
+
+def escribir_archivo(registro, ruta):
+    """Escribir la exportación en `ruta` con reemplazo atómico (para el
+    textfile collector de node_exporter)"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        archivo.write(registro.exportar())
+    os.replace(temporal, ruta)
+
+
+class PerfiladorMuestreo:
+    """Perfilador por muestreo de un hilo (por defecto, el que lo crea).
+
+    Cada `intervalo` segundos un hilo aparte toma la pila del hilo
+    observado y suma una muestra a su pila colapsada
+    ("modulo:funcion;modulo:funcion ..."). Pensado para correr un rato
+    sobre la aplicación en uso; el costo lo paga el hilo muestreador (y el
+    GIL que toma en cada muestra).
+    """
+    def __init__(self, intervalo=0.005, hilo=None, profundidad=64):
+        self.intervalo = intervalo
+        self.hilo = hilo if hilo is not None else threading.get_ident()
+        self.profundidad = profundidad
+        self.pilas = collections.Counter()
+        self.muestras = 0
+        self._detener = threading.Event()
+        self._muestreador = None
+
+    def iniciar(self):
+        if self._muestreador is not None:
+            raise RuntimeError("El perfilador ya está corriendo")
+        self._detener.clear()
+        self._muestreador = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+        self._muestreador.start()
+        return self
+
+    def detener(self):
+        if self._muestreador is None:
+            return
+        self._detener.set()
+        self._muestreador.join()
+        self._muestreador = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo)
+            if marco is None:
+                continue
+            pila = []
+            while marco is not None and len(pila) < self.profundidad:
+                codigo = marco.f_code
+                modulo = os.path.splitext(os.path.basename(codigo.co_filename))[0]
+                pila.append(f"{modulo}:{codigo.co_name}")
+                marco = marco.f_back
+            pila.reverse()
+            self.pilas[";".join(pila)] += 1
+            self.muestras += 1
+
+    def mas_frecuentes(self, cantidad=10):
+        """[(función, proporción de muestras en que estaba en el tope de la pila)]"""
+        propias = collections.Counter()
+        for pila, muestras in self.pilas.items():
+            propias[pila.rsplit(";", 1)[-1]] += muestras
+        total = self.muestras or 1
+        return [(funcion, muestras / total) for funcion, muestras in propias.most_common(cantidad)]
+
+    def escribir(self, ruta):
+        """Pilas colapsadas, una por línea: "pila muestras" """
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            for pila, muestras in self.pilas.most_common():
+                archivo.write(f"{pila} {muestras}\n")
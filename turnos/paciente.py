@@ -0,0 +1,155 @@
+"""Datos de un paciente en espera"""
+import time
+from datetime import datetime
+
+# Especialidades atendidas en la clínica
+ESPECIALIDADES = (
+    "Medicina General", "Cardiología", "Dermatología",
+    "Neurología", "Pediatría", "Ginecología", "Traumatología"
+)
+
+# Triage: 1 (más urgente) a 5. Hasta NIVEL_EMERGENCIA cuenta como emergencia
+NIVELES_TRIAGE = 5
+NIVEL_EMERGENCIA = 2
+NIVEL_POR_DEFECTO_EMERGENCIA = 1
+NIVEL_POR_DEFECTO_NORMAL = 3
+
+# Tabla de especialidades: cada paciente guarda solo el código (un entero
+# chico, compartido) y todos leen la misma cadena
+_NOMBRES_ESPECIALIDAD = list(ESPECIALIDADES)
+_CODIGOS_ESPECIALIDAD = {especialidad: codigo for codigo, especialidad in enumerate(ESPECIALIDADES)}
+
+
+def codigo_especialidad(especialidad):
+    """Código de una especialidad; las desconocidas se agregan a la tabla"""
+    codigo = _CODIGOS_ESPECIALIDAD.get(especialidad)
+    if codigo is None:
+        codigo = _CODIGOS_ESPECIALIDAD.setdefault(especialidad, len(_NOMBRES_ESPECIALIDAD))
+        if codigo == len(_NOMBRES_ESPECIALIDAD):
+            _NOMBRES_ESPECIALIDAD.append(especialidad)
+    return codigo
+
+
+def validar_nivel(nivel):
+    """Nivel de triage como entero 1..NIVELES_TRIAGE; ValueError si no lo es"""
+    if isinstance(nivel, bool) or not isinstance(nivel, int) or not 1 <= nivel <= NIVELES_TRIAGE:
+        raise ValueError(f"Nivel de triage inválido: {nivel!r} (1 a {NIVELES_TRIAGE})")
+    return nivel
+
+
+def _codificar_agenda(fecha, hora):
+    """fecha DD/MM/AAAA y hora HH:MM como un entero AAAAMMDDHHMM.
+
+    Si alguna no tiene exactamente ese formato se guardan las cadenas tal
+    cual, para devolverlas sin cambios.
+    """
+    if (len(fecha) == 10 and len(hora) == 5
+            and fecha[2] == fecha[5] == "/" and hora[2] == ":"):
+        digitos = fecha[6:] + fecha[3:5] + fecha[:2] + hora[:2] + hora[3:]
+        if digitos.isascii() and digitos.isdigit():
+            return int(digitos)
+    return (fecha, hora)
+
+
+class Paciente:
+    """Clase para representar un paciente en la cola.
+
+    Con __slots__ y campos compactos para colas grandes: la especialidad es
+    un código, fecha y hora van juntas en un entero y la hora de registro
+    es un timestamp (float). Los atributos públicos de siempre (fecha, hora,
+    especialidad, hora_registro) siguen disponibles como propiedades.
+
+    `nivel` es el triage asignado (1 a 5). Sin nivel, una emergencia es 1 y
+    un turno normal 3; es_emergencia se deriva del nivel.
+    """
+    __slots__ = ('nombre', 'telefono', 'nivel', 'ticket',
+                 '_especialidad', '_agenda', 'registro')
+
+    def __init__(self, nombre, telefono, fecha, hora, especialidad, es_emergencia=False, nivel=None):
+        self.nombre = nombre
+        self.telefono = telefono
+        self._agenda = _codificar_agenda(fecha, hora)
+        self._especialidad = codigo_especialidad(especialidad)
+        if nivel is None:
+            nivel = NIVEL_POR_DEFECTO_EMERGENCIA if es_emergencia else NIVEL_POR_DEFECTO_NORMAL
+        self.nivel = validar_nivel(nivel)
+        self.registro = round(time.time(), 6)  # Hora de registro (segundos epoch, al microsegundo)
+        self.ticket = None  # Se asigna al encolar
+
+    @property
+    def es_emergencia(self):
+        return self.nivel <= NIVEL_EMERGENCIA
+
+    @es_emergencia.setter
+    def es_emergencia(self, es_emergencia):
+        self.nivel = NIVEL_POR_DEFECTO_EMERGENCIA if es_emergencia else NIVEL_POR_DEFECTO_NORMAL
+
+    @property
+    def especialidad(self):
+        return _NOMBRES_ESPECIALIDAD[self._especialidad]
+
+    @especialidad.setter
+    def especialidad(self, especialidad):
+        self._especialidad = codigo_especialidad(especialidad)
+
+    @property
+    def fecha(self):
+        agenda = self._agenda
+        if isinstance(agenda, tuple):
+            return agenda[0]
+        dia = agenda // 10_000
+        return f"{dia % 100:02d}/{dia // 100 % 100:02d}/{dia // 10_000:04d}"
+
+    @fecha.setter
+    def fecha(self, fecha):
+        self._agenda = _codificar_agenda(fecha, self.hora)
+
+    @property
+    def hora(self):
+        agenda = self._agenda
+        if isinstance(agenda, tuple):
+            return agenda[1]
+        return f"{agenda // 100 % 100:02d}:{agenda % 100:02d}"
+
+    @hora.setter
+    def hora(self, hora):
+        self._agenda = _codificar_agenda(self.fecha, hora)
+
+    @property
+    def momento_agenda(self):
+        """Fecha y hora del turno en segundos epoch (hora local), o None si
+        no son una fecha DD/MM/AAAA y hora HH:MM válidas"""
+        agenda = self._agenda
+        if isinstance(agenda, tuple):
+            return None
+        try:
+            return datetime(agenda // 100_000_000, agenda // 1_000_000 % 100,
+                            agenda // 10_000 % 100, agenda // 100 % 100, agenda % 100).timestamp()
+        except ValueError:
+            return None
+
+    @property
+    def hora_registro(self):
+        return datetime.fromtimestamp(self.registro)
+
+    @hora_registro.setter
+    def hora_registro(self, hora_registro):
+        self.registro = hora_registro.timestamp()
+
+    def __reduce__(self):
+        # La especialidad viaja por nombre: los códigos son de cada proceso
+        return (_restaurar_paciente, (self.nombre, self.telefono, self.nivel, self.ticket,
+                                      self.especialidad, self._agenda, self.registro))
+
+
+def _restaurar_paciente(nombre, telefono, nivel, ticket, especialidad, agenda, registro):
+    """Paciente tal como se serializó (ver Paciente.__reduce__)"""
+    paciente = Paciente.__new__(Paciente)
+    paciente.nombre = nombre
+    paciente.telefono = telefono
+    paciente.nivel = nivel
+    paciente.ticket = ticket
+    paciente._especialidad = codigo_especialidad(especialidad)
+    paciente._agenda = agenda
+    paciente.registro = registro
+    return paciente
@@ -0,0 +1,88 @@
+"""Guardado y carga de la cola (y de las reservas de su agenda) en un archivo JSON"""
+import json
+import os
+from datetime import datetime
+
+from .cola import ColaTurnos
+from .paciente import Paciente
+
+
+def paciente_a_dict(paciente):
+    return {
+        'nombre': paciente.nombre,
+        'telefono': paciente.telefono,
+        'fecha': paciente.fecha,
+        'hora': paciente.hora,
+        'especialidad': paciente.especialidad,
+        'es_emergencia': paciente.es_emergencia,
+        'nivel': paciente.nivel,
+        'hora_registro': paciente.hora_registro.isoformat()
+    }
+
+
+def paciente_desde_dict(datos):
+    paciente = Paciente(datos['nombre'], datos['telefono'], datos['fecha'],
+                        datos['hora'], datos['especialidad'], datos['es_emergencia'],
+                        datos.get('nivel'))
+    paciente.hora_registro = datetime.fromisoformat(datos['hora_registro'])
+    return paciente
+
+
+def _turno_a_dict(cola, ticket, paciente):
+    datos = dict(paciente_a_dict(paciente), ticket=ticket)
+    nivel, desde = cola.nivel_actual(ticket)
+    if desde is not None:
+        # Subió de nivel por envejecimiento mientras esperaba
+        datos['nivel_actual'] = nivel
+        datos['promovido'] = datetime.fromtimestamp(desde).isoformat()
+    return datos
+
+
+def guardar_cola(cola, ruta, agenda=None):
+    """Escribir la cola en orden de atención, y las reservas de `agenda` si
+    se indica (reemplazo atómico del archivo)"""
+    datos = {
+        'siguiente_ticket': cola.siguiente_ticket,
+        'turnos': [_turno_a_dict(cola, ticket, paciente) for ticket, paciente in cola.turnos()]
+    }
+    if agenda is not None:
+        datos['siguiente_reserva'] = agenda.siguiente_reserva
+        datos['reservas'] = [dict(paciente_a_dict(paciente), reserva=reserva)
+                             for _, reserva, paciente in agenda.reservas()]
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def cargar_cola(ruta):
+    """Leer una cola guardada con guardar_cola; si el archivo no existe, cola vacía"""
+    cola = ColaTurnos()
+    if not os.path.exists(ruta):
+        return cola
+    
+    with open(ruta, encoding='utf-8') as archivo:
+        datos = json.load(archivo)
+    # Los turnos están en orden de atención: restaurarlos en ese orden
+    # conserva el FIFO de cada cola y de cada especialidad
+    for turno in datos['turnos']:
+        desde = turno.get('promovido')
+        if desde is not None:
+            desde = datetime.fromisoformat(desde).timestamp()
+        cola.restaurar(turno['ticket'], paciente_desde_dict(turno), turno.get('nivel_actual'), desde)
+    cola.siguiente_ticket = max(cola.siguiente_ticket, datos['siguiente_ticket'])
+    return cola
+
+
+def cargar_agenda(ruta, agenda):
+    """Cargar en `agenda` (vacía) las reservas guardadas con guardar_cola;
+    retorna la agenda"""
+    if not os.path.exists(ruta):
+        return agenda
+    
+    with open(ruta, encoding='utf-8') as archivo:
+        datos = json.load(archivo)
+    for reserva in datos.get('reservas', ()):
+        agenda.restaurar(reserva['reserva'], paciente_desde_dict(reserva))
+    agenda.siguiente_reserva = max(agenda.siguiente_reserva, datos.get('siguiente_reserva', 1))
+    return agenda
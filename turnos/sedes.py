@@ -0,0 +1,211 @@
+"""Varias sedes (o especialidades) repartidas en procesos trabajadores.
+
+Cada sede tiene su propia ColaTurnos, que vive en uno de los procesos
+trabajadores; el coordinador solo enruta operaciones. Las operaciones de
+una misma sede van siempre al mismo proceso y en orden, así cada cola
+conserva su FIFO. ejecutar() manda un lote a todos los procesos antes de
+esperar respuestas, y los procesos lo atienden en paralelo.
+
+Las estadísticas de la red se combinan desde los agregados de cada cola
+(conteos, suma de horas de registro, registro más antiguo), sin mandar
+listas de pacientes entre procesos.
+
+Uso:
+    with CoordinadorSedes(["Centro", "Norte", "Sur"], procesos=3) as red:
+        ticket = red.encolar("Norte", paciente)
+        red.ejecutar([("Centro", "desencolar", ()), ("Sur", "tamaño", ())])
+        red.estadisticas()   # toda la red
+"""
+import multiprocessing
+import os
+import re
+import threading
+import types
+
+from .cola import ColaTurnos, combinar_estadisticas
+from .diario import DiarioTurnos
+
+# Métodos de ColaTurnos que se pueden pedir a una sede
+OPERACIONES_SEDE = frozenset({
+    'encolar', 'encolar_lote', 'desencolar', 'cancelar_ticket', 'cancelar_turno',
+    'buscar_ticket', 'buscar_ticket_especialidad', 'buscar_paciente', 'sugerir',
+    'promover', 'nivel_actual', 'ver_primero', 'iterar_turnos', 'contar_turnos',
+    'obtener_estadisticas', 'agregados', 'conteo_por_especialidad', 'tamaño',
+    'esta_vacia', 'envejecer', 'configurar_envejecimiento',
+})
+
+
+def _carpeta(sede):
+    """Nombre de carpeta para el diario de una sede"""
+    return re.sub(r'[^\w.-]+', '_', sede)
+
+
+def _trabajador(conexion, sedes, envejecimiento, directorio):
+    """Bucle de un proceso trabajador: atiende lotes hasta recibir None"""
+    diarios = []
+    colas = {}
+    for sede in sedes:
+        if directorio is None:
+            cola = ColaTurnos()
+        else:
+            diario = DiarioTurnos(os.path.join(directorio, _carpeta(sede)))
+            diarios.append(diario)
+            cola = diario.recuperar()
+        cola.configurar_envejecimiento(envejecimiento)
+        colas[sede] = cola
+    try:
+        while True:
+            lote = conexion.recv()
+            if lote is None:
+                return
+            resultados = []
+            for sede, operacion, args in lote:
+                try:
+                    resultado = getattr(colas[sede], operacion)(*args)
+                    if isinstance(resultado, types.GeneratorType):
+                        resultado = list(resultado)
+                    resultados.append((True, resultado))
+                except Exception as error:
+                    resultados.append((False, error))
+            for diario in diarios:
+                diario.sincronizar_pendientes()
+            conexion.send(resultados)
+    finally:
+        for diario in diarios:
+            diario.cerrar()
+        conexion.close()
+
+
+class CoordinadorSedes:
+    """Coordinador de una ColaTurnos por sede, en `procesos` trabajadores.
+
+    Las sedes se reparten en turno rotativo entre los procesos (por defecto
+    tantos como núcleos, sin pasar del número de sedes). Con `directorio`
+    cada sede lleva su diario en una subcarpeta y se recupera al arrancar.
+    Se puede usar desde varios hilos: los lotes se atienden de a uno.
+    """
+    def __init__(self, sedes, procesos=None, envejecimiento=None, directorio=None):
+        self.sedes = list(sedes)
+        if not self.sedes:
+            raise ValueError("Hace falta al menos una sede")
+        if len(set(self.sedes)) != len(self.sedes):
+            raise ValueError("Sedes repetidas")
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+        procesos = max(1, min(procesos, len(self.sedes)))
+
+        self._cerrojo = threading.Lock()
+        self._proceso_de = {sede: indice % procesos for indice, sede in enumerate(self.sedes)}
+        self._conexiones = []
+        self._procesos = []
+        for indice in range(procesos):
+            propias = [sede for sede in self.sedes if self._proceso_de[sede] == indice]
+            nuestra, suya = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(
+                target=_trabajador, args=(suya, propias, envejecimiento, directorio),
+                name=f"turnos-sedes-{indice}", daemon=True)
+            proceso.start()
+            suya.close()
+            self._conexiones.append(nuestra)
+            self._procesos.append(proceso)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """Terminar los trabajadores (cerrando los diarios de cada sede)"""
+        with self._cerrojo:
+            for conexion in self._conexiones:
+                try:
+                    conexion.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for proceso, conexion in zip(self._procesos, self._conexiones):
+                proceso.join()
+                conexion.close()
+            self._conexiones = []
+            self._procesos = []
+
+    @property
+    def procesos(self):
+        return len(self._procesos)
+
+    def ejecutar(self, operaciones):
+        """Ejecutar operaciones (sede, método, args) y retornar sus resultados
+        en el mismo orden.
+
+        Cada trabajador recibe en un solo mensaje las de sus sedes y los
+        trabajadores las atienden en paralelo. Si alguna lanzó una
+        excepción se relanza la primera (las demás ya se ejecutaron).
+        """
+        lotes = [[] for _ in self._conexiones]
+        destinos = []
+        for sede, operacion, args in operaciones:
+            if operacion not in OPERACIONES_SEDE:
+                raise ValueError(f"Operación desconocida: {operacion}")
+            proceso = self._proceso_de.get(sede)
+            if proceso is None:
+                raise KeyError(f"Sede desconocida: {sede}")
+            destinos.append((proceso, len(lotes[proceso])))
+            lotes[proceso].append((sede, operacion, tuple(args)))
+
+        with self._cerrojo:
+            if not self._conexiones:
+                raise RuntimeError("El coordinador está cerrado")
+            for conexion, lote in zip(self._conexiones, lotes):
+                if lote:
+                    conexion.send(lote)
+            respuestas = [conexion.recv() if lote else []
+                          for conexion, lote in zip(self._conexiones, lotes)]
+
+        resultados = []
+        for proceso, posicion in destinos:
+            correcto, resultado = respuestas[proceso][posicion]
+            if not correcto:
+                raise resultado
+            resultados.append(resultado)
+        return resultados
+
+    def llamar(self, sede, operacion, *args):
+        """Una operación sobre una sede (un viaje de ida y vuelta)"""
+        return self.ejecutar([(sede, operacion, args)])[0]
+
+    def encolar(self, sede, paciente):
+        """Encolar en una sede; retorna el ticket (único dentro de la sede)"""
+        return self.llamar(sede, 'encolar', paciente)
+
+    def encolar_lote(self, sede, pacientes):
+        return self.llamar(sede, 'encolar_lote', list(pacientes))
+
+    def desencolar(self, sede, especialidad=None):
+        return self.llamar(sede, 'desencolar', especialidad)
+
+    def cancelar_ticket(self, sede, ticket):
+        return self.llamar(sede, 'cancelar_ticket', ticket)
+
+    def buscar_ticket(self, sede, ticket):
+        return self.llamar(sede, 'buscar_ticket', ticket)
+
+    def agregados_por_sede(self):
+        """sede -> agregados de su cola (ver ColaTurnos.agregados)"""
+        agregados = self.ejecutar([(sede, 'agregados', ()) for sede in self.sedes])
+        return dict(zip(self.sedes, agregados))
+
+    def estadisticas(self, sede=None):
+        """Estadísticas de una sede, o de toda la red combinando los
+        agregados de cada cola"""
+        if sede is not None:
+            return self.llamar(sede, 'obtener_estadisticas')
+        return combinar_estadisticas(self.agregados_por_sede().values())
+
+    def estadisticas_por_sede(self):
+        """{'red': estadísticas de todas, 'sedes': sede -> estadísticas}, con
+        un solo viaje a los trabajadores"""
+        agregados = self.agregados_por_sede()
+        return {
+            'red': combinar_estadisticas(agregados.values()),
+            'sedes': {sede: combinar_estadisticas([parte]) for sede, parte in agregados.items()}
+        }
@@ -0,0 +1,346 @@
+"""Servicio HTTP/JSON local (asyncio) sobre una ColaTurnos.
+
+Pantallas de sala de espera, recepción y consultorios comparten una sola
+cola a través de este servicio. Conexiones keep-alive (HTTP/1.1) y un
+endpoint de lotes para varias operaciones por petición.
+
+Endpoints:
+    POST   /turnos                 encolar {nombre, telefono, especialidad,
+                                   fecha?, hora?, emergencia?, nivel?}
+    POST   /turnos/siguiente       desencolar {especialidad?} (o ?especialidad=)
+    GET    /turnos/<ticket>        posición global, en su especialidad y espera estimada
+    DELETE /turnos/<ticket>        cancelar
+    GET    /turnos                 listar ?offset=&limit=&tipo=&especialidad=
+    GET    /sugerencias            turnos por prefijo de nombre ?nombre=&limit=
+    GET    /estadisticas           estadísticas de la cola
+    GET    /metrics                métricas en formato de texto de Prometheus
+    POST   /lote                   [{"op": "encolar" | "siguiente" | "cancelar" |
+                                   "posicion" | "estadisticas", ...}, ...]
+
+Un cuerpo con campos de otro tipo o un Content-Length inválido responden
+400, y unas cabeceras que no entran en el buffer de lectura, 431; un
+error no previsto responde 500 sin cortar la conexión (en un lote, solo
+esa operación, y las anteriores quedan aplicadas). Cada resultado de un
+lote es {"estado", "resultado"}, con {"error": ...} como resultado si
+la operación falló.
+
+El bucle de asyncio es de un solo hilo: las operaciones sobre la cola no
+se intercalan. Si la cola también se usa desde otros hilos, pasar una
+ColaTurnosConcurrente.
+"""
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from . import validacion
+from .cola import CAMPOS_TURNO
+from .estimacion import EstimadorEspera
+from .metricas import Registro, instrumentar_cola, metricas_de
+from .paciente import ESPECIALIDADES, NIVELES_TRIAGE, Paciente, validar_nivel
+
+MAXIMO_CUERPO = 8 * 1024 * 1024
+
+_RAZONES = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ErrorPeticion(Exception):
+    """Error que se responde al cliente con un código HTTP"""
+    def __init__(self, estado, mensaje, **datos):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.datos = dict(datos, error=mensaje)
+
+
+def _describir(paciente):
+    return {
+        'ticket': paciente.ticket,
+        'paciente': paciente.nombre,
+        'telefono': paciente.telefono,
+        'especialidad': paciente.especialidad,
+        'tipo': "EMERGENCIA" if paciente.es_emergencia else "NORMAL",
+        'nivel': paciente.nivel
+    }
+
+
+class ServicioTurnos:
+    """Operaciones del servicio sobre una cola, independientes del transporte.
+
+    /metrics exporta las métricas de la cola: las del registro con que ya
+    estaba instrumentada, o si no se la instrumenta con `metricas` (o un
+    Registro nuevo).
+    """
+    def __init__(self, cola, especialidades=ESPECIALIDADES, metricas=None):
+        self.cola = cola
+        self.especialidades = especialidades
+        self.estimador = EstimadorEspera(cola)
+        self.metricas = metricas_de(cola)
+        if self.metricas is None:
+            self.metricas = metricas if metricas is not None else Registro()
+            instrumentar_cola(cola, self.metricas)
+
+    def encolar(self, datos):
+        nombre = (self._texto(datos, 'nombre') or '').strip()
+        telefono = (self._texto(datos, 'telefono') or '').strip()
+        especialidad = (self._texto(datos, 'especialidad') or '').strip()
+        fecha = self._texto(datos, 'fecha')
+        hora = self._texto(datos, 'hora')
+        emergencia = datos.get('emergencia', False)
+        if not isinstance(emergencia, bool):
+            raise ErrorPeticion(400, "emergencia debe ser true o false")
+        errores = validacion.errores_registro(nombre, telefono, especialidad, self.especialidades)
+        nivel = datos.get('nivel')
+        if nivel is not None:
+            try:
+                validar_nivel(nivel)
+            except ValueError:
+                errores = errores + [f"El nivel de triage debe ser un entero de 1 a {NIVELES_TRIAGE}"]
+        if errores:
+            raise ErrorPeticion(400, "Registro inválido", errores=errores)
+
+        ahora = datetime.now()
+        paciente = Paciente(nombre, telefono,
+                            fecha or ahora.strftime("%d/%m/%Y"), hora or ahora.strftime("%H:%M"),
+                            especialidad, emergencia, nivel)
+        ticket = self.cola.encolar(paciente)
+        _, posicion = self.cola.buscar_ticket(ticket)
+        return 201, dict(_describir(paciente), posicion=posicion)
+
+    def siguiente(self, datos):
+        especialidad = self._texto(datos, 'especialidad')
+        paciente = self.cola.desencolar(especialidad)
+        if paciente is None:
+            raise ErrorPeticion(404, "No hay pacientes en la cola")
+        return 200, _describir(paciente)
+
+    def cancelar(self, datos):
+        ticket = self._ticket(datos)
+        if not self.cola.cancelar_ticket(ticket):
+            raise ErrorPeticion(404, f"Turno {ticket} no encontrado")
+        return 200, {'cancelado': ticket}
+
+    def posicion(self, datos):
+        ticket = self._ticket(datos)
+        paciente, posicion = self.cola.buscar_ticket(ticket)
+        if paciente is None:
+            raise ErrorPeticion(404, f"Turno {ticket} no encontrado")
+        _, posicion_especialidad = self.cola.buscar_ticket_especialidad(ticket)
+        estimado, minimo, maximo = self.estimador.estimar_posicion(paciente.especialidad,
+                                                                   posicion_especialidad)
+        return 200, dict(_describir(paciente), posicion=posicion,
+                         nivel_actual=self.cola.nivel_actual(ticket)[0],
+                         posicion_especialidad=posicion_especialidad,
+                         minutos_estimados=round(estimado, 1),
+                         minutos_minimo=round(minimo, 1), minutos_maximo=round(maximo, 1))
+
+    def listar(self, datos):
+        offset = self._entero(datos, 'offset', 0)
+        limit = self._entero(datos, 'limit', 100)
+        filas = self.cola.iterar_turnos(offset, limit, self._texto(datos, 'tipo'),
+                                        self._texto(datos, 'especialidad'))
+        return 200, [dict(zip(CAMPOS_TURNO, fila)) for fila in filas]
+
+    def sugerencias(self, datos):
+        limite = self._entero(datos, 'limit', 10)
+        turnos = self.cola.sugerir(self._texto(datos, 'nombre') or '', limite)
+        return 200, [dict(_describir(paciente), posicion=self.cola.buscar_ticket(ticket)[1])
+                     for ticket, paciente in turnos]
+
+    def estadisticas(self, datos):
+        return 200, self.cola.obtener_estadisticas()
+
+    def lote(self, operaciones):
+        """Ejecutar varias operaciones en orden; cada una con su propio resultado,
+        siempre {'estado', 'resultado'} (con un error, {'error': ...} como resultado)"""
+        if not isinstance(operaciones, list):
+            raise ErrorPeticion(400, "El lote debe ser una lista de operaciones")
+        resultados = []
+        for operacion in operaciones:
+            try:
+                if not isinstance(operacion, dict):
+                    raise ErrorPeticion(400, "Operación inválida")
+                funcion = self.OPERACIONES_LOTE.get(operacion.get('op'))
+                if funcion is None:
+                    raise ErrorPeticion(400, f"Operación desconocida: {operacion.get('op')}")
+                estado, cuerpo = funcion(self, operacion)
+            except ErrorPeticion as error:
+                estado, cuerpo = error.estado, error.datos
+            except Exception as error:
+                # Las anteriores ya se aplicaron: informar esta y seguir
+                estado, cuerpo = 500, {'error': f"Error interno: {error}"}
+            resultados.append({'estado': estado, 'resultado': cuerpo})
+        return 200, resultados
+
+    OPERACIONES_LOTE = {
+        'encolar': encolar,
+        'siguiente': siguiente,
+        'cancelar': cancelar,
+        'posicion': posicion,
+        'estadisticas': estadisticas,
+    }
+
+    @staticmethod
+    def _texto(datos, clave):
+        """Campo de texto opcional (None si falta); 400 si no es un texto"""
+        valor = datos.get(clave)
+        if valor is not None and not isinstance(valor, str):
+            raise ErrorPeticion(400, f"{clave} debe ser un texto")
+        return valor
+
+    @staticmethod
+    def _entero(datos, clave, defecto):
+        """Entero no negativo opcional (de la consulta llega como texto)"""
+        valor = datos.get(clave)
+        if valor is None:
+            return defecto
+        try:
+            if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+                raise ValueError(valor)
+            valor = int(valor)
+            if valor < 0:
+                raise ValueError(valor)
+        except ValueError:
+            raise ErrorPeticion(400, f"{clave} debe ser un entero no negativo")
+        return valor
+
+    @staticmethod
+    def _ticket(datos):
+        try:
+            return int(datos['ticket'])
+        except (KeyError, TypeError, ValueError):
+            raise ErrorPeticion(400, "Falta un ticket válido")
+
+    def despachar(self, metodo, ruta, consulta, cuerpo):
+        """Resolver una petición HTTP ya parseada; retorna (estado, datos)"""
+        partes = [parte for parte in ruta.split('/') if parte]
+        datos = dict(consulta)
+        if isinstance(cuerpo, dict):
+            datos.update(cuerpo)
+
+        if partes == ['turnos']:
+            if metodo == 'POST':
+                return self.encolar(datos)
+            if metodo == 'GET':
+                return self.listar(datos)
+        elif partes == ['turnos', 'siguiente']:
+            if metodo == 'POST':
+                return self.siguiente(datos)
+        elif len(partes) == 2 and partes[0] == 'turnos':
+            datos['ticket'] = partes[1]
+            if metodo == 'GET':
+                return self.posicion(datos)
+            if metodo == 'DELETE':
+                return self.cancelar(datos)
+        elif partes == ['sugerencias']:
+            if metodo == 'GET':
+                return self.sugerencias(datos)
+        elif partes == ['estadisticas']:
+            if metodo == 'GET':
+                return self.estadisticas(datos)
+        elif partes == ['lote']:
+            if metodo == 'POST':
+                return self.lote(cuerpo)
+        elif partes == ['metrics']:
+            if metodo == 'GET':
+                return 200, self.metricas.exportar()
+        else:
+            raise ErrorPeticion(404, f"Ruta desconocida: {ruta}")
+        raise ErrorPeticion(405, f"Método {metodo} no permitido en {ruta}")
+
+
+def _respuesta(estado, datos, mantener):
+    if isinstance(datos, str):
+        # Texto ya formateado (/metrics)
+        tipo = "text/plain; version=0.0.4; charset=utf-8"
+        cuerpo = datos.encode('utf-8')
+    else:
+        tipo = "application/json; charset=utf-8"
+        cuerpo = json.dumps(datos, ensure_ascii=False, default=str).encode('utf-8')
+    cabecera = (f"HTTP/1.1 {estado} {_RAZONES.get(estado, '')}\r\n"
+                f"Content-Type: {tipo}\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return cabecera.encode('latin-1') + cuerpo
+
+
+async def _atender_conexion(servicio, lector, escritor):
+    """Atender peticiones sucesivas de una conexión keep-alive"""
+    try:
+        while True:
+            try:
+                cabecera = await lector.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except asyncio.LimitOverrunError:
+                # Cabeceras más largas que el límite del StreamReader (64 KiB)
+                escritor.write(_respuesta(431, {'error': "Cabeceras demasiado grandes"}, False))
+                return
+
+            lineas = cabecera.decode('latin-1').split("\r\n")
+            try:
+                metodo, objetivo, version = lineas[0].split(" ", 2)
+            except ValueError:
+                escritor.write(_respuesta(400, {'error': "Línea de petición inválida"}, False))
+                return
+            cabeceras = {}
+            for linea in lineas[1:]:
+                if ":" in linea:
+                    clave, valor = linea.split(":", 1)
+                    cabeceras[clave.strip().lower()] = valor.strip()
+
+            conexion = cabeceras.get('connection', '').lower()
+            mantener = conexion != 'close' if version == 'HTTP/1.1' else conexion == 'keep-alive'
+
+            try:
+                largo = int(cabeceras.get('content-length', 0) or 0)
+            except ValueError:
+                largo = -1
+            if largo < 0:
+                escritor.write(_respuesta(400, {'error': "Content-Length inválido"}, False))
+                return
+            if largo > MAXIMO_CUERPO:
+                escritor.write(_respuesta(413, {'error': "Cuerpo demasiado grande"}, False))
+                return
+            crudo = await lector.readexactly(largo) if largo else b""
+
+            url = urlsplit(objetivo)
+            consulta = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+            try:
+                cuerpo = json.loads(crudo) if crudo else None
+                estado, datos = servicio.despachar(metodo.upper(), url.path, consulta, cuerpo)
+            except json.JSONDecodeError:
+                estado, datos = 400, {'error': "JSON inválido"}
+            except ErrorPeticion as error:
+                estado, datos = error.estado, error.datos
+            except Exception as error:
+                # Un error no previsto no corta la conexión sin respuesta
+                estado, datos = 500, {'error': f"Error interno: {error}"}
+
+            servicio.metricas.contador('turnos_http_respuestas_total', "Respuestas HTTP por código",
+                                       estado=estado).valor += 1
+            escritor.write(_respuesta(estado, datos, mantener))
+            await escritor.drain()
+            if not mantener:
+                return
+    finally:
+        escritor.close()
+
+
+async def iniciar_servidor(cola, host="127.0.0.1", puerto=8080, especialidades=ESPECIALIDADES,
+                           metricas=None):
+    """Crear el servidor asyncio (sin bloquear); retorna el asyncio.Server"""
+    servicio = ServicioTurnos(cola, especialidades, metricas)
+
+    async def atender(lector, escritor):
+        await _atender_conexion(servicio, lector, escritor)
+
+    return await asyncio.start_server(atender, host, puerto, backlog=1024)
+
+
+async def servir(cola, host="127.0.0.1", puerto=8080, especialidades=ESPECIALIDADES, metricas=None):
+    """Atender peticiones hasta que se cancele la tarea"""
+    servidor = await iniciar_servidor(cola, host, puerto, especialidades, metricas)
+    async with servidor:
+        await servidor.serve_forever()
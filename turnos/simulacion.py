@@ -0,0 +1,300 @@
+"""Simulación de eventos discretos de una jornada de la clínica.
+
+Hace pasar llegadas sintéticas (Poisson) o registradas (una traza CSV)
+por una ColaTurnos real, con varios médicos por especialidad y tiempos de
+consulta aleatorios, y mide la espera de cada paciente desde que llega
+hasta que lo llaman. Sirve para dimensionar el plantel: barrer() corre
+muchos escenarios en paralelo con un pool de procesos.
+
+El reloj de la simulación está en minutos desde el inicio de la jornada;
+la hora de registro de cada paciente es la simulada, no la real, y la cola
+envejece los niveles de triage con ese mismo reloj.
+"""
+import csv
+import heapq
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from .cola import ColaTurnos
+from .importacion import _es_emergencia, _nivel
+from .paciente import (ESPECIALIDADES, NIVEL_POR_DEFECTO_EMERGENCIA, NIVEL_POR_DEFECTO_NORMAL,
+                       NIVELES_TRIAGE, Paciente)
+
+MINUTOS_POR_CONSULTA = 15
+PERCENTILES = (50, 90, 95, 99)
+
+# Tipos de evento (el orden desempata eventos simultáneos: primero se
+# liberan los médicos y después llegan los pacientes)
+_FIN_CONSULTA = 0
+_LLEGADA = 1
+
+
+class Escenario:
+    """Parámetros de una corrida.
+
+    `medicos` y `minutos_consulta` aceptan un número (igual para todas las
+    especialidades) o un diccionario especialidad -> valor. Con `traza`
+    (lista de llegadas, ver cargar_traza) se ignoran las llegadas sintéticas.
+
+    `mezcla_niveles` (nivel -> peso) sortea el triage de cada llegada; sin
+    ella, una proporción `proporcion_emergencias` es nivel 1 y el resto 3.
+    `envejecimiento` se pasa tal cual a la ColaTurnos.
+    """
+    def __init__(self, nombre="", especialidades=ESPECIALIDADES, medicos=1,
+                 llegadas_por_hora=20, mezcla=None, proporcion_emergencias=0.1,
+                 minutos_consulta=MINUTOS_POR_CONSULTA, variacion_consulta=0.5,
+                 distribucion_consulta='lognormal', duracion=600, cierre=None,
+                 traza=None, semilla=0, inicio=None, mezcla_niveles=None, envejecimiento=None):
+        self.nombre = nombre
+        self.especialidades = tuple(especialidades)
+        self.medicos = medicos
+        self.llegadas_por_hora = llegadas_por_hora        # Total de la clínica
+        self.mezcla = mezcla                              # especialidad -> peso (por defecto parejo)
+        self.proporcion_emergencias = proporcion_emergencias
+        self.mezcla_niveles = mezcla_niveles              # nivel de triage -> peso
+        self.envejecimiento = envejecimiento              # Minutos por nivel (ver ColaTurnos)
+        self.minutos_consulta = minutos_consulta          # Media del tiempo de consulta
+        self.variacion_consulta = variacion_consulta      # Coeficiente de variación
+        self.distribucion_consulta = distribucion_consulta  # 'lognormal', 'exponencial' o 'fija'
+        self.duracion = duracion                          # Minutos con llegadas
+        self.cierre = cierre                              # Minuto en que se deja de atender
+        self.traza = traza
+        self.semilla = semilla
+        self.inicio = inicio or datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+
+    def _por_especialidad(self, valor, especialidad):
+        return valor.get(especialidad, 0) if isinstance(valor, dict) else valor
+
+    def medicos_de(self, especialidad):
+        return self._por_especialidad(self.medicos, especialidad)
+
+    def consulta_de(self, especialidad):
+        valor = self.minutos_consulta
+        if isinstance(valor, dict):
+            return valor.get(especialidad, MINUTOS_POR_CONSULTA)
+        return valor
+
+
+def cargar_traza(ruta):
+    """Leer llegadas registradas de un CSV con encabezado.
+
+    Columnas: `llegada` (minutos desde el inicio) u `hora` (HH:MM, como la
+    agenda que acepta la importación), `especialidad`, `emergencia` y
+    `nivel` opcionales (como en la importación) y `duracion` opcional
+    (minutos reales de la consulta). Retorna una lista ordenada de (minuto,
+    especialidad, nivel, duracion o None), con el minuto relativo a la
+    primera llegada.
+    """
+    llegadas = []
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        for fila in csv.DictReader(archivo):
+            if fila.get("llegada"):
+                minuto = float(fila["llegada"])
+            else:
+                horas, minutos = fila["hora"].strip().split(":")
+                minuto = int(horas) * 60 + int(minutos)
+            duracion = fila.get("duracion")
+            nivel = _nivel(fila.get("nivel"))
+            if nivel is None:
+                nivel = (NIVEL_POR_DEFECTO_EMERGENCIA if _es_emergencia(fila.get("emergencia"))
+                         else NIVEL_POR_DEFECTO_NORMAL)
+            llegadas.append((minuto, fila["especialidad"].strip(), nivel,
+                             float(duracion) if duracion else None))
+    llegadas.sort(key=lambda llegada: llegada[0])
+    if llegadas:
+        primera = llegadas[0][0]
+        llegadas = [(llegada[0] - primera,) + llegada[1:] for llegada in llegadas]
+    return llegadas
+
+
+def percentil(ordenados, p):
+    """Percentil p (rango más cercano) de una lista ya ordenada"""
+    if not ordenados:
+        return None
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class ResultadoSimulacion:
+    """Esperas y ocupación de una corrida"""
+    def __init__(self, escenario):
+        self.escenario = escenario
+        self.esperas = {}       # (tipo, especialidad, nivel) -> [minutos]
+        self.ocupado = {}       # especialidad -> minutos de médico atendiendo
+        self.sin_atender = 0    # Pacientes en cola al cierre
+        self.fin = 0.0          # Minuto del último evento
+
+    def agregar_espera(self, tipo, especialidad, minutos, nivel=None):
+        self.esperas.setdefault((tipo, especialidad, nivel), []).append(minutos)
+
+    def distribucion(self, tipo=None, especialidad=None, nivel=None):
+        """Resumen de las esperas filtradas por tipo, especialidad y/o nivel de triage"""
+        esperas = sorted(minutos for (t, e, n), lista in self.esperas.items()
+                         if (tipo is None or t == tipo)
+                         and (especialidad is None or e == especialidad)
+                         and (nivel is None or n == nivel)
+                         for minutos in lista)
+        resumen = {'atendidos': len(esperas),
+                   'media': sum(esperas) / len(esperas) if esperas else None,
+                   'maximo': esperas[-1] if esperas else None}
+        for p in PERCENTILES:
+            resumen[f'p{p}'] = percentil(esperas, p)
+        return resumen
+
+    def resumen(self):
+        """Diccionario serializable: totales, por tipo, por nivel y por especialidad"""
+        escenario = self.escenario
+        utilizacion = {}
+        for especialidad in escenario.especialidades:
+            capacidad = escenario.medicos_de(especialidad) * self.fin
+            utilizacion[especialidad] = (self.ocupado.get(especialidad, 0) / capacidad
+                                         if capacidad else None)
+        return {
+            'escenario': escenario.nombre,
+            'total': self.distribucion(),
+            'por_tipo': {tipo: self.distribucion(tipo=tipo) for tipo in ("EMERGENCIA", "NORMAL")},
+            # Por el triage asignado al llegar (el envejecimiento no lo cambia)
+            'por_nivel': {nivel: self.distribucion(nivel=nivel)
+                          for nivel in range(1, NIVELES_TRIAGE + 1)},
+            'por_especialidad': {especialidad: dict(self.distribucion(especialidad=especialidad),
+                                                    medicos=escenario.medicos_de(especialidad),
+                                                    utilizacion=utilizacion[especialidad])
+                                 for especialidad in escenario.especialidades},
+            'sin_atender': self.sin_atender,
+            'fin_minutos': self.fin
+        }
+
+
+class Simulador:
+    """Bucle de eventos (heapq) que maneja una ColaTurnos real"""
+    def __init__(self, escenario):
+        self.escenario = escenario
+        self.azar = random.Random(escenario.semilla)
+        self.cola = ColaTurnos(escenario.envejecimiento, reloj=self._reloj)
+        self._minuto = 0.0
+        self.resultado = ResultadoSimulacion(escenario)
+        self._eventos = []
+        self._secuencia = 0
+        self._libres = {}     # especialidad -> médicos libres
+        self._llegada = {}    # ticket -> (minuto de llegada, duración registrada)
+
+    def _reloj(self):
+        """Hora simulada (segundos epoch), para el envejecimiento de la cola"""
+        return self.escenario.inicio.timestamp() + self._minuto * 60
+
+    def _programar(self, minuto, tipo, datos):
+        self._secuencia += 1
+        heapq.heappush(self._eventos, (minuto, tipo, self._secuencia, datos))
+
+    def _duracion_consulta(self, especialidad):
+        escenario = self.escenario
+        media = escenario.consulta_de(especialidad)
+        variacion = escenario.variacion_consulta
+        if escenario.distribucion_consulta == 'fija' or not variacion:
+            return media
+        if escenario.distribucion_consulta == 'exponencial':
+            return self.azar.expovariate(1 / media)
+        # Lognormal con la media y el coeficiente de variación pedidos
+        sigma2 = math.log(1 + variacion ** 2)
+        return self.azar.lognormvariate(math.log(media) - sigma2 / 2, math.sqrt(sigma2))
+
+    def _programar_llegadas(self):
+        escenario = self.escenario
+        if escenario.traza is not None:
+            for minuto, especialidad, nivel, duracion in escenario.traza:
+                self._programar(minuto, _LLEGADA, (especialidad, nivel, duracion))
+            return
+
+        # Un proceso de Poisson por especialidad; cada llegada programa la siguiente
+        mezcla = escenario.mezcla or {especialidad: 1 for especialidad in escenario.especialidades}
+        total = sum(mezcla.values())
+        self._tasas = {especialidad: escenario.llegadas_por_hora / 60 * peso / total
+                       for especialidad, peso in mezcla.items() if peso > 0}
+        for especialidad in self._tasas:
+            self._siguiente_llegada(0.0, especialidad)
+
+    def _siguiente_llegada(self, minuto, especialidad):
+        minuto += self.azar.expovariate(self._tasas[especialidad])
+        if minuto <= self.escenario.duracion:
+            self._programar(minuto, _LLEGADA, (especialidad, self._sortear_nivel(), None))
+
+    def _sortear_nivel(self):
+        escenario = self.escenario
+        if escenario.mezcla_niveles:
+            niveles = list(escenario.mezcla_niveles)
+            return self.azar.choices(niveles, [escenario.mezcla_niveles[n] for n in niveles])[0]
+        if self.azar.random() < escenario.proporcion_emergencias:
+            return NIVEL_POR_DEFECTO_EMERGENCIA
+        return NIVEL_POR_DEFECTO_NORMAL
+
+    def _llegar(self, minuto, especialidad, nivel, duracion):
+        registro = self.escenario.inicio + timedelta(minutes=minuto)
+        paciente = Paciente("Paciente Simulado", "0", registro.strftime("%d/%m/%Y"),
+                            registro.strftime("%H:%M"), especialidad, nivel=nivel)
+        paciente.hora_registro = registro
+        ticket = self.cola.encolar(paciente)
+        self._llegada[ticket] = (minuto, duracion)
+        self._atender(minuto, especialidad)
+
+    def _atender(self, minuto, especialidad):
+        """Si hay un médico libre y pacientes en espera, llamar al siguiente"""
+        cierre = self.escenario.cierre
+        if cierre is not None and minuto > cierre:
+            return
+        if especialidad not in self._libres:
+            self._libres[especialidad] = self.escenario.medicos_de(especialidad)
+        while self._libres[especialidad] > 0:
+            paciente = self.cola.desencolar(especialidad)
+            if paciente is None:
+                return
+            llegada, duracion = self._llegada.pop(paciente.ticket)
+            tipo = "EMERGENCIA" if paciente.es_emergencia else "NORMAL"
+            self.resultado.agregar_espera(tipo, especialidad, minuto - llegada, paciente.nivel)
+
+            if duracion is None:
+                duracion = self._duracion_consulta(especialidad)
+            self.resultado.ocupado[especialidad] = self.resultado.ocupado.get(especialidad, 0) + duracion
+            self._libres[especialidad] -= 1
+            self._programar(minuto + duracion, _FIN_CONSULTA, especialidad)
+
+    def correr(self):
+        """Simular hasta vaciar la cola (o hasta el cierre); retorna el resultado"""
+        self._programar_llegadas()
+        sinteticas = self.escenario.traza is None
+        eventos = self._eventos
+        minuto = 0.0
+        while eventos:
+            minuto, tipo, _, datos = heapq.heappop(eventos)
+            self._minuto = minuto
+            if tipo == _LLEGADA:
+                especialidad = datos[0]
+                if sinteticas:
+                    self._siguiente_llegada(minuto, especialidad)
+                self._llegar(minuto, *datos)
+            else:
+                especialidad = datos
+                self._libres[especialidad] += 1
+                self._atender(minuto, especialidad)
+
+        self.resultado.fin = minuto
+        self.resultado.sin_atender = self.cola.tamaño()
+        return self.resultado
+
+
+def simular(escenario):
+    """Correr un escenario; retorna su ResultadoSimulacion"""
+    return Simulador(escenario).correr()
+
+
+def _resumir(escenario):
+    return simular(escenario).resumen()
+
+
+def barrer(escenarios, procesos=None):
+    """Correr muchos escenarios en paralelo; retorna sus resúmenes en orden"""
+    escenarios = list(escenarios)
+    if procesos == 1 or len(escenarios) == 1:
+        return [_resumir(escenario) for escenario in escenarios]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_resumir, escenarios, chunksize=max(1, len(escenarios) // 32)))
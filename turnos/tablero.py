@@ -0,0 +1,299 @@
+"""Tablero de la sala de espera en memoria compartida.
+
+TableroTurnos observa una ColaTurnos y publica, en un archivo mapeado en
+memoria de formato fijo, lo que muestran las pantallas de la sala: los
+próximos N tickets de la cola y de cada especialidad, las cantidades en
+espera y la hora de registro media (cada pantalla calcula la espera
+promedio con su reloj, así no hace falta republicar para que avance).
+Cualquier cantidad de procesos LectorTablero en la misma máquina lo leen
+sin cerrojos ni serialización: no piden nada al proceso de la cola.
+
+Un solo escritor y un seqlock: la secuencia de la cabecera es impar
+mientras se escribe; el lector lee la secuencia, los datos y de nuevo la
+secuencia, y reintenta si era impar o cambió. Cada cambio reescribe solo
+la sección general y la de la especialidad del turno, O(N). Con
+`espera_maxima` los cambios se juntan: se publica a lo sumo una vez cada
+tantos segundos y publicar_pendientes(), llamado periódicamente, saca lo
+que quedó (como sincronizar_pendientes del diario).
+
+Formato (little-endian), desde el byte 0:
+    secuencia       u64
+    cabecera        magia, versión, N (turnos por sección), secciones
+    totales         publicado (f8), total (u4), emergencias (u4),
+                    registro medio (f8, NaN con la cola vacía)
+    secciones       la general y una por especialidad: nombre (48 bytes
+                    UTF-8), total (u4), emergencias (u4) y N turnos
+                    (ticket u4, nivel u1); ticket 0 es un lugar vacío
+El nombre de las secciones no cambia después de crear el archivo.
+
+Conviene ponerlo en /dev/shm para que no toque el disco. Un escritor
+nuevo arma un archivo nuevo y lo reemplaza; los lectores lo notan y lo
+vuelven a abrir.
+
+Uso:
+    tablero = TableroTurnos("/dev/shm/turnos_tablero", cola)   # recepción
+    lector = LectorTablero("/dev/shm/turnos_tablero")          # cada pantalla
+    vista = lector.leer()   # {'total', 'frente', 'por_especialidad', ...}
+"""
+import math
+import mmap
+import os
+import struct
+import time
+
+from .paciente import ESPECIALIDADES
+
+MAGIA = b"TTUR"
+VERSION = 1
+POR_SECCION = 5
+
+_SECUENCIA = struct.Struct("<Q")
+_CABECERA = struct.Struct("<4sHHH")
+_TOTALES = struct.Struct("<dIId")
+_NOMBRE = struct.Struct("<48s")
+_CONTEOS = struct.Struct("<II")
+_INICIO_CABECERA = _SECUENCIA.size
+_INICIO_TOTALES = 24
+_INICIO_SECCIONES = _INICIO_TOTALES + _TOTALES.size
+
+# Cada cuánto (s) un lector revisa si el archivo fue reemplazado
+REVISAR_ARCHIVO = 1.0
+
+
+def _turnos(por_seccion):
+    return struct.Struct("<" + "IB3x" * por_seccion)
+
+
+def _tamaño_seccion(por_seccion):
+    return _NOMBRE.size + _CONTEOS.size + _turnos(por_seccion).size
+
+
+class TableroTurnos:
+    """Escritor del tablero de una ColaTurnos (se suscribe al crearse).
+
+    Un solo escritor por archivo. Las especialidades que no estén en
+    `especialidades` figuran solo en la sección general. Con `espera_maxima`
+    (segundos) los cambios se publican juntos; ver publicar_pendientes.
+    """
+    def __init__(self, ruta, cola, por_seccion=POR_SECCION, especialidades=ESPECIALIDADES,
+                 espera_maxima=None, reloj=time.time):
+        self.ruta = ruta
+        self.cola = cola
+        self.por_seccion = por_seccion
+        self.espera_maxima = espera_maxima
+        self.reloj = reloj
+        self._pendientes = set()    # Secciones con cambios sin publicar
+        self._ultima_publicacion = 0.0
+        self._turnos = _turnos(por_seccion)
+        self._vacios = (0, 0) * por_seccion
+        self._tamaño_seccion = _tamaño_seccion(por_seccion)
+        # Sección 0: toda la cola; después una por especialidad
+        self._secciones = (None,) + tuple(especialidades)
+        self._seccion_de = {especialidad: i for i, especialidad in enumerate(self._secciones) if i}
+        self._secuencia = 0
+        self._mapa = self._crear()
+        self.publicar()
+        cola.suscribir(self.registrar)
+
+    def _crear(self):
+        """Armar el archivo al lado y reemplazar el anterior"""
+        tamaño = _INICIO_SECCIONES + len(self._secciones) * self._tamaño_seccion
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        descriptor = os.open(temporal, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(descriptor, tamaño)
+            mapa = mmap.mmap(descriptor, tamaño)
+        finally:
+            os.close(descriptor)
+        _CABECERA.pack_into(mapa, _INICIO_CABECERA, MAGIA, VERSION, self.por_seccion,
+                            len(self._secciones))
+        for i, especialidad in enumerate(self._secciones):
+            nombre = (especialidad or "").encode("utf-8")[:_NOMBRE.size]
+            _NOMBRE.pack_into(mapa, self._inicio_seccion(i), nombre)
+        os.replace(temporal, self.ruta)
+        return mapa
+
+    def _inicio_seccion(self, i):
+        return _INICIO_SECCIONES + i * self._tamaño_seccion
+
+    def _inicio_conteos(self, i):
+        return self._inicio_seccion(i) + _NOMBRE.size
+
+    def cerrar(self):
+        """Dejar de observar la cola; el archivo queda con el último estado"""
+        self.cola.desuscribir(self.registrar)
+        self.publicar_pendientes()
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def registrar(self, evento, ticket, paciente):
+        """Observador de ColaTurnos: republicar la sección general y la del turno"""
+        seccion = self._seccion_de.get(paciente.especialidad)
+        if not self.espera_maxima:
+            self._publicar((0, seccion))
+            return
+        self._pendientes.add(0)
+        self._pendientes.add(seccion)
+        if time.monotonic() - self._ultima_publicacion >= self.espera_maxima:
+            self.publicar_pendientes()
+
+    def publicar_pendientes(self):
+        """Publicar los cambios juntados por `espera_maxima`, si hay"""
+        if self._pendientes:
+            secciones, self._pendientes = self._pendientes, set()
+            self._publicar(secciones)
+
+    def publicar(self):
+        """Reescribir todas las secciones"""
+        self._pendientes.clear()
+        self._publicar(range(len(self._secciones)))
+
+    def _publicar(self, secciones):
+        cola = self.cola
+        mapa = self._mapa
+        # Todo se calcula antes de abrir la escritura, así el seqlock queda
+        # impar el menor tiempo posible
+        total = cola.tamaño()
+        registro_medio = cola.registro_medio()
+        totales = (self.reloj(), total, cola.contar_turnos('EMERGENCIA'),
+                   math.nan if registro_medio is None else registro_medio)
+        escrituras = []
+        for i in secciones:
+            if i is None:
+                continue
+            especialidad = self._secciones[i]
+            valores = []
+            for ticket, _, nivel in cola.primeros(self.por_seccion, especialidad):
+                valores += (ticket, nivel)
+            valores += self._vacios[len(valores):]
+            escrituras.append((self._inicio_conteos(i), cola.tamaño(especialidad),
+                               cola.contar_turnos('EMERGENCIA', especialidad), valores))
+        # Secuencia impar: los lectores esperan hasta que vuelva a ser par
+        self._secuencia += 1
+        _SECUENCIA.pack_into(mapa, 0, self._secuencia)
+        _TOTALES.pack_into(mapa, _INICIO_TOTALES, *totales)
+        for inicio, cantidad, emergencias, valores in escrituras:
+            _CONTEOS.pack_into(mapa, inicio, cantidad, emergencias)
+            self._turnos.pack_into(mapa, inicio + _CONTEOS.size, *valores)
+        self._secuencia += 1
+        _SECUENCIA.pack_into(mapa, 0, self._secuencia)
+        self._ultima_publicacion = time.monotonic()
+
+
+class LectorTablero:
+    """Lector del tablero para una pantalla (solo lectura, sin cerrojos)"""
+    def __init__(self, ruta, reloj=time.time):
+        self.ruta = ruta
+        self.reloj = reloj
+        self._mapa = None
+        self._abrir()
+
+    def _abrir(self):
+        with open(self.ruta, "rb") as archivo:
+            self._inodo = os.fstat(archivo.fileno()).st_ino
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapa) < _INICIO_SECCIONES:
+            magia = version = None
+        else:
+            magia, version, por_seccion, cantidad = _CABECERA.unpack_from(mapa, _INICIO_CABECERA)
+        if magia != MAGIA or version != VERSION:
+            mapa.close()
+            raise ValueError(f"{self.ruta} no es un tablero de turnos (versión {VERSION})")
+        if self._mapa is not None:
+            self._mapa.close()
+        self._mapa = mapa
+        self.por_seccion = por_seccion
+        self._turnos = _turnos(por_seccion)
+        tamaño_seccion = _tamaño_seccion(por_seccion)
+        self._inicios = []
+        self.especialidades = []
+        for i in range(cantidad):
+            inicio = _INICIO_SECCIONES + i * tamaño_seccion
+            nombre = _NOMBRE.unpack_from(mapa, inicio)[0].rstrip(b"\0")
+            nombre = nombre.decode("utf-8", "ignore")
+            self._inicios.append(inicio + _NOMBRE.size)
+            if i:
+                self.especialidades.append(nombre)
+        self._indice = {nombre: i for i, nombre in enumerate(self.especialidades, 1)}
+        self._proxima_revision = time.monotonic() + REVISAR_ARCHIVO
+
+    def _revisar_archivo(self):
+        """Volver a abrir si un escritor nuevo reemplazó el archivo"""
+        self._proxima_revision = time.monotonic() + REVISAR_ARCHIVO
+        try:
+            if os.stat(self.ruta).st_ino != self._inodo:
+                self._abrir()
+        except (OSError, ValueError):
+            pass   # Sin archivo nuevo válido: seguir con el que está abierto
+
+    def cerrar(self):
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def secuencia(self):
+        """Número de publicación: si no cambió, la vista tampoco - O(1)"""
+        if time.monotonic() >= self._proxima_revision:
+            self._revisar_archivo()
+        return _SECUENCIA.unpack_from(self._mapa, 0)[0]
+
+    def leer(self, especialidad=None, intentos=1000):
+        """Vista consistente del tablero, o None si el escritor no terminó
+        de publicar en `intentos` lecturas (p. ej. se cayó a mitad).
+
+        Con `especialidad` se lee solo esa sección además de los totales
+        (KeyError si no está en el tablero).
+        """
+        if time.monotonic() >= self._proxima_revision:
+            self._revisar_archivo()
+        mapa = self._mapa
+        if especialidad is None:
+            secciones = list(enumerate(self._inicios))
+        else:
+            secciones = [(self._indice[especialidad], self._inicios[self._indice[especialidad]])]
+        for _ in range(intentos):
+            antes = _SECUENCIA.unpack_from(mapa, 0)[0]
+            if antes & 1:
+                # El escritor está a mitad: cederle la CPU en vez de girar
+                os.sched_yield()
+                continue
+            totales = _TOTALES.unpack_from(mapa, _INICIO_TOTALES)
+            leidas = [(i, _CONTEOS.unpack_from(mapa, inicio),
+                       self._turnos.unpack_from(mapa, inicio + _CONTEOS.size))
+                      for i, inicio in secciones]
+            if _SECUENCIA.unpack_from(mapa, 0)[0] == antes:
+                return self._vista(antes, totales, leidas)
+        return None
+
+    def _vista(self, secuencia, totales, leidas):
+        publicado, total, emergencias, registro_medio = totales
+        promedio = 0 if math.isnan(registro_medio) else int((self.reloj() - registro_medio) / 60)
+        vista = {
+            'secuencia': secuencia,
+            'publicado': publicado,
+            'total': total,
+            'emergencias': emergencias,
+            'normales': total - emergencias,
+            'tiempo_promedio': promedio,
+            'por_especialidad': {},
+        }
+        for i, (total_seccion, emergencias_seccion), valores in leidas:
+            frente = [(valores[j], valores[j + 1]) for j in range(0, len(valores), 2) if valores[j]]
+            if i == 0:
+                vista['frente'] = frente
+            else:
+                vista['por_especialidad'][self.especialidades[i - 1]] = {
+                    'total': total_seccion,
+                    'emergencias': emergencias_seccion,
+                    'frente': frente,
+                }
+        return vista
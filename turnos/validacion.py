@@ -0,0 +1,47 @@
+"""Reglas de validación de los datos de registro.
+
+Las expresiones se compilan una vez al importar el módulo, así validar
+miles de filas de una importación no reconstruye conjuntos por fila.
+"""
+import re
+
+CARACTERES_NOMBRE = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ áéíóúüñÁÉÍÓÚÜÑ'-")
+
+_NOMBRE = re.compile("[" + re.escape("".join(sorted(CARACTERES_NOMBRE))) + "]+")
+
+
+def validar_nombre_completo(nombre):
+    if not nombre.strip():
+        return False
+    return _NOMBRE.fullmatch(nombre) is not None
+
+
+def validar_telefono_completo(telefono):
+    if not telefono.strip():
+        return False
+    return telefono.isdigit()
+
+
+def errores_registro(nombre, telefono, especialidad, especialidades=None):
+    """Lista de motivos por los que un registro no es válido (vacía si lo es).
+    
+    Si se pasa `especialidades`, la especialidad debe ser una de ellas.
+    """
+    errores = []
+    
+    if not nombre:
+        errores.append("El nombre del paciente es obligatorio")
+    elif not validar_nombre_completo(nombre):
+        errores.append("El nombre debe contener solo letras y espacios")
+    
+    if not telefono:
+        errores.append("El teléfono es obligatorio")
+    elif not validar_telefono_completo(telefono):
+        errores.append("El teléfono debe contener solo números")
+    
+    if not especialidad:
+        errores.append("Debe seleccionar una especialidad")
+    elif especialidades is not None and especialidad not in especialidades:
+        errores.append(f"Especialidad desconocida: {especialidad}")
+    
+    return errores
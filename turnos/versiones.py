@@ -0,0 +1,341 @@
+"""Versiones inmutables de una ColaTurnos, para leer y deshacer.
+
+VersionesCola observa la cola y lleva, en paralelo, una copia persistente
+del orden de atención: por cada nivel de triage un vector de huecos en un
+árbol de 32 ramas. Cada cambio copia solo el camino de la raíz al hueco
+(O(log₃₂ n) tuplas de a lo sumo 32 elementos) y comparte el resto con la
+versión anterior, así tomar una versión es O(1) y guardar las últimas mil
+cuesta mucho menos que mil copias de la cola.
+
+Una VersionCola no cambia nunca: un reporte o una exportación la recorre
+desde otro hilo mientras la recepción sigue encolando y llamando. Como en
+ColaIndexada, lo que sale de la cola deja una lápida (None); cada nodo
+sabe cuántos vivos tiene debajo, así recorrer desde una posición salta
+subárboles vacíos, y las lápidas se compactan cuando superan a los vivos.
+
+deshacer(n) vuelve la cola a como estaba antes de las últimas n
+operaciones de recepción (encolar, desencolar, cancelar): el turno
+llamado o cancelado vuelve a su lugar con ColaTurnos.reinsertar. Los
+cambios de nivel posteriores se deshacen con ellas; el envejecimiento los
+repite si corresponde.
+
+Los demás observadores ven deshacer como tal, no como una operación
+nueva: un encolar deshecho sale con ColaTurnos._retirar, que notifica
+'deshacer' y no 'cancelar', y el turno que vuelve notifica 'reinsertar'.
+Con eso el historial (HistorialTurnos) retira la fila de su salida, el
+estimador (EstimadorEspera) descarta la muestra de ese llamado y los
+avisos no lo cuentan como cancelación; el diario anota los dos.
+
+Uso:
+    versiones = VersionesCola(cola, maximo=1000)
+    version = versiones.actual()       # O(1), inmutable
+    for ticket, paciente in version.turnos(): ...
+    versiones.deshacer()               # el último desencolar por error
+"""
+from collections import deque
+
+from .paciente import NIVELES_TRIAGE
+
+_BITS = 5
+_ANCHO = 1 << _BITS
+_MASCARA = _ANCHO - 1
+
+# Nodo: (vivos, hijos). En las hojas los hijos son huecos: una entrada
+# (ticket, paciente, desde) o None; en el resto, nodos.
+_VACIO = (0, ())
+# Vector de un nivel: (raíz, profundidad de la raíz, huecos usados)
+
+# Lápidas toleradas por nivel antes de compactar (amortizado O(1))
+MIN_COMPACTAR = 1024
+
+# Operaciones que cuenta deshacer(); los cambios de nivel van con ellas
+_OPERACIONES_RECEPCION = frozenset({'encolar', 'desencolar', 'cancelar'})
+
+
+def _poner(nodo, profundidad, i, valor, delta):
+    """Copia del camino hasta el hueco i, con `valor` en él y `delta` vivos más"""
+    vivos, hijos = nodo
+    j = (i >> (_BITS * profundidad)) & _MASCARA
+    if profundidad:
+        hijo = hijos[j] if j < len(hijos) else _VACIO
+        valor = _poner(hijo, profundidad - 1, i, valor, delta)
+    if j < len(hijos):
+        return (vivos + delta, hijos[:j] + (valor,) + hijos[j + 1:])
+    return (vivos + delta, hijos + (valor,))
+
+
+def _agregar(vector, entrada):
+    """Vector con `entrada` en un hueco nuevo al final; retorna (vector, hueco)"""
+    raiz, profundidad, usados = vector
+    if usados == _ANCHO << (_BITS * profundidad):
+        raiz = (raiz[0], (raiz,))   # Lleno: la raíz baja un nivel
+        profundidad += 1
+    return (_poner(raiz, profundidad, usados, entrada, 1), profundidad, usados + 1), usados
+
+
+def _quitar(vector, i):
+    raiz, profundidad, usados = vector
+    return (_poner(raiz, profundidad, i, None, -1), profundidad, usados)
+
+
+def _leer(vector, i):
+    """Contenido del hueco i"""
+    nodo, profundidad, _ = vector
+    while profundidad:
+        nodo = nodo[1][(i >> (_BITS * profundidad)) & _MASCARA]
+        profundidad -= 1
+    return nodo[1][i & _MASCARA]
+
+
+def _construir(entradas):
+    """Vector compacto con las entradas en orden - O(n)"""
+    nodos = [(len(entradas[i:i + _ANCHO]), tuple(entradas[i:i + _ANCHO]))
+             for i in range(0, len(entradas), _ANCHO)] or [_VACIO]
+    profundidad = 0
+    while len(nodos) > 1:
+        nodos = [(sum(nodo[0] for nodo in grupo), tuple(grupo))
+                 for grupo in (nodos[i:i + _ANCHO] for i in range(0, len(nodos), _ANCHO))]
+        profundidad += 1
+    return (nodos[0], profundidad, len(entradas))
+
+
+def _entradas(nodo, profundidad, saltar=0):
+    """Entradas vivas debajo de `nodo`, salteando las primeras `saltar`"""
+    if profundidad == 0:
+        for entrada in nodo[1]:
+            if entrada is not None:
+                if saltar:
+                    saltar -= 1
+                else:
+                    yield entrada
+        return
+    for hijo in nodo[1]:
+        vivos = hijo[0]
+        if vivos <= saltar:
+            saltar -= vivos
+            continue
+        yield from _entradas(hijo, profundidad - 1, saltar)
+        saltar = 0
+
+
+def _con_huecos(nodo, profundidad, base=0):
+    """(hueco, entrada) de las entradas vivas debajo de `nodo`"""
+    for j, hijo in enumerate(nodo[1]):
+        if profundidad == 0:
+            if hijo is not None:
+                yield base + j, hijo
+        elif hijo[0]:
+            yield from _con_huecos(hijo, profundidad - 1, (base + j) << _BITS)
+
+
+def _primera_despues(nodo, profundidad, i):
+    """Primera entrada viva en un hueco posterior a i, o None"""
+    hijos = nodo[1]
+    j = (i >> (_BITS * profundidad)) & _MASCARA
+    if profundidad == 0:
+        for entrada in hijos[j + 1:]:
+            if entrada is not None:
+                return entrada
+        return None
+    if j < len(hijos):
+        entrada = _primera_despues(hijos[j], profundidad - 1, i)
+        if entrada is not None:
+            return entrada
+    for hijo in hijos[j + 1:]:
+        if hijo[0]:
+            return next(_entradas(hijo, profundidad - 1))
+    return None
+
+
+class VersionCola:
+    """Foto inmutable del orden de atención de una ColaTurnos"""
+    __slots__ = ('numero', 'niveles')
+
+    def __init__(self, numero, niveles):
+        self.numero = numero       # Operaciones observadas hasta esta versión
+        self.niveles = niveles     # Un vector por nivel de triage
+
+    def __len__(self):
+        return sum(vector[0][0] for vector in self.niveles)
+
+    def por_nivel(self):
+        """nivel -> turnos en ese nivel (solo los que tienen alguno)"""
+        return {nivel: vector[0][0] for nivel, vector in enumerate(self.niveles, 1) if vector[0][0]}
+
+    def turnos(self):
+        """Recorrer (ticket, paciente) en orden de atención"""
+        for raiz, profundidad, _ in self.niveles:
+            for ticket, paciente, _ in _entradas(raiz, profundidad):
+                yield ticket, paciente
+
+    def iterar(self, offset=0, limit=None):
+        """(posición, ticket, paciente, nivel) desde la posición offset + 1;
+        el salto a `offset` cuesta O(log n)"""
+        restantes = -1 if limit is None else limit
+        posicion = offset
+        for nivel, (raiz, profundidad, _) in enumerate(self.niveles, 1):
+            if restantes == 0:
+                return
+            if offset >= raiz[0]:
+                offset -= raiz[0]
+                continue
+            for ticket, paciente, _ in _entradas(raiz, profundidad, offset):
+                posicion += 1
+                yield posicion, ticket, paciente, nivel
+                restantes -= 1
+                if restantes == 0:
+                    return
+            offset = 0
+
+    def ver_primero(self):
+        for _, paciente in self.turnos():
+            return paciente
+        return None
+
+
+class VersionesCola:
+    """Versiones de una ColaTurnos: la actual en O(1) y las últimas `maximo`
+    para deshacer.
+
+    Se suscribe a la cola al crearse (que puede no estar vacía). Los
+    cambios de la cola deben venir por sus métodos públicos: un
+    reinsertar (o un retiro) ajeno a deshacer() vuelve a armar la copia y
+    corta el historial de versiones.
+    """
+    def __init__(self, cola, maximo=1000):
+        self.cola = cola
+        self.maximo = maximo
+        self._ubicacion = {}     # ticket -> (nivel - 1, hueco) en la versión actual
+        self._deshaciendo = False
+        self._versiones = deque(maxlen=maximo + 1)
+        # Una operación por versión salvo la primera: (evento, ticket, quitado,
+        # compactado) con quitado = (índice, hueco, entrada) o None al encolar
+        self._operaciones = deque(maxlen=maximo)
+        self._reconstruir()
+        cola.suscribir(self.registrar)
+
+    def cerrar(self):
+        """Dejar de observar la cola"""
+        self.cola.desuscribir(self.registrar)
+
+    def _reconstruir(self):
+        """Copia desde la cola viva (O(n)); descarta las versiones anteriores"""
+        niveles = [[] for _ in range(NIVELES_TRIAGE)]
+        self._ubicacion = {}
+        for ticket, paciente in self.cola.turnos():
+            nivel, desde = self.cola.nivel_actual(ticket)
+            self._ubicacion[ticket] = (nivel - 1, len(niveles[nivel - 1]))
+            niveles[nivel - 1].append((ticket, paciente, desde))
+        numero = self._versiones[-1].numero + 1 if self._versiones else 0
+        self._versiones.clear()
+        self._versiones.append(VersionCola(numero, tuple(map(_construir, niveles))))
+        self._operaciones.clear()
+
+    def actual(self):
+        """La versión actual (inmutable) - O(1)"""
+        return self._versiones[-1]
+
+    def versiones(self):
+        """Versiones guardadas, de la más vieja a la actual"""
+        return list(self._versiones)
+
+    def __len__(self):
+        """Operaciones que se pueden deshacer"""
+        return len(self._operaciones)
+
+    def pendiente(self):
+        """(evento, ticket, paciente) de la operación de recepción que
+        desharía deshacer(), o None (para confirmarla antes)"""
+        for evento, ticket, quitado, _ in reversed(self._operaciones):
+            if evento not in _OPERACIONES_RECEPCION:
+                continue
+            if quitado is not None:
+                return evento, ticket, quitado[2][1]
+            indice, hueco = self._ubicacion[ticket]
+            return evento, ticket, _leer(self.actual().niveles[indice], hueco)[1]
+        return None
+
+    def olvidar(self):
+        """Descartar las versiones anteriores a la actual (no se podrá
+        deshacer lo hecho hasta ahora)"""
+        actual = self._versiones[-1]
+        self._versiones.clear()
+        self._versiones.append(actual)
+        self._operaciones.clear()
+
+    def registrar(self, evento, ticket, paciente):
+        """Observador de ColaTurnos: una versión nueva por cambio"""
+        if self._deshaciendo:
+            return
+        if evento in ('reinsertar', 'deshacer'):
+            self._reconstruir()
+            return
+
+        niveles = list(self._versiones[-1].niveles)
+        quitado = None
+        compactado = False
+        if evento != 'encolar':
+            indice, hueco = self._ubicacion.pop(ticket)
+            vector = niveles[indice]
+            quitado = (indice, hueco, _leer(vector, hueco))
+            niveles[indice] = vector = _quitar(vector, hueco)
+            raiz, _, usados = vector
+            if usados - raiz[0] > max(MIN_COMPACTAR, raiz[0]):
+                niveles[indice] = self._compactar(indice, vector)
+                compactado = True
+        if evento in ('encolar', 'promover'):
+            if evento == 'encolar':
+                nivel, desde = paciente.nivel, None
+            else:
+                nivel, desde = self.cola.nivel_actual(ticket)
+            niveles[nivel - 1], hueco = _agregar(niveles[nivel - 1], (ticket, paciente, desde))
+            self._ubicacion[ticket] = (nivel - 1, hueco)
+
+        self._versiones.append(VersionCola(self._versiones[-1].numero + 1, tuple(niveles)))
+        self._operaciones.append((evento, ticket, quitado, compactado))
+
+    def _compactar(self, indice, vector):
+        entradas = list(_entradas(vector[0], vector[1]))
+        for hueco, (ticket, _, _) in enumerate(entradas):
+            self._ubicacion[ticket] = (indice, hueco)
+        return _construir(entradas)
+
+    def deshacer(self, n=1):
+        """Deshacer las últimas n operaciones de recepción (y los cambios de
+        nivel que vinieron después); retorna cuántas se deshicieron.
+
+        Cada paso cuesta O(log² n) sobre la cola viva; si en el medio se
+        compactó la copia, O(n) para rehacer las ubicaciones.
+        """
+        deshechas = 0
+        self._deshaciendo = True
+        try:
+            while deshechas < n and self._operaciones:
+                evento, ticket, quitado, compactado = self._operaciones.pop()
+                self._versiones.pop()
+                anterior = self._versiones[-1]
+                if evento == 'encolar':
+                    self.cola._retirar(ticket)
+                else:
+                    indice, hueco, (_, paciente, desde) = quitado
+                    raiz, profundidad, _ = anterior.niveles[indice]
+                    siguiente = _primera_despues(raiz, profundidad, hueco)
+                    self.cola.reinsertar(ticket, paciente, indice + 1,
+                                         None if siguiente is None else siguiente[0], desde)
+                if compactado:
+                    self._reubicar(anterior)
+                elif quitado is None:
+                    del self._ubicacion[ticket]
+                else:
+                    self._ubicacion[ticket] = quitado[:2]
+                if evento in _OPERACIONES_RECEPCION:
+                    deshechas += 1
+        finally:
+            self._deshaciendo = False
+        return deshechas
+
+    def _reubicar(self, version):
+        self._ubicacion = {}
+        for indice, (raiz, profundidad, _) in enumerate(version.niveles):
+            for hueco, (ticket, _, _) in _con_huecos(raiz, profundidad):
+                self._ubicacion[ticket] = (indice, hueco)